@@ -29,7 +29,12 @@ from app.core import config
 from app.core.schemas import AppMode
 
 if __name__ == "__main__":
-    # Import the app instance
+
+    # Multiple workers are pre-forked by gunicorn & share rate limits through config.RATE_LIMIT_STORAGE_URL
+    if config.APP_WORKERS > 1:
+        from app.core.server import CriadexServer
+        CriadexServer("app.__app__:app").run()
+        raise SystemExit(0)
 
     uvicorn.run(
         app="app.__app__:app",
@@ -24,7 +24,7 @@ from starlette.requests import Request
 from app.controllers.schemas import catch_exceptions, APIResponse, SUCCESS, ERROR
 from app.core.config import QUERY_MODEL_RATE_LIMIT_DAY, QUERY_MODEL_RATE_LIMIT_HOUR, QUERY_MODEL_RATE_LIMIT_MINUTE
 from app.core.route import CriaRoute
-from app.core.schemas import model_query_limiter
+from app.core.limiter import model_query_limiter
 from criadex.index.ragflow_objects.language import RagflowLanguageAgentResponse, RagflowLanguageAgent
 
 view = APIRouter()
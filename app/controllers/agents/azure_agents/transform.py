@@ -30,7 +30,7 @@ from app.controllers.schemas import catch_exceptions, exception_response, APIRes
     NOT_FOUND, INVALID_MODEL, INVALID_REQUEST, ERROR, OPENAI_FILTER
 from app.core.config import QUERY_MODEL_RATE_LIMIT_HOUR, QUERY_MODEL_RATE_LIMIT_DAY, QUERY_MODEL_RATE_LIMIT_MINUTE
 from app.core.route import CriaRoute
-from app.core.schemas import model_query_limiter
+from app.core.limiter import model_query_limiter
 from criadex.index.ragflow_objects.transform import RagflowTransformAgentResponse, RagflowTransformAgentConfig, RagflowTransformAgent
 from criadex.index.ragflow_objects.llm import RagflowLLMAgentModelConfig
 # Remove legacy import. If needed, define EmptyPromptError and ContentFilterError locally or import from new location.
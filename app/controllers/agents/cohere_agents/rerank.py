@@ -24,7 +24,7 @@ from app.controllers.agents.azure_agents.intents import AgentIntentsResponse
 from app.controllers.schemas import catch_exceptions, exception_response
 from app.core.config import QUERY_MODEL_RATE_LIMIT_HOUR, QUERY_MODEL_RATE_LIMIT_DAY, QUERY_MODEL_RATE_LIMIT_MINUTE
 from app.core.route import CriaRoute
-from app.core.schemas import model_query_limiter
+from app.core.limiter import model_query_limiter
 from criadex.agent.cohere.rerank import RerankAgentResponse, RerankAgent, RerankAgentConfig
 from criadex.index.llama_objects.models import EmptyPromptError
 from criadex.schemas import ModelNotFoundError
@@ -1,10 +1,14 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncGenerator
 from fastapi import APIRouter
+import json
+import logging
 import os
 from pydantic import BaseModel
 from starlette.requests import Request
+from starlette.responses import StreamingResponse
 
 from criadex.index.ragflow_objects.chat import RagflowChatAgent
+from criadex.index.ragflow_objects.history import HistoryBudget
 
 router = APIRouter()
 
@@ -21,6 +25,7 @@ class ChatAgentRequest(BaseModel):
     history: List[ChatMessage] = []
     chat_id: str
     prompt: Optional[str] = None
+    history_budget: Optional[HistoryBudget] = None
 
 
 @router.post("/models/ragflow/{model_id}/agents/chat")
@@ -42,23 +47,17 @@ async def ragflow_chat(
             "agent_response": None
         }
 
-    # Build history from config
-    history = request_body.history if request_body.history else []
-    if not history and request_body.prompt:
-        history = [{"role": "user", "content": request_body.prompt}]
-
-    # Convert Pydantic models to dicts for compatibility
-    history_dicts = [h.dict() if hasattr(h, 'dict') else h for h in history]
+    history_dicts = _build_history(request_body)
 
-    # Initialize agent and execute
-    agent = RagflowChatAgent()
+    agent = get_ragflow_chat_agent(request)
     try:
         # Use server-side RAGFLOW_API_KEY. Do not forward client keys.
         api_key = os.getenv("RAGFLOW_API_KEY", "")
         agent_response = await agent.chat(
             chat_id=request_body.chat_id,
             history=history_dicts,
-            api_key=api_key
+            api_key=api_key,
+            history_budget=request_body.history_budget
         )
 
         # Standard success response
@@ -126,3 +125,78 @@ async def ragflow_chat(
             "agent_response": fallback_response
         }
 
+
+@router.post("/models/ragflow/{model_id}/agents/chat/stream")
+async def ragflow_chat_stream(
+    model_id: str,
+    request_body: ChatAgentRequest,
+    request: Request
+):
+    """
+    Chat with a Ragflow model, relaying the completion as server-sent events while it is generated.
+
+    Emits one `data: {"content": ...}` event per chunk, then an `event: usage` event with the
+    token usage & full message, then `data: [DONE]`. Upstream failures after the stream
+    started are reported as an `event: error` event.
+    """
+    if not request_body.chat_id:
+        return {
+            "code": "INVALID_REQUEST",
+            "status": 400,
+            "message": "chat_id is required in the request configuration",
+            "agent_response": None
+        }
+
+    history_dicts = _build_history(request_body)
+
+    # Use server-side RAGFLOW_API_KEY. Do not forward client keys.
+    api_key = os.getenv("RAGFLOW_API_KEY", "")
+
+    return StreamingResponse(
+        _relay_stream(get_ragflow_chat_agent(request), request_body.chat_id, history_dicts, api_key, request_body.history_budget),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _relay_stream(
+    agent: RagflowChatAgent,
+    chat_id: str,
+    history: list,
+    api_key: str,
+    history_budget: Optional[HistoryBudget] = None
+) -> AsyncGenerator[str, None]:
+    """Format the agent's stream events as SSE"""
+    try:
+        async for event in agent.chat_stream(chat_id=chat_id, history=history, api_key=api_key, history_budget=history_budget):
+            if event["type"] == "delta":
+                yield _sse({"content": event["content"]})
+            else:
+                yield _sse({"usage": event["usage"], "message": event["message"]}, event="usage")
+    except Exception as e:
+        logging.getLogger("uvicorn.error").error(f"Ragflow chat stream error: {str(e)}", exc_info=True)
+        message = str(e) if isinstance(e, ValueError) else "Error communicating with Ragflow service"
+        yield _sse({"code": "ERROR", "status": 502, "message": message}, event="error")
+
+    yield "data: [DONE]\n\n"
+
+
+def get_ragflow_chat_agent(request: Request) -> RagflowChatAgent:
+    """Use the app-scoped agent (pooled HTTP client) when the app provides one"""
+    return getattr(request.app, "ragflow_chat_agent", None) or RagflowChatAgent()
+
+
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Serialize a single server-sent event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _build_history(request_body: ChatAgentRequest) -> List[Dict[str, Any]]:
+    """Build the chat history from the request, falling back to the prompt"""
+    history = request_body.history if request_body.history else []
+    if not history and request_body.prompt:
+        history = [{"role": "user", "content": request_body.prompt}]
+
+    # Convert Pydantic models to dicts for compatibility
+    return [h.dict() if hasattr(h, 'dict') else h for h in history]
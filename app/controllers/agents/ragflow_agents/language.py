@@ -1,15 +1,24 @@
+from typing import List
+
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from criadex.agent.azure.language import LanguageAgent, LanguageAgentResponse
 
 router = APIRouter()
 
+# The detector itself is process-shared & built lazily, so the agent is cheap to hold
+agent = LanguageAgent()
+
 class LanguageRequest(BaseModel):
     text: str
 
+class LanguageBatchRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=1000)
+
 @router.post("/models/ragflow/{model_id}/agents/language")
 async def ragflow_language(model_id: str, request: LanguageRequest) -> LanguageAgentResponse:
-    agent = LanguageAgent()
-    response = agent.detect(request.text)
-    return response
+    return (await agent.detect_many([request.text]))[0]
 
+@router.post("/models/ragflow/{model_id}/agents/language/batch")
+async def ragflow_language_batch(model_id: str, request: LanguageBatchRequest) -> List[LanguageAgentResponse]:
+    return await agent.detect_many(request.texts)
@@ -14,7 +14,7 @@ You should have received a copy of the GNU General Public License along with Cri
 
 """
 
-from typing import Union
+from typing import Optional, Union
 
 from fastapi import APIRouter
 from fastapi_utils.cbv import cbv
@@ -23,6 +23,7 @@ from starlette.requests import Request
 from app.controllers.schemas import catch_exceptions, exception_response, APIResponse, SUCCESS, GROUP_NOT_FOUND, \
     FILE_NOT_FOUND, ERROR
 from app.core.route import CriaRoute
+from criadex.index.ragflow_objects.deletion import DeletionJob
 from criadex.schemas import GroupNotFoundError, DocumentNotFoundError
 
 view = APIRouter()
@@ -30,6 +31,7 @@ view = APIRouter()
 
 class ContentDeleteResponse(APIResponse):
     code: Union[SUCCESS, GROUP_NOT_FOUND, FILE_NOT_FOUND, ERROR]
+    job: Optional[DeletionJob] = None
 
 
 @cbv(view)
@@ -40,7 +42,8 @@ class DeleteContentRoute(CriaRoute):
         path="/groups/{group_name}/content/delete",
         name="Delete Index Content",
         summary="Delete Index Content",
-        description="Delete file content from the API. The requested file will be removed from the index group & deleted.",
+        description="Delete file content from the API. The requested file is removed from the index group in the background; "
+                    "poll the returned job at /groups/{group_name}/deletions/{job_id}.",
     )
     @catch_exceptions(
         ResponseModel
@@ -68,8 +71,8 @@ class DeleteContentRoute(CriaRoute):
             document_name: str
     ) -> ResponseModel:
 
-        # Try to delete it
-        await request.app.criadex.delete_file(
+        # Start deleting it
+        job: DeletionJob = await request.app.criadex.submit_file_deletion(
             group_name=group_name,
             document_name=document_name
         )
@@ -78,7 +81,8 @@ class DeleteContentRoute(CriaRoute):
         return self.ResponseModel(
             code="SUCCESS",
             status=200,
-            message="Successfully deleted & de-indexed the content."
+            message="Started deleting & de-indexing the content.",
+            job=job
         )
 
 
@@ -14,9 +14,10 @@ You should have received a copy of the GNU General Public License along with Cri
 
 """
 
-from typing import Optional, Union
+import json
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Security
+from fastapi import APIRouter, Depends, Security
 from fastapi_utils.cbv import cbv
 from starlette.requests import Request
 
@@ -24,15 +25,17 @@ from app.controllers.schemas import catch_exceptions, exception_response, APIRes
     INVALID_REQUEST, ERROR, UNAUTHORIZED
 from app.core.security import check_group_auth, api_key_query, api_key_header, \
     handle_none_str, BadAPIKeyException
-from app.core.config import SEARCH_INDEX_LIMIT_DAY, SEARCH_INDEX_LIMIT_HOUR, SEARCH_INDEX_LIMIT_MINUTE
+from app.core.config import SEARCH_INDEX_LIMIT_DAY, SEARCH_INDEX_LIMIT_HOUR, SEARCH_INDEX_LIMIT_MINUTE, \
+    SEARCH_BATCH_MAX_SIZE
 from app.core.route import CriaRoute
-from app.core.schemas import index_search_limiter
+from app.core.limiter import index_search_limiter
 from criadex.group import Group
 
 # Legacy import removed. Define locally:
 class EmptyPromptError(Exception):
     pass
 from criadex.index.schemas import IndexResponse, SearchConfig
+from criadex.index.ragflow_objects.filters import InvalidSearchFilterError
 from criadex.schemas import GroupNotFoundError
 
 view = APIRouter()
@@ -43,6 +46,42 @@ class ContentSearchResponse(APIResponse):
     response: Optional[IndexResponse] = None
 
 
+class ContentSearchBatchResponse(APIResponse):
+    code: Union[SUCCESS, GROUP_NOT_FOUND, INVALID_REQUEST, UNAUTHORIZED, ERROR]
+    responses: Optional[List[IndexResponse]] = None
+
+
+async def search_batch_size(request: Request) -> int:
+    """
+    Size a batch search for its rate-limit cost. slowapi evaluates costs before the route runs, passing them only the
+    request, so the size is stored on the request's state.
+
+    :param request: The batch search request
+    :return: The number of queries in the batch (min. 1)
+
+    """
+
+    try:
+        body = json.loads(await request.body() or b"[]")
+    except ValueError:
+        body = None
+
+    request.state.search_batch_size = max(1, len(body)) if isinstance(body, list) else 1
+    return request.state.search_batch_size
+
+
+def search_batch_cost(request: Request) -> int:
+    """
+    Rate-limit cost of a batch search, i.e. one hit per query
+
+    :param request: The batch search request, sized by search_batch_size
+    :return: The number of queries in the batch (min. 1)
+
+    """
+
+    return getattr(request.state, "search_batch_size", 1)
+
+
 @cbv(view)
 class SearchContentRoute(CriaRoute):
     ResponseModel = ContentSearchResponse
@@ -64,6 +103,14 @@ class SearchContentRoute(CriaRoute):
             message="The prompt supplied was empty."
         )
     )
+    @exception_response(
+        InvalidSearchFilterError,
+        ResponseModel(
+            code="INVALID_REQUEST",
+            status=400,
+            message="The search filter supplied was invalid."
+        )
+    )
     @index_search_limiter.limit(SEARCH_INDEX_LIMIT_DAY)
     @index_search_limiter.limit(SEARCH_INDEX_LIMIT_HOUR)
     @index_search_limiter.limit(SEARCH_INDEX_LIMIT_MINUTE)
@@ -110,4 +157,88 @@ class SearchContentRoute(CriaRoute):
         )
 
 
+@cbv(view)
+class SearchContentBatchRoute(CriaRoute):
+    ResponseModel = ContentSearchBatchResponse
+
+    @view.post(
+        path="/groups/{group_name}/content/search/batch",
+        name="Batch Search an Index",
+        summary="Batch Search an Index",
+        description="Search an index with several queries in one request. Each query counts against the rate limit.",
+    )
+    @catch_exceptions(
+        ResponseModel
+    )
+    @exception_response(
+        EmptyPromptError,
+        ResponseModel(
+            code="INVALID_REQUEST",
+            status=400,
+            message="The prompt supplied was empty."
+        )
+    )
+    @exception_response(
+        InvalidSearchFilterError,
+        ResponseModel(
+            code="INVALID_REQUEST",
+            status=400,
+            message="The search filter supplied was invalid."
+        )
+    )
+    @index_search_limiter.limit(SEARCH_INDEX_LIMIT_DAY, cost=search_batch_cost)
+    @index_search_limiter.limit(SEARCH_INDEX_LIMIT_HOUR, cost=search_batch_cost)
+    @index_search_limiter.limit(SEARCH_INDEX_LIMIT_MINUTE, cost=search_batch_cost)
+    async def execute(
+            self,
+            request: Request,
+            group_name: str,
+            configs: List[SearchConfig],
+            _api_key_query: Optional[str] = Security(api_key_query),
+            _api_key_header: Optional[str] = Security(api_key_header),
+            _batch_size: int = Depends(search_batch_size),
+    ) -> ResponseModel:
+
+        if not 0 < len(configs) <= SEARCH_BATCH_MAX_SIZE:
+            return self.ResponseModel(
+                code="INVALID_REQUEST",
+                status=400,
+                message=f"A batch must contain between 1 and {SEARCH_BATCH_MAX_SIZE} queries."
+            )
+
+        # Grab the group
+        try:
+            group: Group = await request.app.criadex.get(name=group_name)
+        except GroupNotFoundError:
+            return self.ResponseModel(
+                code="GROUP_NOT_FOUND",
+                status=404,
+                message=f"The requested index group '{group_name}' was not found!"
+            )
+
+        # Must perform extra auth for the extra_groups parameter of every query
+        api_key: str = handle_none_str(_api_key_header) or handle_none_str(_api_key_query)
+        extra_groups: List[str] = list({name for config in configs for name in config.extra_groups or []})
+
+        try:
+            await check_group_auth(request, api_key=api_key, group_names=extra_groups)
+        except BadAPIKeyException as ex:
+            return self.ResponseModel(
+                code="UNAUTHORIZED",
+                status=401,
+                message=ex.detail
+            )
+
+        # Now search
+        responses: List[IndexResponse] = await group.search_many(group_name, configs)
+
+        # Success!
+        return self.ResponseModel(
+            code="SUCCESS",
+            status=200,
+            message="Successfully retrieved searched the index for the requested content.",
+            responses=responses
+        )
+
+
 __all__ = ["view"]
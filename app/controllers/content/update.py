@@ -23,17 +23,17 @@ from starlette.requests import Request
 
 from app.controllers.content.upload import ContentUploadResponse, ContentUploadConfig
 from app.controllers.schemas import catch_exceptions, exception_response, SUCCESS, \
-    GROUP_NOT_FOUND, INVALID_FILE_DATA, FILE_NOT_FOUND, ERROR
+    GROUP_NOT_FOUND, INVALID_FILE_DATA, FILE_NOT_FOUND, DUPLICATE, ERROR
 from app.core.route import CriaRoute
 from criadex.group import Group
 from criadex.index.schemas import Bundle, BundleConfig
-from criadex.schemas import GroupNotFoundError, DocumentNotFoundError
+from criadex.schemas import GroupNotFoundError, DocumentNotFoundError, DeletionRunningError
 
 view = APIRouter()
 
 
 class ContentUpdateResponse(ContentUploadResponse):
-    code: Union[SUCCESS, GROUP_NOT_FOUND, INVALID_FILE_DATA, FILE_NOT_FOUND, ERROR]
+    code: Union[SUCCESS, GROUP_NOT_FOUND, INVALID_FILE_DATA, FILE_NOT_FOUND, DUPLICATE, ERROR]
     token_usage: Optional[int] = None
 
 
@@ -91,6 +91,12 @@ class UpdateContentRoute(CriaRoute):
                 status=404,
                 message="Requested content does not exist in the database."
             )
+        except DeletionRunningError:
+            return self.ResponseModel(
+                code="DUPLICATE",
+                status=409,
+                message="The requested content is still being deleted. Try again once its deletion completes."
+            )
         except Exception as e:
             # Catch any other unexpected errors
             return self.ResponseModel(
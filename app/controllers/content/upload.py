@@ -21,18 +21,18 @@ from fastapi_utils.cbv import cbv
 from pydantic import ValidationError
 from starlette.requests import Request
 
-from app.controllers.schemas import catch_exceptions, exception_response, APIResponse, SUCCESS, GROUP_NOT_FOUND, INVALID_FILE_DATA, DUPLICATE, ERROR
+from app.controllers.schemas import catch_exceptions, exception_response, APIResponse, SUCCESS, GROUP_NOT_FOUND, INVALID_FILE_DATA, INVALID_MODEL, DUPLICATE, ERROR
 from app.core.route import CriaRoute
 from criadex.group import Group
 from criadex.index.base_api import ContentUploadConfig
 from criadex.index.schemas import Bundle, BundleConfig
-from criadex.schemas import GroupNotFoundError, DocumentExistsError
+from criadex.schemas import GroupNotFoundError, DocumentExistsError, DeletionRunningError, EmbeddingDimensionsError
 
 view = APIRouter()
 
 
 class ContentUploadResponse(APIResponse):
-    code: Union[SUCCESS, GROUP_NOT_FOUND, INVALID_FILE_DATA, DUPLICATE, ERROR]
+    code: Union[SUCCESS, GROUP_NOT_FOUND, INVALID_FILE_DATA, INVALID_MODEL, DUPLICATE, ERROR]
     token_usage: Optional[int] = None
     document_name: Optional[str] = None
 
@@ -92,6 +92,18 @@ class UploadContentRoute(CriaRoute):
                 status=409,
                 message="Requested content already exists in the database."
             )
+        except DeletionRunningError:
+            return self.ResponseModel(
+                code="DUPLICATE",
+                status=409,
+                message="The requested content is still being deleted. Try again once its deletion completes."
+            )
+        except EmbeddingDimensionsError as e:
+            return self.ResponseModel(
+                code="INVALID_MODEL",
+                status=400,
+                message=f"The embeddings don't fit the group's index: {e}"
+            )
         except Exception as e:
             # Catch any other unexpected errors
             return self.ResponseModel(
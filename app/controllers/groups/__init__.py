@@ -20,7 +20,7 @@ from app.core.security import get_api_key_master
 from app.core import config
 from app.core.schemas import AppMode
 from app.core.route import CriaRouter
-from . import about, create, delete, query
+from . import about, create, delete, deletions, ingestion, query, reindex
 
 router = CriaRouter(
     tags=["Group Management"],
@@ -31,7 +31,10 @@ router.include_views(
     create.view,
     delete.view,
     about.view,
-    query.view
+    query.view,
+    reindex.view,
+    ingestion.view,
+    deletions.view
 )
 
 __all__ = ["router"]
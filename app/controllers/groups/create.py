@@ -24,7 +24,7 @@ from app.controllers.schemas import catch_exceptions, APIResponse, SUCCESS, DUPL
     ERROR
 from app.core.route import CriaRoute
 from criadex.criadex import Criadex
-from criadex.schemas import GroupConfig, GroupExistsError, PartialGroupConfig
+from criadex.schemas import GroupConfig, GroupExistsError, PartialGroupConfig, EmbeddingDimensionsError
 
 view = APIRouter()
 
@@ -84,6 +84,13 @@ class CreateGroupRoute(CriaRoute):
                 message=f"The requested group '{config.name}' already exists!",
                 config=config
             )
+        except EmbeddingDimensionsError as ex:
+            return self.ResponseModel(
+                code="INVALID_MODEL",
+                status=400,
+                message=str(ex),
+                config=config
+            )
 
         # Success!
         return self.ResponseModel(
@@ -14,7 +14,7 @@ You should have received a copy of the GNU General Public License along with Cri
 
 """
 
-from typing import Union
+from typing import Optional, Union
 
 from fastapi import APIRouter
 from fastapi_utils.cbv import cbv
@@ -22,6 +22,7 @@ from starlette.requests import Request
 
 from app.controllers.schemas import catch_exceptions, exception_response, APIResponse, SUCCESS, GROUP_NOT_FOUND, ERROR
 from app.core.route import CriaRoute
+from criadex.index.ragflow_objects.deletion import DeletionJob
 from criadex.schemas import GroupNotFoundError
 
 view = APIRouter()
@@ -29,6 +30,7 @@ view = APIRouter()
 
 class GroupDeleteResponse(APIResponse):
     code: Union[SUCCESS, GROUP_NOT_FOUND, ERROR]
+    job: Optional[DeletionJob] = None
 
 
 @cbv(view)
@@ -66,11 +68,12 @@ class DeleteGroupRoute(CriaRoute):
             )
         await request.app.auth.group_authorizations.delete_all_by_group_id(group_id=group_id)
 
-        await request.app.criadex.delete(name=group_name)
+        job: DeletionJob = await request.app.criadex.delete(name=group_name)
 
         # Success!
         return self.ResponseModel(
             code="SUCCESS",
             status=200,
-            message="Successfully deleted the index group."
+            message="Successfully deleted the index group." if job.status == "completed" else "Started deleting the index group.",
+            job=job
         )
@@ -0,0 +1,68 @@
+"""
+
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+"""
+
+from typing import Union, Optional
+
+from fastapi import APIRouter
+from fastapi_utils.cbv import cbv
+from starlette.requests import Request
+
+from app.controllers.schemas import catch_exceptions, APIResponse, SUCCESS, NOT_FOUND, ERROR
+from app.core.route import CriaRoute
+from criadex.index.ragflow_objects.deletion import DeletionJob
+
+view = APIRouter()
+
+
+class GroupDeletionResponse(APIResponse):
+    code: Union[SUCCESS, NOT_FOUND, ERROR]
+    job: Optional[DeletionJob] = None
+
+
+@cbv(view)
+class DeletionStatusRoute(CriaRoute):
+    ResponseModel = GroupDeletionResponse
+
+    @view.get(
+        path="/groups/{group_name}/deletions/{job_id}",
+        name="Get Deletion Status",
+        summary="Get Deletion Status",
+        description="Get the status of a group or file deletion started by one of the delete endpoints.",
+    )
+    @catch_exceptions(
+        ResponseModel
+    )
+    async def execute(
+            self,
+            request: Request,
+            group_name: str,
+            job_id: str
+    ) -> ResponseModel:
+        job: Optional[DeletionJob] = await request.app.criadex.deletion(group_name=group_name, job_id=job_id)
+
+        if job is None:
+            return self.ResponseModel(
+                code="NOT_FOUND",
+                status=404,
+                message="The group has no such deletion job."
+            )
+
+        return self.ResponseModel(
+            code="SUCCESS",
+            status=200,
+            message=f"The deletion is {job.status}.",
+            job=job
+        )
@@ -0,0 +1,101 @@
+"""
+
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+"""
+
+from typing import Union
+
+from fastapi import APIRouter, Query
+from fastapi_utils.cbv import cbv
+from starlette.requests import Request
+
+from app.controllers.schemas import catch_exceptions, exception_response, APIResponse, SUCCESS, GROUP_NOT_FOUND, NOT_FOUND, ERROR
+from app.core.route import CriaRoute
+from criadex.schemas import GroupNotFoundError
+
+view = APIRouter()
+
+
+class GroupIngestionResponse(APIResponse):
+    code: Union[SUCCESS, GROUP_NOT_FOUND, NOT_FOUND, ERROR]
+
+
+@cbv(view)
+class BeginIngestionRoute(CriaRoute):
+    ResponseModel = GroupIngestionResponse
+
+    @view.post(
+        path="/groups/{group_name}/ingestion",
+        name="Begin Group Ingestion",
+        summary="Begin Group Ingestion",
+        description="Put a group in ingestion mode for a large import. Uploads stop refreshing the index, "
+                    "so they become searchable when ingestion ends (or expires). Calling again renews it.",
+    )
+    @exception_response(
+        GroupNotFoundError,
+        ResponseModel(
+            code="GROUP_NOT_FOUND",
+            status=404,
+            message="The requested index group does not exist!"
+        )
+    )
+    @catch_exceptions(
+        ResponseModel
+    )
+    async def execute(
+            self,
+            request: Request,
+            group_name: str,
+            expire_after: int = Query(default=3600, ge=1, le=86400)
+    ) -> ResponseModel:
+        await request.app.criadex.begin_ingestion(name=group_name, expire_after=expire_after)
+
+        return self.ResponseModel(
+            code="SUCCESS",
+            status=200,
+            message=f"The group is in ingestion mode for up to {expire_after} seconds."
+        )
+
+
+@cbv(view)
+class EndIngestionRoute(CriaRoute):
+    ResponseModel = GroupIngestionResponse
+
+    @view.delete(
+        path="/groups/{group_name}/ingestion",
+        name="End Group Ingestion",
+        summary="End Group Ingestion",
+        description="End a group's ingestion mode, restoring its refresh interval & making the import searchable.",
+    )
+    @catch_exceptions(
+        ResponseModel
+    )
+    async def execute(
+            self,
+            request: Request,
+            group_name: str
+    ) -> ResponseModel:
+        if not await request.app.criadex.end_ingestion(name=group_name):
+            return self.ResponseModel(
+                code="NOT_FOUND",
+                status=404,
+                message="The group is not in ingestion mode."
+            )
+
+        return self.ResponseModel(
+            code="SUCCESS",
+            status=200,
+            message="Ended ingestion mode; the imported content is now searchable."
+        )
+
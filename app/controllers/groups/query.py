@@ -1,16 +1,17 @@
 from typing import Optional, List, Union
 from fastapi import APIRouter, Body, Request
 from fastapi_utils.cbv import cbv
-from app.controllers.schemas import APIResponse, SUCCESS, ERROR, GROUP_NOT_FOUND
+from app.controllers.schemas import APIResponse, SUCCESS, ERROR, GROUP_NOT_FOUND, INVALID_REQUEST
 from app.core.route import CriaRoute
 from criadex.schemas import GroupNotFoundError
 from criadex.index.schemas import SearchConfig, IndexResponse, TextNodeWithScore, Asset
+from criadex.index.ragflow_objects.filters import InvalidSearchFilterError
 
 view = APIRouter()
 
 
 class GroupQueryResponse(APIResponse, IndexResponse):
-    code: Union[SUCCESS, GROUP_NOT_FOUND, ERROR]
+    code: Union[SUCCESS, GROUP_NOT_FOUND, INVALID_REQUEST, ERROR]
 
 
 @cbv(view)
@@ -49,6 +50,15 @@ class QueryGroupRoute(CriaRoute):
                 assets=[],
                 search_units=0
             )
+        except InvalidSearchFilterError as e:
+            return self.ResponseModel(
+                code="INVALID_REQUEST",
+                status=400,
+                message=f"The search filter supplied was invalid: {str(e)}",
+                nodes=[],
+                assets=[],
+                search_units=0
+            )
         except Exception as e:
             return self.ResponseModel(
                 code="ERROR",
@@ -0,0 +1,130 @@
+"""
+
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+"""
+
+from typing import Union, Optional
+
+from fastapi import APIRouter, Query
+from fastapi_utils.cbv import cbv
+from starlette.requests import Request
+
+from app.controllers.schemas import catch_exceptions, exception_response, APIResponse, SUCCESS, GROUP_NOT_FOUND, DUPLICATE, INVALID_REQUEST, ERROR
+from app.core.route import CriaRoute
+from criadex.index.ragflow_objects.reindex import ReindexProgress
+from criadex.schemas import GroupNotFoundError, ReindexRunningError, VectorIndexType
+
+view = APIRouter()
+
+
+class GroupReindexResponse(APIResponse):
+    code: Union[SUCCESS, GROUP_NOT_FOUND, DUPLICATE, INVALID_REQUEST, ERROR]
+    progress: Optional[ReindexProgress] = None
+
+
+@cbv(view)
+class ReindexGroupRoute(CriaRoute):
+    ResponseModel = GroupReindexResponse
+
+    @view.post(
+        path="/groups/{group_name}/reindex",
+        name="Re-embed a Group",
+        summary="Re-embed a Group",
+        description="Re-embed every node of a group into a new index in the background, then swap it in. "
+                    "Searches keep working throughout. Re-running a failed job resumes it.",
+    )
+    @exception_response(
+        GroupNotFoundError,
+        ResponseModel(
+            code="GROUP_NOT_FOUND",
+            status=404,
+            message="The requested index group does not exist!"
+        )
+    )
+    @exception_response(
+        ReindexRunningError,
+        ResponseModel(
+            code="DUPLICATE",
+            status=409,
+            message="A re-embedding job is already running for this group!"
+        )
+    )
+    @exception_response(
+        ValueError,
+        ResponseModel(
+            code="INVALID_REQUEST",
+            status=400,
+            message="This group does not own its index and cannot be re-embedded!"
+        )
+    )
+    @catch_exceptions(
+        ResponseModel
+    )
+    async def execute(
+            self,
+            request: Request,
+            group_name: str,
+            dims: Optional[int] = Query(default=None, ge=1, le=4096),
+            vector_index: Optional[VectorIndexType] = Query(default=None),
+            batch_size: int = Query(default=256, ge=1, le=10000)
+    ) -> ResponseModel:
+        progress: ReindexProgress = await request.app.criadex.reindex(
+            name=group_name,
+            dims=dims,
+            vector_index=vector_index,
+            batch_size=batch_size
+        )
+
+        return self.ResponseModel(
+            code="SUCCESS",
+            status=200,
+            message=f"Started re-embedding the group into '{progress.target_index}'.",
+            progress=progress
+        )
+
+
+@cbv(view)
+class ReindexProgressRoute(CriaRoute):
+    ResponseModel = GroupReindexResponse
+
+    @view.get(
+        path="/groups/{group_name}/reindex",
+        name="Get Re-embedding Progress",
+        summary="Get Re-embedding Progress",
+        description="Get the progress & throughput of the group's last re-embedding job.",
+    )
+    @exception_response(
+        GroupNotFoundError,
+        ResponseModel(
+            code="GROUP_NOT_FOUND",
+            status=404,
+            message="The requested index group does not exist!"
+        )
+    )
+    @catch_exceptions(
+        ResponseModel
+    )
+    async def execute(
+            self,
+            request: Request,
+            group_name: str
+    ) -> ResponseModel:
+        progress: Optional[ReindexProgress] = await request.app.criadex.reindex_progress(name=group_name)
+
+        return self.ResponseModel(
+            code="SUCCESS",
+            status=200,
+            message="The group has never been re-embedded." if progress is None else f"The re-embedding job is {progress.status}.",
+            progress=progress
+        )
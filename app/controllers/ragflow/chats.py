@@ -1,8 +1,8 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from fastapi import APIRouter
 from fastapi_restful.cbv import cbv
 from starlette.requests import Request
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.controllers.schemas import catch_exceptions, APIResponse
 from criadex.schemas import SUCCESS
@@ -21,6 +21,14 @@ class EnsureDialogResponse(APIResponse):
     created: Optional[bool] = False
 
 
+class EnsureDialogsRequest(EnsureDialogRequest):
+    chat_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class EnsureDialogsResponse(APIResponse):
+    dialogs: Dict[str, bool] = Field(default_factory=dict)
+
+
 @cbv(view)
 class RagflowChatsRoute(CriaRoute):
     ResponseModel = EnsureDialogResponse
@@ -40,9 +48,9 @@ class RagflowChatsRoute(CriaRoute):
     ) -> ResponseModel:
         """Ensure a dialog exists in Ragflow for the given chat_id."""
         try:
-            from criadex.index.ragflow_objects.chat import RagflowChatAgent
-            
-            agent = RagflowChatAgent()
+            from app.controllers.agents.ragflow_agents.chat import get_ragflow_chat_agent
+
+            agent = get_ragflow_chat_agent(request)
             success = await agent.ensure_dialog_exists(
                 chat_id=chat_id,
                 tenant_id=payload.tenant_id,
@@ -66,4 +74,45 @@ class RagflowChatsRoute(CriaRoute):
             )
 
 
+@cbv(view)
+class RagflowChatsBulkRoute(CriaRoute):
+    ResponseModel = EnsureDialogsResponse
+
+    @view.post(
+        path="/chats/ensure",
+        name="Ensure Ragflow Dialogs Exist",
+        summary="Ensure Ragflow dialogs exist for many chat IDs",
+        description="Ensure Ragflow dialogs exist for many chat IDs at once. Creates the missing ones.",
+    )
+    @catch_exceptions(ResponseModel)
+    async def execute(
+        self,
+        request: Request,
+        payload: EnsureDialogsRequest
+    ) -> ResponseModel:
+        """Ensure dialogs exist in Ragflow for every chat_id in the payload."""
+        from app.controllers.agents.ragflow_agents.chat import get_ragflow_chat_agent
+
+        dialogs: Dict[str, bool] = await get_ragflow_chat_agent(request).ensure_dialogs_exist(
+            chat_ids=payload.chat_ids,
+            tenant_id=payload.tenant_id,
+            llm_id=payload.llm_id or "gpt-3.5-turbo"
+        )
+
+        if not all(dialogs.values()):
+            return self.ResponseModel(
+                code="ERROR",
+                status=500,
+                message="Failed to ensure some dialogs",
+                dialogs=dialogs
+            )
+
+        return self.ResponseModel(
+            code=SUCCESS,
+            status=200,
+            message="Dialogs ensured successfully",
+            dialogs=dialogs
+        )
+
+
 __all__ = ["view"]
@@ -16,6 +16,9 @@ You should have received a copy of the GNU General Public License along with Cri
 
 from typing import Optional
 
+import asyncio
+
+import httpx
 from fastapi import FastAPI
 from slowapi.errors import RateLimitExceeded
 from starlette.datastructures import State
@@ -25,11 +28,14 @@ from starlette.responses import JSONResponse
 
 from app.controllers.__init__ import router
 from app.core.security import BadAPIKeyException, unauthorized_exception_handler
+from criadex.agent.azure.language import LanguageAgent
 from criadex.criadex import Criadex
+from criadex.index.ragflow_objects.chat import RagflowChatAgent
 from . import config
 from .database.api import AuthDatabaseAPI
-from .middleware import StatusMiddleware
-from .schemas import index_search_limiter, model_query_limiter, AppMode
+from .middleware import StatusMiddleware, StatusJSONResponse
+from .limiter import index_search_limiter, model_query_limiter
+from .schemas import AppMode
 from ..controllers.schemas import RateLimitResponse
 
 
@@ -63,6 +69,11 @@ class CriadexAPI(FastAPI):
         self.criadex = criadex
         self.auth = None
 
+        # Ragflow Setup (created in the lifespan, i.e. after any worker fork)
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.ragflow_chat_agent: Optional[RagflowChatAgent] = None
+        self.language_preload: Optional[asyncio.Task] = None
+
     @classmethod
     def create(
         cls,
@@ -85,6 +96,7 @@ class CriadexAPI(FastAPI):
             ),
             docs_url=None,
             openapi_url=None,
+            default_response_class=StatusJSONResponse,
             lifespan=cls.app_lifespan
         )
 
@@ -147,8 +159,9 @@ class CriadexAPI(FastAPI):
         # Still replies in the correct APIResponse format
         response: JSONResponse = JSONResponse(
             content=RateLimitResponse(
+                code="RATE_LIMIT",
                 message="You hit the rate limit for this (to prevent accidents or abuse costing $20,000 in a day)"
-            ).json(),
+            ).dict(),
             status_code=429
         )
 
@@ -201,6 +214,9 @@ class CriadexAPI(FastAPI):
         yield
 
         criadex_api.logger.info("Shutting down Criadex...")
+        await criadex_api.http_client.aclose()
+        criadex_api.ragflow_chat_agent.db_pool.close()
+        await criadex_api.ragflow_chat_agent.db_pool.wait_closed()
 
     @classmethod
     async def _initialize(
@@ -211,3 +227,35 @@ class CriadexAPI(FastAPI):
         criadex_api.auth = AuthDatabaseAPI(pool=criadex_api.criadex.mysql_api.pool)
         await criadex_api.auth.initialize()
 
+        criadex_api.http_client = cls.create_http_client()
+        criadex_api.ragflow_chat_agent = RagflowChatAgent(
+            client=criadex_api.http_client,
+            db_pool=await RagflowChatAgent.create_db_pool()
+        )
+
+        if config.LANGUAGE_DETECTOR_PRELOAD:
+            criadex_api.language_preload = asyncio.create_task(LanguageAgent.preload())
+
+    @classmethod
+    def create_http_client(cls) -> httpx.AsyncClient:
+        """
+        Create the pooled HTTP client used for upstream (Ragflow) calls, so requests reuse keep-alive connections
+
+        :return: The client
+
+        """
+
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.RAGFLOW_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.RAGFLOW_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=config.RAGFLOW_HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(
+                connect=config.RAGFLOW_HTTP_CONNECT_TIMEOUT,
+                read=config.RAGFLOW_HTTP_READ_TIMEOUT,
+                write=config.RAGFLOW_HTTP_WRITE_TIMEOUT,
+                pool=config.RAGFLOW_HTTP_POOL_TIMEOUT
+            )
+        )
+
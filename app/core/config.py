@@ -15,6 +15,7 @@ You should have received a copy of the GNU General Public License along with Cri
 """
 
 import os
+import tempfile
 from pathlib import Path
 from typing import Optional
 
@@ -29,6 +30,7 @@ ENV_LOADED: bool = load_dotenv(dotenv_path=check_env_path(ENV_PATH))
 APP_MODE: AppMode = AppMode[os.environ.get('APP_API_MODE', AppMode.TESTING.name)]
 APP_HOST: str = "0.0.0.0"
 APP_PORT: int = int(os.environ.get('APP_API_PORT', 25574))
+APP_WORKERS: int = max(1, int(os.environ.get('APP_API_WORKERS', 1)))
 APP_TITLE: str = "Criadex 📁"
 APP_VERSION = "1.0.0"
 DOCS_URL: str = "/"
@@ -40,12 +42,30 @@ APP_INITIAL_MASTER_KEY: Optional[str] = os.environ.get("APP_INITIAL_MASTER_KEY")
 SEARCH_INDEX_LIMIT_MINUTE: str = (os.environ.get("SEARCH_INDEX_LIMIT_MINUTE") or "30") + "/minute"
 SEARCH_INDEX_LIMIT_HOUR: str = (os.environ.get("SEARCH_INDEX_LIMIT_HOUR") or "250") + "/hour"
 SEARCH_INDEX_LIMIT_DAY: str = (os.environ.get("SEARCH_INDEX_LIMIT_DAY") or "1500") + "/day"
+SEARCH_BATCH_MAX_SIZE: int = int(os.environ.get("SEARCH_BATCH_MAX_SIZE") or 25)
 
 # Query Rate Limit
 QUERY_MODEL_RATE_LIMIT_MINUTE: str = SEARCH_INDEX_LIMIT_MINUTE
 QUERY_MODEL_RATE_LIMIT_HOUR: str = SEARCH_INDEX_LIMIT_HOUR
 QUERY_MODEL_RATE_LIMIT_DAY: str = SEARCH_INDEX_LIMIT_DAY
 
+# Rate Limit Storage (must be shared when running more than one worker, or each worker enforces its own limits)
+RATE_LIMIT_STORAGE_URL: str = os.environ.get("RATELIMIT_STORAGE_URL") or (
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'criadex-rate-limits.sqlite3')}" if APP_WORKERS > 1 else "memory://"
+)
+
+# Ragflow HTTP Client (one pooled client per worker, shared by all requests)
+RAGFLOW_HTTP_MAX_CONNECTIONS: int = int(os.environ.get("RAGFLOW_HTTP_MAX_CONNECTIONS") or 100)
+RAGFLOW_HTTP_MAX_KEEPALIVE: int = int(os.environ.get("RAGFLOW_HTTP_MAX_KEEPALIVE") or 20)
+RAGFLOW_HTTP_KEEPALIVE_EXPIRY: float = float(os.environ.get("RAGFLOW_HTTP_KEEPALIVE_EXPIRY") or 30)
+RAGFLOW_HTTP_CONNECT_TIMEOUT: float = float(os.environ.get("RAGFLOW_HTTP_CONNECT_TIMEOUT") or 5)
+RAGFLOW_HTTP_READ_TIMEOUT: float = float(os.environ.get("RAGFLOW_HTTP_READ_TIMEOUT") or 30)
+RAGFLOW_HTTP_WRITE_TIMEOUT: float = float(os.environ.get("RAGFLOW_HTTP_WRITE_TIMEOUT") or 10)
+RAGFLOW_HTTP_POOL_TIMEOUT: float = float(os.environ.get("RAGFLOW_HTTP_POOL_TIMEOUT") or 5)
+
+# Build the language detector in the background after startup, instead of on the first detection
+LANGUAGE_DETECTOR_PRELOAD: bool = os.environ.get("LANGUAGE_DETECTOR_PRELOAD", "false").lower() == "true"
+
 # Swagger Config
 SWAGGER_TITLE: str = "Criadex API"
 SWAGGER_FAVICON: str = "https://i.imgur.com/9XOI3qg.png"
@@ -63,6 +83,21 @@ ELASTICSEARCH_CREDENTIALS: ElasticsearchCredentials = ElasticsearchCredentials(
     password=os.environ.get("ELASTICSEARCH_PASSWORD")
 )
 
+# Primary shards per group index, & how many of them one group's routing value may spread over (unset = one shard; only applied with group routing)
+ELASTICSEARCH_SHARDS: int = int(os.environ.get("ELASTICSEARCH_SHARDS") or 1)
+ELASTICSEARCH_ROUTING_PARTITION_SIZE: Optional[int] = int(os.environ["ELASTICSEARCH_ROUTING_PARTITION_SIZE"]) if os.environ.get("ELASTICSEARCH_ROUTING_PARTITION_SIZE") else None
+
+# Route each group's documents by group name, so group searches & deletes only hit that group's shard(s)
+ELASTICSEARCH_GROUP_ROUTING: bool = os.environ.get("ELASTICSEARCH_GROUP_ROUTING", "false").lower() == "true"
+
+# Index layout: "group" (an index per group, dropped with the group) or "shared" (one shared index, filtered aliases)
+ELASTICSEARCH_INDEX_LAYOUT: str = os.environ.get("ELASTICSEARCH_INDEX_LAYOUT") or "group"
+
+# Refresh policy ("false", "wait_for" or "true") per write: each node, the last node of each file (one refresh per file) & deletes
+ELASTICSEARCH_REFRESH_INSERT: str = os.environ.get("ELASTICSEARCH_REFRESH_INSERT") or "false"
+ELASTICSEARCH_REFRESH_FILE: str = os.environ.get("ELASTICSEARCH_REFRESH_FILE") or "wait_for"
+ELASTICSEARCH_REFRESH_DELETE: str = os.environ.get("ELASTICSEARCH_REFRESH_DELETE") or "true"
+
 # MySQL Config
 MYSQL_CREDENTIALS: MySQLCredentials = MySQLCredentials(
     host=os.environ["MYSQL_HOST"],
@@ -105,7 +105,8 @@ class Authorizations(Table):
             )
 
             return AuthorizationsModel.from_results(
-                await cursor.fetchone()
+                await cursor.fetchone(),
+                trusted=True
             )
 
     async def exists(self, key: str) -> bool:
@@ -121,13 +121,9 @@ class GroupAuthorizations(Table):
                 (authorization_id,)
             )
 
-        results: Optional[Tuple[tuple]] = await cursor.fetchall()
+            results: Optional[Tuple[tuple]] = await cursor.fetchall()
 
-        return list(
-            GroupAuthorizationsModel.from_results(result)
-            for result in results
-            if result is not None
-        ) if results is not None else list()
+        return GroupAuthorizationsModel.from_results_many(results, trusted=True)
 
     async def retrieve_by_group_id(self, group_id: str) -> List[GroupAuthorizationsModel]:
         """
@@ -146,13 +142,9 @@ class GroupAuthorizations(Table):
                 (group_id,)
             )
 
-        results: Optional[Tuple[tuple]] = await cursor.fetchall()
+            results: Optional[Tuple[tuple]] = await cursor.fetchall()
 
-        return list(
-            GroupAuthorizationsModel.from_results(result)
-            for result in results
-            if result is not None
-        ) if results is not None else list()
+        return GroupAuthorizationsModel.from_results_many(results, trusted=True)
 
     async def exists(self, group_id: int, authorization_id: int) -> bool:
         """
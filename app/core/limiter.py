@@ -0,0 +1,220 @@
+"""
+
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     Isaac Kogan
+@copyright  2024 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+"""
+
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple, Type
+
+from limits.errors import ConfigurationError
+from limits.storage import Storage
+from slowapi import Limiter
+
+from app.core import config
+
+
+class SQLiteStorage(Storage):
+    """
+    Rate limit storage backed by a local SQLite file, so every worker process on a host shares the same counters.
+    Supports the fixed-window strategy (slowapi's default). URI format: sqlite:///absolute/path/to/file.sqlite3
+
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    """How often (in increments) expired counters get purged"""
+    PURGE_EVERY: int = 1000
+
+    """The oldest SQLite with INSERT ... RETURNING, which incr() relies on"""
+    MIN_SQLITE_VERSION: Tuple[int, int, int] = (3, 35, 0)
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, timeout: float = 5.0, **options):
+        """
+        Instantiate the storage. Connections are opened lazily, per-process, so the storage survives a fork.
+
+        :param uri: The sqlite:// URI
+        :param wrap_exceptions: Whether to wrap storage exceptions in limits' StorageError
+        :param timeout: Seconds to wait on a locked database
+
+        """
+
+        if sqlite3.sqlite_version_info < self.MIN_SQLITE_VERSION:
+            raise ConfigurationError(
+                f"The sqlite:// rate limit storage needs SQLite >= {'.'.join(map(str, self.MIN_SQLITE_VERSION))}, "
+                f"found {sqlite3.sqlite_version}"
+            )
+
+        self._path: str = uri.removeprefix("sqlite://") or ":memory:"
+        self._timeout: float = float(timeout)
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._increments: int = 0
+
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self) -> Type[Exception] | Tuple[Type[Exception], ...]:
+        return sqlite3.Error
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Retrieve this process's connection, (re)opening it after a fork
+
+        :return: The connection
+
+        """
+
+        if self._connection is not None and self._connection_pid == os.getpid():
+            return self._connection
+
+        connection: sqlite3.Connection = sqlite3.connect(
+            self._path,
+            timeout=self._timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS `RateLimits` "
+            "(`key` TEXT PRIMARY KEY, `value` INTEGER NOT NULL, `expiry` REAL NOT NULL)"
+        )
+
+        self._connection, self._connection_pid = connection, os.getpid()
+        return connection
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """
+        Increment the counter for a rate limit key, starting a new window if the old one expired
+
+        :param key: The key to increment
+        :param expiry: Seconds until the key expires
+        :param amount: The amount to increment by
+        :return: The new counter value
+
+        """
+
+        now: float = time.time()
+
+        with self._lock:
+            connection: sqlite3.Connection = self._connect()
+
+            # Single statement, so the read-modify-write is atomic across processes
+            value: int = connection.execute(
+                "INSERT INTO `RateLimits` (`key`, `value`, `expiry`) VALUES (?, ?, ?) "
+                "ON CONFLICT(`key`) DO UPDATE SET "
+                "`value` = CASE WHEN `expiry` <= ? THEN excluded.`value` ELSE `value` + excluded.`value` END, "
+                "`expiry` = CASE WHEN `expiry` <= ? THEN excluded.`expiry` ELSE `expiry` END "
+                "RETURNING `value`",
+                (key, amount, now + expiry, now, now)
+            ).fetchone()[0]
+
+            self._increments += 1
+            if self._increments % self.PURGE_EVERY == 0:
+                connection.execute("DELETE FROM `RateLimits` WHERE `expiry` <= ?", (now,))
+
+        return value
+
+    def get(self, key: str) -> int:
+        """
+        Get the counter value for a rate limit key
+
+        :param key: The key
+        :return: The counter value (0 if expired or missing)
+
+        """
+
+        with self._lock:
+            result: Optional[tuple] = self._connect().execute(
+                "SELECT `value` FROM `RateLimits` WHERE `key`=? AND `expiry` > ?",
+                (key, time.time())
+            ).fetchone()
+
+        return result[0] if result else 0
+
+    def get_expiry(self, key: str) -> float:
+        """
+        Get the expiry timestamp for a rate limit key
+
+        :param key: The key
+        :return: The expiry (now, if expired or missing)
+
+        """
+
+        now: float = time.time()
+
+        with self._lock:
+            result: Optional[tuple] = self._connect().execute(
+                "SELECT `expiry` FROM `RateLimits` WHERE `key`=? AND `expiry` > ?",
+                (key, now)
+            ).fetchone()
+
+        return result[0] if result else now
+
+    def check(self) -> bool:
+        """
+        Check if the storage is healthy
+
+        :return: Whether it is
+
+        """
+
+        try:
+            with self._lock:
+                self._connect().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        """
+        Clear ALL rate limits
+
+        :return: The number of keys cleared
+
+        """
+
+        with self._lock:
+            return self._connect().execute("DELETE FROM `RateLimits`").rowcount
+
+    def clear(self, key: str) -> None:
+        """
+        Clear a single rate limit key
+
+        :param key: The key
+        :return: None
+
+        """
+
+        with self._lock:
+            self._connect().execute("DELETE FROM `RateLimits` WHERE `key`=?", (key,))
+
+
+"""Create a rate limiter for the index group search function to prevent abuse"""
+index_search_limiter: Limiter = Limiter(
+    key_func=lambda request: request.path_params.get('group_name'),
+    storage_uri=config.RATE_LIMIT_STORAGE_URL
+)
+
+"""Create a rate limiter for the model use function to prevent abuse"""
+model_query_limiter: Limiter = Limiter(
+    key_func=lambda request: request.path_params.get('model_id'),
+    storage_uri=config.RATE_LIMIT_STORAGE_URL
+)
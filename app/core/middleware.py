@@ -14,41 +14,109 @@ You should have received a copy of the GNU General Public License along with Cri
 
 """
 
-import json
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from contextvars import ContextVar
+from typing import Any, Optional
 
+try:
+    import orjson
+except ImportError:
+    # Falls back to the stdlib encoder used by Starlette
+    orjson = None
 
-class StatusMiddleware(BaseHTTPMiddleware):
+from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Scope, Receive, Send
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
+"""Whether the request currently being handled asked for (& may receive) stack traces"""
+STACK_TRACE_ENABLED: ContextVar[bool] = ContextVar("STACK_TRACE_ENABLED", default=False)
 
-        response: Response = await call_next(request)
 
-        if response.headers.get('content-type') == 'application/json':
-            return await self.handle_json_status(request, response)
+class StatusMiddleware:
+    """
+    Pure ASGI middleware that flags whether stack traces were requested for the current request.
+    The response body is never buffered or re-parsed. Setting the HTTP status from the `status` field
+    & stripping `error` is done at render time by StatusJSONResponse.
 
-        return response
+    """
 
-    async def handle_json_status(self, request: Request, response: Response):
-        binary = b''
+    STACK_TRACE_HEADER: str = "x-api-stacktrace"
 
-        # noinspection PyUnresolvedReferences
-        async for data in response.body_iterator:
-            binary += data
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
 
-        body: dict = json.loads(binary.decode())
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
 
-        if "error" in body and not self.stack_trace_enabled(request):
-            del body["error"]
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        return JSONResponse(
-            content=body,
-            status_code=body.get('status', response.status_code)
+        token = STACK_TRACE_ENABLED.set(
+            Headers(scope=scope).get(self.STACK_TRACE_HEADER, "") == "true"
         )
 
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            STACK_TRACE_ENABLED.reset(token)
+
     @classmethod
     def stack_trace_enabled(cls, request: Request) -> bool:
-        return request.headers.get("x-api-stacktrace", "") == "true"
+        return request.headers.get(cls.STACK_TRACE_HEADER, "") == "true"
+
+
+class StatusJSONResponse(JSONResponse):
+    """
+    Default response class for the API. Mirrors the `status` field of an APIResponse onto the HTTP status code,
+    and strips the `error` field unless stack traces are enabled for the request.
+    Rendered with orjson when it is installed.
+
+    """
+
+    ORJSON_OPTIONS: int = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+    def __init__(self, content: Any, status_code: int = 200, **kwargs: Any):
+        content, status_code = self.apply_status(content, status_code)
+        super().__init__(content, status_code=status_code, **kwargs)
+
+    @classmethod
+    def apply_status(cls, content: Any, status_code: int) -> tuple[Any, int]:
+        """
+        Apply the APIResponse status semantics to already-serialized (jsonable) content
+
+        :param content: The response content
+        :param status_code: The status code the route wanted
+        :return: The (possibly modified) content & the status code to send
+
+        """
+
+        # Models built by handlers directly (i.e. not serialized by FastAPI)
+        if isinstance(content, BaseModel):
+            content = content.model_dump(mode="json")
+
+        if not isinstance(content, dict):
+            return content, status_code
+
+        if "error" in content and not STACK_TRACE_ENABLED.get():
+            content = {key: value for key, value in content.items() if key != "error"}
+
+        body_status: Optional[int] = content.get("status")
+
+        return content, body_status if isinstance(body_status, int) else status_code
+
+    def render(self, content: Any) -> bytes:
+        """
+        Encode the (jsonable) content. Datetimes are already ISO strings by the time FastAPI hands them over,
+        but orjson encodes raw datetimes identically for content built by hand.
+
+        :param content: The content
+        :return: The encoded body
+
+        """
+
+        if orjson is None:
+            return super().render(content)
+
+        return orjson.dumps(content, option=self.ORJSON_OPTIONS)
@@ -17,14 +17,6 @@ You should have received a copy of the GNU General Public License along with Cri
 import os
 from enum import Enum
 
-from slowapi import Limiter
-
-"""Create a rate limiter for the index group search function to prevent abuse"""
-index_search_limiter: Limiter = Limiter(key_func=lambda request: request.path_params.get('group_name'))
-
-"""Create a rate limiter for the model use function to prevent abuse"""
-model_query_limiter: Limiter = Limiter(key_func=lambda request: request.path_params.get('model_id'))
-
 
 class AppMode(Enum):
     """
@@ -0,0 +1,76 @@
+"""
+
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     Isaac Kogan
+@copyright  2024 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+from gunicorn.app.base import BaseApplication
+
+from app.core import config
+
+
+class CriadexServer(BaseApplication):
+    """
+    Pre-forking gunicorn server running Uvicorn workers. The app is imported ONCE in the master (preload_app)
+    so workers share its memory copy-on-write. Per-process resources (DB pools, ES clients) are still created
+    in each worker's lifespan startup, after the fork.
+
+    """
+
+    def __init__(self, app_uri: str, options: Optional[Dict[str, Any]] = None):
+        """
+        Instantiate the server
+
+        :param app_uri: Import path of the ASGI app, e.g. app.__app__:app
+        :param options: Gunicorn settings overriding the defaults
+
+        """
+
+        self._app_uri: str = app_uri
+        self._options: Dict[str, Any] = {
+            "bind": f"{config.APP_HOST}:{config.APP_PORT}",
+            "workers": config.APP_WORKERS,
+            "worker_class": "uvicorn.workers.UvicornWorker",
+            "preload_app": True,
+            "timeout": 120,
+            "graceful_timeout": 30,
+            **(options or {})
+        }
+
+        super().__init__()
+
+    def load_config(self) -> None:
+        """
+        Apply the options onto the gunicorn config
+
+        :return: None
+
+        """
+
+        for key, value in self._options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self) -> Callable:
+        """
+        Import the ASGI app
+
+        :return: The app
+
+        """
+
+        module_name, attribute = self._app_uri.split(":", 1)
+        module = __import__(module_name, fromlist=[attribute])
+        return getattr(module, attribute)
@@ -0,0 +1,69 @@
+"""
+Benchmark JSON encoding of representative API payloads.
+
+Compares Starlette's stdlib JSONResponse against the orjson-backed StatusJSONResponse,
+both on pre-serialized content (what FastAPI hands the response class) and end-to-end.
+
+Usage: python -m benchmarks.bench_json_response [nodes] [rows]
+
+"""
+
+import sys
+import timeit
+from datetime import datetime
+from typing import List
+
+from starlette.responses import JSONResponse
+
+from app.core.middleware import StatusJSONResponse
+from benchmarks.bench_status_middleware import build_response
+from criadex.database.tables.documents import DocumentsModel
+from criadex.database.tables.groups import GroupsModel
+from criadex.schemas import APIResponse
+
+
+class GroupListResponse(APIResponse):
+    groups: List[GroupsModel]
+    documents: List[DocumentsModel]
+
+
+def build_list_response(row_count: int) -> GroupListResponse:
+    now: datetime = datetime.now()
+
+    return GroupListResponse(
+        groups=[GroupsModel(
+            id=idx, name=f"group-{idx}", type=1, llm_model_id=1, embedding_model_id=2, rerank_model_id=1, created=now
+        ) for idx in range(row_count)],
+        documents=[DocumentsModel(
+            id=idx, name=f"document-{idx}.json", group_id=idx % 50, created=now
+        ) for idx in range(row_count)]
+    )
+
+
+def main(node_count: int = 500, row_count: int = 2_000, repeat: int = 20) -> None:
+    payloads: dict = {
+        f"search ({node_count} nodes)": build_response(node_count),
+        f"list ({row_count} groups + documents)": build_list_response(row_count),
+    }
+
+    for label, payload in payloads.items():
+        # FastAPI serializes the model in JSON mode, then hands the result to the response class
+        content: dict = payload.model_dump(mode="json")
+        size: int = len(JSONResponse(content).body)
+
+        print(f"{label}, {size / 1024:.0f} KiB")
+
+        cases: dict = {
+            "render: JSONResponse (stdlib)": lambda: JSONResponse(content),
+            "render: StatusJSONResponse": lambda: StatusJSONResponse(content),
+            "dump+render: JSONResponse": lambda: JSONResponse(payload.model_dump(mode="json")),
+            "dump+render: StatusJSONResponse": lambda: StatusJSONResponse(payload.model_dump(mode="json")),
+        }
+
+        for case_label, case in cases.items():
+            best: float = min(timeit.repeat(case, number=1, repeat=repeat))
+            print(f"  {case_label:<34} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,83 @@
+"""
+Benchmark per-request overhead of RagflowChatAgent against a local stub Ragflow server.
+
+Compares a new httpx.AsyncClient per request (TCP handshake every turn) against the
+app-scoped pooled client (keep-alive reuse), sequentially and with concurrent requests.
+
+Usage: python -m benchmarks.bench_ragflow_client [requests] [concurrency]
+
+"""
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.app import CriadexAPI
+from criadex.index.ragflow_objects import chat as ragflow_chat
+from criadex.index.ragflow_objects.chat import RagflowChatAgent
+
+HISTORY: list = [{"role": "user", "content": "What are the library hours?"}]
+
+
+async def completions(_) -> JSONResponse:
+    return JSONResponse({
+        "choices": [{"message": {"role": "assistant", "content": "The library is open 8am to 10pm."}}],
+        "usage": {"prompt_tokens": 8, "completion_tokens": 9, "total_tokens": 17}
+    })
+
+
+def start_stub_server() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+
+    app = Starlette(routes=[Route("/api/v1/chats_openai/{chat_id}/chat/completions", completions, methods=["POST"])])
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    while not server.started:
+        time.sleep(0.01)
+
+    return f"http://127.0.0.1:{port}/api/v1/chats_openai/{{chat_id}}/chat/completions"
+
+
+async def run(agent: RagflowChatAgent, request_count: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            await agent.chat("bench-chat", HISTORY, api_key="key")
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(request_count)))
+    return time.perf_counter() - start
+
+
+async def main(request_count: int = 500, concurrency: int = 10) -> None:
+    ragflow_chat.RAGFLOW_API_URL_TEMPLATE = start_stub_server()
+    client = CriadexAPI.create_http_client()
+
+    cases: dict = {
+        "client per request": RagflowChatAgent(),
+        "app-scoped pooled client": RagflowChatAgent(client=client),
+    }
+
+    for parallel in (1, concurrency):
+        print(f"{request_count} requests, concurrency {parallel}")
+        for label, agent in cases.items():
+            await run(agent, 20, parallel)  # Warm up
+            elapsed: float = await run(agent, request_count, parallel)
+            print(f"  {label:<28} {elapsed / request_count * 1000:8.3f} ms/request")
+
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,107 @@
+"""
+Benchmark large search responses through the status middleware stack.
+
+Compares the previous BaseHTTPMiddleware implementation (buffer, json.loads, re-serialize)
+against the pure ASGI StatusMiddleware + StatusJSONResponse.
+
+Usage: python -m benchmarks.bench_status_middleware [nodes] [requests]
+
+"""
+
+import asyncio
+import json
+import sys
+import time
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from app.core.middleware import StatusMiddleware, StatusJSONResponse
+from criadex.index.schemas import IndexResponse, TextNodeWithScore, TextNode
+from criadex.schemas import APIResponse
+
+
+class LegacyStatusMiddleware(BaseHTTPMiddleware):
+    """The buffering implementation this benchmark compares against"""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
+        response: Response = await call_next(request)
+
+        if response.headers.get('content-type') != 'application/json':
+            return response
+
+        binary = b''
+
+        # noinspection PyUnresolvedReferences
+        async for data in response.body_iterator:
+            binary += data
+
+        body: dict = json.loads(binary.decode())
+
+        if "error" in body and request.headers.get("x-api-stacktrace", "") != "true":
+            del body["error"]
+
+        return JSONResponse(content=body, status_code=body.get('status', response.status_code))
+
+
+class SearchResponse(APIResponse):
+    response: Optional[IndexResponse] = None
+
+
+def build_response(node_count: int) -> SearchResponse:
+    nodes = [
+        TextNodeWithScore(
+            node=TextNode(
+                text=f"Node {idx}: " + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8,
+                metadata={"file_name": f"file-{idx % 20}.json", "group_name": "bench-group", "updated_at": idx},
+                class_name="TextNode",
+                text_template="{}",
+                metadata_template="{}"
+            ),
+            score=1.0 - idx / node_count
+        )
+        for idx in range(node_count)
+    ]
+
+    return SearchResponse(message="Searched.", response=IndexResponse(nodes=nodes))
+
+
+def build_app(legacy: bool, payload: SearchResponse) -> FastAPI:
+    app = FastAPI() if legacy else FastAPI(default_response_class=StatusJSONResponse)
+    app.add_middleware(LegacyStatusMiddleware if legacy else StatusMiddleware)
+
+    @app.post("/groups/{group_name}/content/search")
+    async def search(group_name: str) -> SearchResponse:
+        return payload
+
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        await client.post("/groups/bench/content/search")
+
+        start: float = time.perf_counter()
+        for _ in range(requests):
+            response = await client.post("/groups/bench/content/search")
+            assert response.status_code == 200
+        return (time.perf_counter() - start) / requests
+
+
+def main(node_count: int = 500, requests: int = 50) -> None:
+    payload: SearchResponse = build_response(node_count)
+    size: int = len(payload.model_dump_json())
+
+    print(f"Search response with {node_count} nodes ({size / 1024:.0f} KiB) x {requests} requests")
+
+    for label, legacy in (("BaseHTTPMiddleware (legacy)", True), ("Pure ASGI StatusMiddleware", False)):
+        per_request: float = asyncio.run(run(build_app(legacy, payload), requests))
+        print(f"  {label:<30} {per_request * 1000:8.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
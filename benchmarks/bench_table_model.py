@@ -0,0 +1,43 @@
+"""
+Microbenchmark for mapping MySQL result sets onto TableModel instances.
+
+Compares the validated `from_results` path against the trusted `from_results_many` path.
+
+Usage: python -m benchmarks.bench_table_model [rows]
+
+"""
+
+import sys
+import timeit
+from datetime import datetime
+
+from criadex.database.tables.documents import DocumentsModel
+from criadex.database.tables.groups import GroupsModel
+
+
+def build_rows(count: int) -> dict:
+    now: datetime = datetime.now()
+
+    return {
+        DocumentsModel: [(idx, f"document-{idx}.json", idx % 50, now) for idx in range(count)],
+        GroupsModel: [(idx, f"group-{idx}", 1, 1, 2, 1, now) for idx in range(count)],
+    }
+
+
+def main(count: int = 10_000, repeat: int = 5) -> None:
+    for model, rows in build_rows(count).items():
+        cases: dict = {
+            "from_results (validated)": lambda: [model.from_results(row) for row in rows],
+            "from_results_many (validated)": lambda: model.from_results_many(rows),
+            "from_results_many (trusted)": lambda: model.from_results_many(rows, trusted=True),
+        }
+
+        print(f"{model.__name__} x {count} rows")
+
+        for label, case in cases.items():
+            best: float = min(timeit.repeat(case, number=1, repeat=repeat))
+            print(f"  {label:<32} {best * 1000:8.2f} ms  ({best / count * 1e6:6.2f} us/row)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,133 @@
+"""
+Benchmark float vs quantized embedding storage (the vector_index group option) on a synthetic corpus.
+
+For each mode, reports recall@k against exact float32 cosine search, the bytes per vector that must stay
+in the page cache, & the per-query latency of a NumPy scan over that representation (plus the float rescore
+of the oversampled candidates, as configured for kNN in vector_store.KNN_RESCORE_OVERSAMPLE).
+
+The scan is brute force; Elasticsearch walks an HNSW graph with SIMD kernels, so absolute latencies differ.
+What carries over is the memory footprint & the recall cost of each quantization. The graph itself is the
+same size in every mode & is not counted.
+
+Usage: python -m benchmarks.bench_vector_quantization [vectors] [dims] [queries] [k]
+
+"""
+
+import sys
+import time
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from criadex.index.ragflow_objects.vector_store import KNN_RESCORE_OVERSAMPLE
+
+POPCOUNT: np.ndarray = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint16)
+
+
+def build_corpus(
+        count: int,
+        dims: int,
+        queries: int,
+        clusters: int = 64,
+        rank: int = 96,
+        seed: int = 7
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normalized vectors clustered by topic in a low-rank subspace, plus a little isotropic noise
+    (text embeddings have a far lower intrinsic dimension than their width), & queries drawn the same way
+    """
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dims), dtype=np.float32)
+    centers = rng.standard_normal((clusters, rank), dtype=np.float32)
+
+    def sample(size: int) -> np.ndarray:
+        latent = centers[rng.integers(0, clusters, size)] + 0.5 * rng.standard_normal((size, rank), dtype=np.float32)
+        vectors = latent @ basis + 0.5 * rng.standard_normal((size, dims), dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return sample(count), sample(queries)
+
+
+def scalar_quantizer(corpus: np.ndarray, bits: int) -> Tuple[np.ndarray, Callable[[np.ndarray], np.ndarray]]:
+    """
+    Affine scalar quantization between the 0.5% & 99.5% quantiles of all components. Ranking by
+    codes @ query is equivalent to ranking by the dequantized dot product (the offset term is constant).
+    """
+    low, high = np.quantile(corpus, [0.005, 0.995])
+    levels: int = 2 ** bits - 1
+    codes = np.clip(np.rint((corpus - low) / (high - low) * levels), 0, levels).astype(np.uint8)
+
+    if bits == 8:
+        return codes, lambda query: codes @ query
+
+    # Two 4-bit codes per byte, unpacked at query time
+    packed = (codes[:, 0::2] << 4) | codes[:, 1::2]
+
+    def score(query: np.ndarray) -> np.ndarray:
+        return (packed >> 4) @ query[0::2] + (packed & 0x0F) @ query[1::2]
+
+    return packed, score
+
+
+def binary_quantizer(corpus: np.ndarray) -> Tuple[np.ndarray, Callable[[np.ndarray], np.ndarray]]:
+    """One bit per dimension (the sign around the corpus centroid), scored by Hamming similarity"""
+
+    centroid = corpus.mean(axis=0)
+    bits = np.packbits(corpus - centroid > 0, axis=1)
+
+    def score(query: np.ndarray) -> np.ndarray:
+        query_bits = np.packbits(query - centroid > 0)
+        return -POPCOUNT[np.bitwise_xor(bits, query_bits)].sum(axis=1, dtype=np.int32)
+
+    return bits, score
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+def main(count: int = 20_000, dims: int = 768, queries: int = 200, k: int = 10) -> None:
+    corpus, query_vectors = build_corpus(count, dims, queries)
+    exact = [top_k(corpus @ query, k) for query in query_vectors]
+
+    int8_codes, int8_score = scalar_quantizer(corpus, 8)
+    int4_codes, int4_score = scalar_quantizer(corpus, 4)
+    bbq_codes, bbq_score = binary_quantizer(corpus)
+
+    # mode: (scorer, stored bytes, per-vector corrective bytes kept alongside the codes, rescore oversample)
+    modes: Dict[str, Tuple[Callable[[np.ndarray], np.ndarray], int, int, float]] = {
+        "hnsw (float32)": (lambda query: corpus @ query, corpus.nbytes, 0, 0.0),
+        "int8_hnsw": (int8_score, int8_codes.nbytes, 4, KNN_RESCORE_OVERSAMPLE.get("int8_hnsw", 0.0)),
+        "int4_hnsw": (int4_score, int4_codes.nbytes, 4, KNN_RESCORE_OVERSAMPLE.get("int4_hnsw", 0.0)),
+        "bbq_hnsw": (bbq_score, bbq_codes.nbytes, 14, KNN_RESCORE_OVERSAMPLE.get("bbq_hnsw", 0.0)),
+    }
+
+    print(f"{count} vectors x {dims} dims, {queries} queries, recall@{k}")
+    print(f"  {'mode':<16} {'recall':>8} {'bytes/vector':>13} {'memory':>10} {'ms/query':>9}  rescore")
+
+    for label, (score, stored, corrective, oversample) in modes.items():
+        hits: int = 0
+        start: float = time.perf_counter()
+
+        for query, truth in zip(query_vectors, exact):
+            if oversample:
+                # Rescore the oversampled quantized candidates against the full-precision vectors
+                candidates = top_k(score(query), int(k * oversample))
+                found = candidates[top_k(corpus[candidates] @ query, k)]
+            else:
+                found = top_k(score(query), k)
+            hits += len(np.intersect1d(found, truth))
+
+        elapsed: float = (time.perf_counter() - start) / queries
+        per_vector: float = stored / count + corrective
+
+        print(
+            f"  {label:<16} {hits / (queries * k):8.3f} {per_vector:13.1f} {per_vector * count / 2 ** 20:8.1f}MB"
+            f" {elapsed * 1000:9.3f}  {f'x{oversample:g}' if oversample else '-'}"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:5]]
+    main(*args)
@@ -15,8 +15,10 @@ You should have received a copy of the GNU General Public License along with Cri
 """
 
 
-import tiktoken
+import asyncio
 from typing import List, Optional, Any
+
+from criadex.agent.tokens import TOKEN_OFFLOAD_CHARS, acount_tokens, history_token_cache
 from criadex.index.ragflow_objects.chat import RagflowChatAgent
 from pydantic import BaseModel
 
@@ -36,16 +38,15 @@ class ChatAgent(RagflowChatAgent):
         super().__init__()
         self.llm_model_id = llm_model_id
 
-    def usage(self, history: List[dict], completion_tokens: int, usage_label: str = "ChatAgent") -> dict:
+    def usage(self, history: List[dict], completion_tokens: int, usage_label: str = "ChatAgent", chat_id: Optional[str] = None) -> dict:
         """
         Calculate token usage based on chat history.
-        For now, this is a placeholder.
+        With a chat_id, only messages appended since the chat's last turn are encoded.
         """
-        encoding = tiktoken.get_encoding("cl100k_base")
-        prompt_tokens = 0
-        for message in history:
-            if 'content' in message and message['content']:
-                prompt_tokens += len(encoding.encode(message['content']))
+        prompt_tokens = history_token_cache.count(
+            chat_id,
+            [message['content'] for message in history if message.get('content')]
+        )
 
         return {
             "prompt_tokens": prompt_tokens,
@@ -73,8 +74,6 @@ class ChatAgent(RagflowChatAgent):
         # Normalize response if needed (legacy logic)
         chat_response = response.message.model_dump() if hasattr(response.message, 'model_dump') else response.message
         
-        encoding = tiktoken.get_encoding("cl100k_base")
-
         content_to_encode = ""
         if isinstance(chat_response, dict):
             if "content" in chat_response:
@@ -84,11 +83,17 @@ class ChatAgent(RagflowChatAgent):
         else:
             content_to_encode = str(chat_response)
 
-        completion_tokens = len(encoding.encode(content_to_encode))
+        completion_tokens = await acount_tokens(content_to_encode)
+
+        # Large histories are counted off the event loop
+        if sum(len(message.get('content') or "") for message in history) > TOKEN_OFFLOAD_CHARS:
+            usage = await asyncio.to_thread(self.usage, history, completion_tokens, usage_label="ChatAgent", chat_id=chat_id)
+        else:
+            usage = self.usage(history, completion_tokens, usage_label="ChatAgent", chat_id=chat_id)
 
         return ChatAgentResponse(
             chat_response=chat_response,
-            usage=self.usage(history, completion_tokens, usage_label="ChatAgent"),
+            usage=usage,
             message="Successfully queried the model!",
             model_id=str(self.llm_model_id)
         )
@@ -13,11 +13,17 @@ You should have received a copy of the GNU General Public License along with Cri
 @license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
 
 """
+import asyncio
+import hashlib
 import logging
 import json
-import tiktoken
+from collections import OrderedDict
 from typing import List, Optional, Any
 
+import numpy as np
+
+from criadex.agent.tokens import count_tokens
+
 from criadex.index.ragflow_objects.intents import RagflowIntentsAgent, RagflowIntentsAgentResponse
 from pydantic import BaseModel
 
@@ -51,20 +57,110 @@ class IntentsAgentResponse(BaseModel):
     model_id: str
     
 
+class IntentEmbeddingRanker:
+    """
+    Ranks intents by cosine similarity between the prompt & each intent's "name: description" embedding.
+    Intent embeddings are computed once per intent set & cached (keyed by a hash of the set), so ranking
+    a prompt costs one query embedding & a single matrix-vector product.
+
+    """
+
+    def __init__(self, embedder: Any, max_intent_sets: int = 256):
+        """
+        :param embedder: Any object with embed_many(texts) -> List[List[float]]
+        :param max_intent_sets: How many intent sets to keep embeddings for (LRU)
+        """
+        self._embedder = embedder
+        self._max_intent_sets: int = max_intent_sets
+        self._matrices: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
+    @staticmethod
+    def intent_set_key(intents: List[Intent]) -> bytes:
+        hasher = hashlib.blake2b(digest_size=16)
+        for intent in intents:
+            hasher.update(intent.name.encode())
+            hasher.update(b"\0")
+            hasher.update(intent.description.encode())
+            hasher.update(b"\0")
+        return hasher.digest()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    async def intent_matrix(self, intents: List[Intent]) -> np.ndarray:
+        """
+        Get the (cached) row-normalized embedding matrix of an intent set
+
+        :param intents: The intents
+        :return: An (n_intents, dims) matrix
+        """
+        key: bytes = self.intent_set_key(intents)
+        matrix: Optional[np.ndarray] = self._matrices.get(key)
+
+        if matrix is None:
+            embeddings = await asyncio.to_thread(
+                self._embedder.embed_many,
+                [f"{intent.name}: {intent.description}" for intent in intents]
+            )
+            matrix = self._normalize(np.asarray(embeddings, dtype=np.float32))
+            self._matrices[key] = matrix
+
+            if len(self._matrices) > self._max_intent_sets:
+                self._matrices.popitem(last=False)
+
+        self._matrices.move_to_end(key)
+        return matrix
+
+    async def rank(self, prompt: str, intents: List[Intent]) -> List[RankedIntent]:
+        """
+        Rank intents for a prompt, best first. Scores are cosine similarities clipped to [0, 1].
+
+        :param prompt: The prompt
+        :param intents: The intents
+        :return: The ranked intents
+        """
+        if not intents:
+            return []
+
+        matrix: np.ndarray = await self.intent_matrix(intents)
+        query: np.ndarray = self._normalize(np.asarray((await asyncio.to_thread(self._embedder.embed_many, [prompt]))[0], dtype=np.float32))
+        scores: np.ndarray = np.clip(matrix @ query, 0.0, 1.0)
+
+        return [
+            RankedIntent(score=float(scores[idx]), **intents[idx].model_dump())
+            for idx in np.argsort(-scores, kind="stable")
+        ]
+
+
 class IntentsAgent(RagflowIntentsAgent):
     """
     Ragflow-based IntentsAgent with legacy feature parity: ranking, parsing, error handling.
+    With an embedding ranker, the LLM is only consulted (if at all) when the top intents are too close to call.
     """
-    def __init__(self, llm_model_id: str):
+
+    """Top-2 score gap below which an embedding ranking counts as ambiguous"""
+    AMBIGUITY_MARGIN: float = 0.05
+
+    def __init__(
+            self,
+            llm_model_id: str,
+            ranker: Optional[IntentEmbeddingRanker] = None,
+            llm_fallback: bool = False,
+            ambiguity_margin: Optional[float] = None
+    ):
         super().__init__()
         self.llm_model_id = llm_model_id
+        self.ranker = ranker
+        self.llm_fallback = llm_fallback
+        self.ambiguity_margin = self.AMBIGUITY_MARGIN if ambiguity_margin is None else ambiguity_margin
 
     def usage(self, payload: dict, completion_tokens: int, usage_label: str = "IntentsAgent") -> dict:
         """
         Calculate token usage based on the payload.
         """
-        encoding = tiktoken.get_encoding("cl100k_base")
-        prompt_tokens = len(encoding.encode(json.dumps(payload)))
+        prompt_tokens = count_tokens(json.dumps(payload))
         
         return {
             "prompt_tokens": prompt_tokens,
@@ -130,7 +226,42 @@ class IntentsAgent(RagflowIntentsAgent):
                 continue
         return ranked_intents
 
+    def is_ambiguous(self, ranked_intents: List[RankedIntent]) -> bool:
+        """
+        Whether the best two intents are too close to call
+        """
+        return len(ranked_intents) > 1 and ranked_intents[0].score - ranked_intents[1].score < self.ambiguity_margin
+
     async def execute(self, intents: List[Intent], prompt: str) -> IntentsAgentResponse:
+        """
+        Rank intents with the embedding ranker when there is one, else (or for ambiguous cases, if enabled) the LLM.
+        """
+        if self.ranker is None:
+            return await self.execute_llm(intents, prompt)
+
+        ranked_intents = await self.ranker.rank(prompt, intents)
+
+        if self.llm_fallback and self.is_ambiguous(ranked_intents):
+            llm_response = await self.execute_llm(intents, prompt)
+            if llm_response.ranked_intents:
+                return llm_response
+
+        # Only the prompt is embedded per request (intent embeddings are cached)
+        prompt_tokens = count_tokens(prompt)
+
+        return IntentsAgentResponse(
+            ranked_intents=ranked_intents,
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": 0,
+                "total_tokens": prompt_tokens,
+                "label": "IntentsAgent"
+            },
+            message="Successfully ranked intents",
+            model_id=str(self.llm_model_id)
+        )
+
+    async def execute_llm(self, intents: List[Intent], prompt: str) -> IntentsAgentResponse:
         """
         Execute Ragflow LLM ranking, preserving legacy features.
         """
@@ -140,8 +271,7 @@ class IntentsAgent(RagflowIntentsAgent):
         
         ranked_intents = self.parse_llm_response("", intents)
         
-        encoding = tiktoken.get_encoding("cl100k_base")
-        completion_tokens = len(encoding.encode(""))
+        completion_tokens = count_tokens("")
         
         return IntentsAgentResponse(
             ranked_intents=ranked_intents,
@@ -13,25 +13,146 @@ You should have received a copy of the GNU General Public License along with Cri
 @license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
 
 """
-from typing import List, Optional, Any
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
 from pydantic import BaseModel
-from lingua import LanguageDetectorBuilder
+from lingua import LanguageDetector, LanguageDetectorBuilder, IsoCode639_1
+
+"""ISO 639-1 codes the detector chooses between. Fewer languages = less RAM & faster, more accurate detection."""
+LANGUAGE_DETECTOR_LANGUAGES: List[str] = [
+    code.strip().upper() for code in
+    os.environ.get("LANGUAGE_DETECTOR_LANGUAGES", "EN,FR,ES,PT,DE,IT,ZH,AR,FA,HI,KO,RU").split(",")
+    if code.strip()
+]
+
+"""How many detection results to cache (keyed by text hash)"""
+LANGUAGE_DETECTOR_CACHE_SIZE: int = int(os.environ.get("LANGUAGE_DETECTOR_CACHE_SIZE", 10_000))
+
 
 class LanguageAgentResponse(BaseModel):
     language: Optional[str]
     confidence: float
 
+
 class LanguageAgent:
-    def __init__(self):
-        self.detector = LanguageDetectorBuilder.from_all_languages().with_preloaded_language_models().build()
+    """
+    Detects the language of text. The detector is built once per process, on first use (or by preload()),
+    and shared by every agent instance.
+
+    """
+
+    _detector: Optional[LanguageDetector] = None
+    _detector_lock: threading.Lock = threading.Lock()
+
+    _cache: "OrderedDict[bytes, LanguageAgentResponse]" = OrderedDict()
+    _cache_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def get_detector(cls) -> LanguageDetector:
+        """
+        Get the process-shared detector, building it on first use
+
+        :return: The detector
+
+        """
+
+        if cls._detector is None:
+            with cls._detector_lock:
+                if cls._detector is None:
+                    cls._detector = (
+                        LanguageDetectorBuilder
+                        .from_iso_codes_639_1(*(IsoCode639_1.from_str(code) for code in LANGUAGE_DETECTOR_LANGUAGES))
+                        .with_preloaded_language_models()
+                        .build()
+                    )
+
+        return cls._detector
+
+    @classmethod
+    async def preload(cls) -> None:
+        """
+        Build the detector (& load its models) in a worker thread, e.g. in the background after startup
+
+        :return: None
+
+        """
+
+        await asyncio.to_thread(cls.get_detector)
+
+    @property
+    def detector(self) -> LanguageDetector:
+        return self.get_detector()
 
     def detect(self, text: str) -> LanguageAgentResponse:
-        confidence_values = self.detector.compute_language_confidence_values(text)
+        key: bytes = self._cache_key(text)
+        cached: Optional[LanguageAgentResponse] = self._cache_get(key)
+
+        if cached is not None:
+            return cached
+
+        response: LanguageAgentResponse = self._to_response(self.detector.compute_language_confidence_values(text))
+        self._cache_set(key, response)
+        return response
+
+    async def detect_many(self, texts: List[str]) -> List[LanguageAgentResponse]:
+        """
+        Detect the language of many texts. Uncached texts are detected together in a worker thread,
+        which lingua spreads across its own thread pool.
+
+        :param texts: The texts
+        :return: One response per text, in order
+
+        """
+
+        keys: List[bytes] = [self._cache_key(text) for text in texts]
+        responses: List[Optional[LanguageAgentResponse]] = [self._cache_get(key) for key in keys]
+        misses: List[int] = [idx for idx, response in enumerate(responses) if response is None]
+
+        if misses:
+            detector: LanguageDetector = await asyncio.to_thread(self.get_detector)
+            results = await asyncio.to_thread(
+                detector.compute_language_confidence_values_in_parallel,
+                [texts[idx] for idx in misses]
+            )
+
+            for idx, confidence_values in zip(misses, results):
+                responses[idx] = self._to_response(confidence_values)
+                self._cache_set(keys[idx], responses[idx])
+
+        return responses
+
+    @staticmethod
+    def _to_response(confidence_values: list) -> LanguageAgentResponse:
         if not confidence_values:
             return LanguageAgentResponse(language=None, confidence=0.0)
-        
+
         most_likely_language = confidence_values[0]
         return LanguageAgentResponse(
             language=most_likely_language.language.iso_code_639_1.name,
             confidence=most_likely_language.value
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    @classmethod
+    def _cache_get(cls, key: bytes) -> Optional[LanguageAgentResponse]:
+        with cls._cache_lock:
+            response: Optional[LanguageAgentResponse] = cls._cache.get(key)
+            if response is not None:
+                cls._cache.move_to_end(key)
+            return response
+
+    @classmethod
+    def _cache_set(cls, key: bytes, response: LanguageAgentResponse) -> None:
+        with cls._cache_lock:
+            cls._cache[key] = response
+            cls._cache.move_to_end(key)
+            if len(cls._cache) > LANGUAGE_DETECTOR_CACHE_SIZE:
+                cls._cache.popitem(last=False)
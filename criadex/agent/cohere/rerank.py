@@ -14,35 +14,21 @@ You should have received a copy of the GNU General Public License along with Cri
 
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from criadex.index.ragflow_objects.postprocessor import RagflowMetadataReplacementPostProcessor
-from criadex.index.ragflow_objects.postprocessor import RagflowBaseNodePostprocessor
-from criadex.index.ragflow_objects.schemas import RagflowNodeWithScore, RagflowTextNode, RagflowQueryBundle
 from pydantic import BaseModel, Field
 
-from criadex.criadex import Criadex
-from criadex.index.index_api.document.index import DocumentIndexAPI
-from criadex.index.index_api.document.index_objects import DocumentCohereRerank, MetadataKeys
-from criadex.index.ragflow_objects.models import RagflowReranker
-from criadex.index.ragflow_objects.rerank import RagflowRerankAgent, RagflowRerankAgentResponse
-from ...database.tables.models.cohere import CohereModelsModel
-from ...index.base_api import CriadexIndexAPI
-from ...index.index_api.question.index_objects import QUESTION_NODE_ANSWER_KEY
-from ...index.schemas import ServiceConfig
+from criadex.cache.rerank_cache import RerankCache, rerank_cache
+from criadex.index.ragflow_objects.postprocessor import RagflowPostprocessor
+from criadex.index.ragflow_objects.local_rerank import LocalReranker
+from criadex.index.schemas import TextNodeWithScore
 from ...schemas import ModelNotFoundError
 
 
-class CriaTextNode(RagflowTextNode):
-    pass
-
-
-class TextNodeWithScore(RagflowNodeWithScore):
-    pass
-
-
-class RerankAgentResponse(RagflowRerankAgentResponse):
-    pass
+class RerankAgentResponse(BaseModel):
+    ranked_nodes: List[TextNodeWithScore]
+    search_units: int
+    message: str
 
 
 class RerankAgentConfig(BaseModel):
@@ -58,36 +44,70 @@ class RerankAgentConfig(BaseModel):
     top_n: Optional[int] = Field(default=None, ge=1)
     min_n: float = Field(default=0.0, ge=0.0, le=1.0)
 
+    # MMR diversity (1.0 = pure relevance, 0.0 = pure diversity). Disabled when None.
+    mmr_lambda: Optional[float] = Field(default=None, ge=0.0, le=1.0)
 
-class RerankAgent(RagflowRerankAgent):
+
+class RerankAgent:
     """
-    Ragflow-based RerankAgent with legacy feature parity: node postprocessing, top N/min N filtering, error handling.
+    Reranks nodes against a prompt. Uses the given external reranker if any (ideally a process-shared
+    RerankBatcher around the provider client), otherwise the local (cosine + BM25) reranker, which needs
+    no remote call. Scores are cached per (reranker, prompt, candidate set).
+
     """
 
+    def __init__(
+            self,
+            criadex: Any = None,
+            cohere_model_id: Optional[int] = None,
+            reranker: Any = None,
+            cache: Optional[RerankCache] = rerank_cache
+    ):
+        """
+        :param criadex: The Criadex instance (for model lookup & its embedder)
+        :param cohere_model_id: The Cohere model, validated if given
+        :param reranker: An external reranker with rerank(results, query) / arerank(results, query)
+        :param cache: The rerank score cache (None to disable)
+        """
+        self._criadex = criadex
+        self._cohere_model_id: Optional[int] = cohere_model_id
+        embedder: Any = getattr(criadex, "embedder", None)
+        self._postprocessor: RagflowPostprocessor = RagflowPostprocessor(
+            reranker=reranker,
+            local_reranker=LocalReranker(embedder=embedder),
+            cache=cache,
+            model_key=f"cohere:{cohere_model_id}" if reranker is not None else ("local" if embedder is None else "local:vector")
+        )
+
     async def execute(self, config: RerankAgentConfig) -> RerankAgentResponse:
         """
-        Rerank the nodes based on the prompt, preserving legacy features.
+        Rerank the nodes based on the prompt. top_n & min_n are applied by the reranker itself.
+
         :param config: The rerank config
         :return: RerankAgentResponse
         """
-        # Build node postprocessors (Ragflow API assumed)
-        postprocessors = [
-            RagflowMetadataReplacementPostProcessor(target_metadata_key="window"),
-            RagflowMetadataReplacementPostProcessor(target_metadata_key="answer"),
-            RagflowReranker(top_n=config.top_n or 10)
+        if self._cohere_model_id is not None and self._criadex is not None:
+            if await self._criadex.mysql_api.cohere_models.retrieve(model_id=self._cohere_model_id) is None:
+                raise ModelNotFoundError()
+
+        hits: List[Dict[str, Any]] = [
+            {"_idx": idx, "_score": node.score, "_source": {"text": node.node.text}}
+            for idx, node in enumerate(config.nodes)
         ]
-        # Postprocess nodes (Ragflow API assumed)
-        nodes = await self.postprocess_nodes(
-            query_bundle=RagflowQueryBundle(config.prompt),
-            nodes=config.nodes,
-            node_postprocessors=postprocessors
+
+        ranked: List[Dict[str, Any]] = await self._postprocessor.arerank(
+            hits,
+            config.prompt,
+            top_n=config.top_n,
+            min_n=config.min_n,
+            mmr_lambda=config.mmr_lambda
         )
-        # Top N
-        nodes = nodes[:config.top_n] if config.top_n else nodes
-        # Min N
-        nodes = [node for node in nodes if node.score >= config.min_n]
+
         return RerankAgentResponse(
-            ranked_nodes=[TextNodeWithScore(node=node.node, score=node.score) for node in nodes],
-            search_units=1,
+            ranked_nodes=[
+                TextNodeWithScore(node=config.nodes[hit["_idx"]].node, score=hit["_score"])
+                for hit in ranked
+            ],
+            search_units=0 if self._postprocessor.reranker is None else 1,
             message="Successfully re-ranked the nodes!"
         )
@@ -0,0 +1,164 @@
+"""
+
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     Isaac Kogan
+@copyright  2024 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import cache, lru_cache
+from typing import List, Optional, Tuple
+
+import tiktoken
+
+"""The encoding used for token accounting"""
+ENCODING_NAME: str = "cl100k_base"
+
+"""Inputs longer than this (in characters) are encoded in a worker thread rather than on the event loop"""
+TOKEN_OFFLOAD_CHARS: int = int(os.environ.get("TOKEN_OFFLOAD_CHARS", 50_000))
+
+"""How many distinct message contents to remember token counts for"""
+MESSAGE_TOKEN_CACHE_SIZE: int = int(os.environ.get("MESSAGE_TOKEN_CACHE_SIZE", 50_000))
+
+
+@cache
+def get_encoding(name: str = ENCODING_NAME) -> tiktoken.Encoding:
+    """
+    Load an encoding once per process (tiktoken.get_encoding re-resolves it on every call)
+
+    :param name: The encoding name
+    :return: The encoding
+
+    """
+
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """
+    Count the tokens in a piece of text. Special tokens are counted as plain text, so user input can't raise.
+
+    :param text: The text
+    :return: The number of tokens
+
+    """
+
+    return len(get_encoding().encode_ordinary(text)) if text else 0
+
+
+@lru_cache(maxsize=MESSAGE_TOKEN_CACHE_SIZE)
+def count_message_tokens(content: str) -> int:
+    """
+    Count the tokens of a single chat message's content, cached by content (messages repeat every turn)
+
+    :param content: The message content
+    :return: The number of tokens
+
+    """
+
+    return count_tokens(content)
+
+
+async def acount_tokens(text: Optional[str]) -> int:
+    """
+    Count the tokens in a piece of text, offloading very large inputs to a worker thread
+
+    :param text: The text
+    :return: The number of tokens
+
+    """
+
+    if text and len(text) > TOKEN_OFFLOAD_CHARS:
+        return await asyncio.to_thread(count_tokens, text)
+
+    return count_tokens(text)
+
+
+class HistoryTokenCache:
+    """
+    Per-chat token counts for chat histories. Histories grow by appending, so only messages added since
+    the last count are encoded. A changed prefix (e.g. an edited message) is detected by hash & recounted.
+
+    """
+
+    def __init__(self, max_chats: int = 10_000):
+        """
+        Initialize the cache
+
+        :param max_chats: How many chats to remember (LRU)
+
+        """
+
+        self._max_chats: int = max_chats
+        self._counts: OrderedDict[str, Tuple[int, bytes, int]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def count(self, chat_id: Optional[str], contents: List[str]) -> int:
+        """
+        Count the tokens of a chat history
+
+        :param chat_id: The chat the history belongs to (None disables caching)
+        :param contents: The content of each message, in order
+        :return: The total number of tokens
+
+        """
+
+        if chat_id is None:
+            return sum(count_tokens(content) for content in contents)
+
+        with self._lock:
+            cached_length, cached_digest, cached_tokens = self._counts.get(chat_id, (0, b"", 0))
+
+        # Hash the full history in one pass, snapshotting the digest of the previously counted prefix
+        hasher = hashlib.blake2b(digest_size=16)
+        prefix_digest: bytes = hasher.digest()
+
+        for idx, content in enumerate(contents):
+            if idx == cached_length:
+                prefix_digest = hasher.digest()
+            hasher.update(content.encode())
+            hasher.update(b"\0")
+
+        if cached_length == len(contents):
+            prefix_digest = hasher.digest()
+
+        if cached_length <= len(contents) and prefix_digest == cached_digest:
+            tokens: int = cached_tokens + sum(count_tokens(content) for content in contents[cached_length:])
+        else:
+            tokens: int = sum(count_tokens(content) for content in contents)
+
+        with self._lock:
+            self._counts[chat_id] = (len(contents), hasher.digest(), tokens)
+            self._counts.move_to_end(chat_id)
+
+            if len(self._counts) > self._max_chats:
+                self._counts.popitem(last=False)
+
+        return tokens
+
+    def clear(self) -> None:
+        """
+        Forget all cached counts
+
+        :return: None
+
+        """
+
+        self._counts.clear()
+
+
+"""Process-wide history token cache"""
+history_token_cache: HistoryTokenCache = HistoryTokenCache()
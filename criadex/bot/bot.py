@@ -3,10 +3,11 @@ Bot module for Criadex (Elasticsearch version)
 Implements bot logic for semantic search, chat, and orchestration.
 """
 
-from typing import Optional
+from typing import List, Optional
 from criadex.agent.azure.chat import ChatAgent
 from criadex.core.event import Event
 from criadex.index.schemas import IndexResponse, TextNodeWithScore, TextNode, BaseNode
+from criadex.index.ragflow_objects.vector_store import HybridSearch
 
 
 class Bot:
@@ -19,13 +20,42 @@ class Bot:
         self.embedder = embedder
         self.event = event or Event()
 
-    async def search(self, group_name: str, query: str, top_k=10, query_filter: Optional[dict] = None):
+    async def search(
+            self,
+            group_name: str,
+            query: str,
+            top_k=10,
+            query_filter: Optional[dict] = None,
+            hybrid: Optional[HybridSearch] = None,
+            min_similarity: Optional[float] = None,
+            routing: Optional[str] = None
+    ):
         # Emit event for search
         self.event.emit(Event.SEARCH, query=query)
 
         # Embed the query
         embedding = self.embedder.embed(query)
 
+        # Cosine similarity threshold, applied by Elasticsearch
+        options = {"min_similarity": min_similarity} if min_similarity is not None else {}
+
+        # Shard routing, so the search only hits the group's shard(s)
+        if routing:
+            options["routing"] = routing
+
+        # Hybrid: BM25 + vector in one round-trip, fused by relevance
+        if hybrid is not None:
+            hits = await self.vector_store.ahybrid_search(
+                collection_name=group_name,
+                query_embedding=embedding,
+                hybrid=hybrid,
+                top_k=top_k,
+                query_filter=query_filter,
+                **options
+            )
+
+            return self._build_response(hits)
+
         # Implement semantic search using Elasticsearch vector store
         if hasattr(self.vector_store, 'asearch'):
             hits = await self.vector_store.asearch(
@@ -33,40 +63,72 @@ class Bot:
                 query_embedding=embedding, 
                 top_k=top_k,
                 sort={"metadata.updated_at": {"order": "desc"}},
-                query_filter=query_filter # Pass the query_filter here
+                query_filter=query_filter, # Pass the query_filter here
+                **options
             )
 
-            nodes = []
-            for hit in hits:
-                src = hit.get('_source', {})
-                text = src.get('text')
-                metadata = src.get('metadata', {})
-                score = hit.get('_score', 0.0)
-
-                base_node = BaseNode(
-                    metadata=metadata,
-                    class_name='TextNode'
-                )
-
-                text_node = TextNode(
-                    text=text,
-                    metadata=metadata,
-                    class_name='TextNode',
-                    text_template='{}',
-                    metadata_template='{}'
-                )
-
-                node_with_score = TextNodeWithScore(
-                    node=text_node,
-                    score=score
-                )
-                nodes.append(node_with_score)
-
-            return IndexResponse(nodes=nodes, assets=[])
+            return self._build_response(hits)
 
         # Fallback: return empty result
         return IndexResponse(nodes=[])
 
+    async def search_many(
+            self,
+            group_name: str,
+            queries: List[str],
+            top_ks: List[int],
+            query_filters: Optional[List[Optional[dict]]] = None,
+            hybrids: Optional[List[Optional[HybridSearch]]] = None,
+            min_similarities: Optional[List[Optional[float]]] = None,
+            routing: Optional[str] = None
+    ) -> List[IndexResponse]:
+        # Emit event for each search
+        for query in queries:
+            self.event.emit(Event.SEARCH, query=query)
+
+        # Embed every query in one batch & run them as a single multi-search
+        embeddings = self.embedder.embed_many(queries)
+
+        kwargs = {"hybrids": hybrids} if hybrids and any(hybrids) else {}
+        if min_similarities and any(threshold is not None for threshold in min_similarities):
+            kwargs["min_similarities"] = min_similarities
+        if routing:
+            kwargs["routings"] = [routing] * len(queries)
+        hits_per_query = await self.vector_store.amsearch(
+            collection_name=group_name,
+            query_embeddings=embeddings,
+            top_ks=top_ks,
+            query_filters=query_filters,
+            **kwargs
+        )
+
+        return [self._build_response(hits) for hits in hits_per_query]
+
+    @classmethod
+    def _build_response(cls, hits: List[dict]) -> IndexResponse:
+        nodes = []
+        for hit in hits:
+            src = hit.get('_source', {})
+            text = src.get('text')
+            metadata = src.get('metadata', {})
+            score = hit.get('_score', 0.0)
+
+            text_node = TextNode(
+                text=text,
+                metadata=metadata,
+                class_name='TextNode',
+                text_template='{}',
+                metadata_template='{}'
+            )
+
+            node_with_score = TextNodeWithScore(
+                node=text_node,
+                score=score
+            )
+            nodes.append(node_with_score)
+
+        return IndexResponse(nodes=nodes, assets=[])
+
     async def chat(self, message: str, llm_model_id: int, context: Optional[str] = None):
         # Emit event for chat
         self.event.emit('chat', message=message, context=context)
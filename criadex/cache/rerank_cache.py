@@ -0,0 +1,95 @@
+"""
+Rerank cache for Criadex
+Caches rerank scores by (rerank model, query, candidate set) so repeated reranks skip the reranker.
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, List
+
+from criadex.cache.cache import Cache
+from criadex.core.event import Event
+
+"""How many reranked candidate sets to keep"""
+RERANK_CACHE_SIZE: int = int(os.environ.get("RERANK_CACHE_SIZE", 1024))
+
+"""How long (seconds) a cached rerank stays valid"""
+RERANK_CACHE_TTL: int = int(os.environ.get("RERANK_CACHE_TTL", 600))
+
+
+def candidate_id(hit: Dict[str, Any]) -> str:
+    """
+    Stable ID of a rerank candidate: a hash of its text, prefixed by its document ID when it has one.
+    The text is part of the ID, so a re-uploaded document (same ID, new text) is never served stale scores.
+
+    :param hit: The candidate hit
+    :return: The ID
+    """
+    text: str = (hit.get("_source") or hit).get("text") or ""
+    text_hash: str = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    if hit.get("_id") is not None:
+        return f"{hit['_id']}:{text_hash}"
+
+    return "text:" + text_hash
+
+
+class RerankCache(Cache):
+    """
+    LRU + TTL cache of rerank scores. Values are {candidate_id: score} for the WHOLE candidate set, so
+    a cached entry serves any top_n / min_n cut of the same set.
+    """
+
+    def __init__(self, max_size: int = RERANK_CACHE_SIZE, ttl: int = RERANK_CACHE_TTL, event: Event = None):
+        super().__init__(None, max_size=max_size, ttl=ttl, event=event)
+
+    @staticmethod
+    def key(model_key: str, query: str, results: List[Dict[str, Any]]) -> str:
+        """
+        Build the cache key. The candidate set is order-independent.
+
+        :param model_key: Identifies the reranker, e.g. "local" or "cohere:3"
+        :param query: The query
+        :param results: The candidate hits
+        :return: The cache key
+        """
+        query_hash: str = hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+
+        candidates = hashlib.blake2b(digest_size=16)
+        for cid in sorted({candidate_id(hit) for hit in results}):
+            candidates.update(cid.encode())
+            candidates.update(b"\0")
+
+        return f"rerank:{model_key}:{query_hash}:{candidates.hexdigest()}"
+
+    def store(self, key: str, ranked: List[Dict[str, Any]]) -> Dict[str, float]:
+        """
+        Cache the scores of a full (uncut) rerank
+
+        :param key: The cache key
+        :param ranked: The reranked hits
+        :return: The cached scores
+        """
+        scores: Dict[str, float] = {candidate_id(hit): hit.get("_score", 0.0) for hit in ranked}
+        self.set(key, scores)
+        return scores
+
+    @staticmethod
+    def apply(scores: Dict[str, float], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Rebuild a ranking of the given hits from cached scores, best first
+
+        :param scores: The cached scores
+        :param results: The candidate hits
+        :return: Copies of the scored hits, with _score set to the rerank score
+        """
+        ranked: List[Dict[str, Any]] = []
+        for hit in results:
+            cid: str = candidate_id(hit)
+            if cid in scores:
+                ranked.append({**hit, "_score": scores[cid]})
+
+        return sorted(ranked, key=lambda hit: -hit["_score"])
+
+
+rerank_cache: RerankCache = RerankCache()
@@ -18,24 +18,27 @@ You should have received a copy of the GNU General Public License along with Cri
 import asyncio
 import logging
 import time
-from typing import Optional
+from typing import Dict, List, Optional
 import aiomysql
 from criadex.bot.bot import Bot
 from criadex.cache.cache import Cache
 from criadex.database.api import GroupDatabaseAPI
-from criadex.schemas import MySQLCredentials, ElasticsearchCredentials, GroupConfig, GroupExistsError, IndexType, GroupNotFoundError, DocumentExistsError, DocumentNotFoundError
+from criadex.schemas import MySQLCredentials, ElasticsearchCredentials, GroupConfig, GroupExistsError, IndexType, GroupNotFoundError, DocumentExistsError, DocumentNotFoundError, DeletionRunningError, VectorIndexType, EmbeddingDimensionsError
 from criadex.database.tables.groups import GroupsModel
 from criadex.database.tables.documents import DocumentsModel
 from app.core.schemas import AppMode
 from app.core import config
 from criadex.database.tables.models.cohere import COHERE_MODELS, CohereModelsBaseModel, CohereModelsModel
 from criadex.database.tables.models.azure import AZURE_MODELS, AzureModelsBaseModel, AzureModelsModel
-from criadex.index.schemas import SearchConfig
+from criadex.index.schemas import IndexResponse, SearchConfig
 from criadex.schemas import ModelExistsError
 from criadex.core.event import Event
-from criadex.index.ragflow_objects.vector_store import RagflowVectorStore
+from criadex.index.ragflow_objects.vector_store import RagflowVectorStore, HybridSearch, WritePolicy
+from criadex.index.ragflow_objects.filters import combine_filters, compile_filter
 from criadex.index.ragflow_objects.embedder import RagflowEmbedder
 from criadex.index.ragflow_objects.retriever import RagflowRetriever
+from criadex.index.ragflow_objects.reindex import ReindexJob, ReindexProgress
+from criadex.index.ragflow_objects.deletion import DeletionJob, DeletionJobs, DELETION_POLL_INTERVAL
 
 from criadex.index.index_api.document.index_objects import DocumentConfig
 
@@ -62,6 +65,11 @@ class Criadex:
         self.cache = None
         self.event = Event()
         self._active = {}
+        self._reindex_tasks: Dict[str, asyncio.Task] = {}
+        self._ingestion_timers: Dict[str, asyncio.TimerHandle] = {}
+        self.deletion_jobs = None
+        self._deletions: Dict[str, DeletionJob] = {}
+        self._reaper: Optional[asyncio.Task] = None
 
     async def initialize(self) -> None:
         """
@@ -106,11 +114,28 @@ class Criadex:
             port=self.elasticsearch_credentials.port,
             username=self.elasticsearch_credentials.username,
             password=self.elasticsearch_credentials.password,
-            index_name="criadex"
+            index_name="criadex",
+            number_of_shards=config.ELASTICSEARCH_SHARDS,
+            routing_partition_size=config.ELASTICSEARCH_ROUTING_PARTITION_SIZE,
+            group_routing=config.ELASTICSEARCH_GROUP_ROUTING,
+            layout_mode=config.ELASTICSEARCH_INDEX_LAYOUT,
+            write_policy=WritePolicy(
+                insert=config.ELASTICSEARCH_REFRESH_INSERT,
+                file=config.ELASTICSEARCH_REFRESH_FILE,
+                delete=config.ELASTICSEARCH_REFRESH_DELETE
+            )
         )
         self.embedder = RagflowEmbedder()
         self.retriever = RagflowRetriever(self.vector_store, self.embedder)
 
+        # Resume reaping the deletions left running by the last process
+        self.deletion_jobs = DeletionJobs(self.vector_store.es)
+        try:
+            for job in await self.deletion_jobs.arunning():
+                self._track_deletion(job)
+        except Exception as ex:
+            logging.warning(f"Could not resume the running deletion jobs: {ex!r}")
+
         # Criadex features
         self.bot = Bot(self.vector_store, self.embedder, event=self.event)
         self.cache = Cache(self.mysql_api, event=self.event)
@@ -142,6 +167,15 @@ class Criadex:
         if await self.exists(name=config.name):
             raise GroupExistsError()
 
+        # The index holds the embeddings the embedder produces, or a Matryoshka truncation of them to the group's
+        # embedding_dims. Sized by the embedder rather than the model row, since the embedder writes every vector.
+        embedder_dims: int = self.embedder.dims
+
+        if config.embedding_dims and config.embedding_dims > embedder_dims:
+            raise EmbeddingDimensionsError(
+                f"Cannot truncate the embedder's {embedder_dims}-dimensional embeddings to {config.embedding_dims} dimensions"
+            )
+
         # MySQL Insert
         await self.mysql_api.groups.insert(
             name=config.name,
@@ -154,7 +188,12 @@ class Criadex:
         # Vector store index creation is often implicit on first insert.
         # This block is for safety and future explicit index creation logic.
         try:
-            await self.vector_store.acreate_collection(collection_name=config.name)
+            await self.vector_store.acreate_collection(
+                collection_name=config.name,
+                vector_index=config.vector_index,
+                dims=config.embedding_dims or embedder_dims,
+                matryoshka=bool(config.embedding_dims)
+            )
         except Exception as ex:
             # If vector store operations fail, roll back the MySQL insertion.
             await self.mysql_api.groups.delete(name=config.name)
@@ -176,11 +215,101 @@ class Criadex:
 
         return group_model
 
-    async def delete(self, name: str) -> None:
+    async def delete(self, name: str) -> DeletionJob:
+        """
+        Delete a Criadex index group. Its vectors are dropped with its index; in the shared index they are deleted
+        by a background task instead, & the group's MySQL rows are deleted once that task is done.
+
+        :param name: The name of the index group
+        :return: The deletion job (completed, unless a background task is still running)
+
+        """
+
+        if not await self.exists(name=name):
+            raise GroupNotFoundError()
+
+        running: Optional[DeletionJob] = await self._running_deletion(name)
+        if running is not None:
+            return running
+
+        timer: Optional[asyncio.TimerHandle] = self._ingestion_timers.pop(name, None)
+        if timer is not None:
+            timer.cancel()
+
+        group_id: int = await self.get_id(name=name)
+
+        # Drop the group's vectors (an index drop, unless the group lives in the shared index)
+        drop = await self.vector_store.adrop_collection(collection_name=name, wait_for_completion=False)
+        job: DeletionJob = await self.deletion_jobs.acreate(group_name=name, tasks=drop.tasks, group_id=group_id)
+
+        if not job.tasks:
+            await self._finish_deletion(job)
+        else:
+            self._track_deletion(job)
+
+        return job
+
+    async def reindex(
+            self,
+            name: str,
+            dims: Optional[int] = None,
+            vector_index: Optional[VectorIndexType] = None,
+            batch_size: int = 256
+    ) -> ReindexProgress:
+        """
+        Start (or resume) re-embedding an index group into a shadow index, swapped in when done.
+        Searches keep working against the current index while the job runs in the background.
+
+        :param name: The name of the index group
+        :param dims: The new embedding dimensions
+        :param vector_index: The new vector index type (e.g. to quantize an existing group)
+        :param batch_size: Nodes per embedding batch & bulk write
+        :return: The job's progress at start
+
+        """
+
+        if not await self.exists(name=name):
+            raise GroupNotFoundError()
+
+        job = ReindexJob(self.vector_store, self.embedder, name, dims=dims, vector_index=vector_index, batch_size=batch_size)
+
+        # Claims the job in Elasticsearch, so it raises if any worker is running the group's job
+        progress: ReindexProgress = await asyncio.get_event_loop().run_in_executor(None, job.plan)
+
+        task = asyncio.create_task(job.arun(progress))
+        task.add_done_callback(self._log_reindex_failure)
+        self._reindex_tasks[name] = task
+
+        return progress.model_copy()
+
+    @staticmethod
+    def _log_reindex_failure(task: asyncio.Task) -> None:
+        # The failure is also recorded in the job's progress, for the status endpoint
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Re-embedding job failed: {task.exception()!r}")
+
+    async def reindex_progress(self, name: str) -> Optional[ReindexProgress]:
+        """
+        Get the progress of an index group's (last) re-embedding job
+
+        :param name: The name of the index group
+        :return: The progress, or None if the group was never re-embedded
+
+        """
+
+        if not await self.exists(name=name):
+            raise GroupNotFoundError()
+
+        job = ReindexJob(self.vector_store, self.embedder, name)
+        return await asyncio.get_event_loop().run_in_executor(None, job.load)
+
+    async def begin_ingestion(self, name: str, expire_after: int = 3600) -> None:
         """
-        Delete a Criadex index group
+        Put an index group in ingestion mode for a large import: its refresh interval is raised & uploads stop
+        refreshing it, so they write fewer, larger segments. Files become searchable when ingestion ends.
 
         :param name: The name of the index group
+        :param expire_after: Seconds after which ingestion ends on its own (renewed by calling again)
         :return: None
 
         """
@@ -188,14 +317,40 @@ class Criadex:
         if not await self.exists(name=name):
             raise GroupNotFoundError()
 
-        group_id: int = (await self.about(name=name)).id
+        await self.vector_store.abegin_ingestion(collection_name=name, expire_after=expire_after)
 
-        # Delete MySQL documents and assets
-        await self.mysql_api.assets.delete_all_group_assets(group_id=group_id)
-        await self.mysql_api.documents.delete_all(group_id=group_id)
+        # A lease, so a client that never ends its import can't leave the group unrefreshed. The timer only ends it
+        # if it wasn't renewed (perhaps through another worker); a write seeing it expired ends it if this worker dies.
+        timer: Optional[asyncio.TimerHandle] = self._ingestion_timers.pop(name, None)
+        if timer is not None:
+            timer.cancel()
 
-        # Delete group itself
-        await self.mysql_api.groups.delete(name=name)
+        self._ingestion_timers[name] = asyncio.get_event_loop().call_later(expire_after + 1, self._expire_ingestion, name)
+
+    async def end_ingestion(self, name: str) -> bool:
+        """
+        End an index group's ingestion mode, restoring its refresh interval & refreshing it once
+
+        :param name: The name of the index group
+        :return: Whether the group was in ingestion mode
+
+        """
+
+        timer: Optional[asyncio.TimerHandle] = self._ingestion_timers.pop(name, None)
+        if timer is not None:
+            timer.cancel()
+
+        return await self.vector_store.aend_ingestion(collection_name=name)
+
+    def _expire_ingestion(self, name: str) -> None:
+        self._ingestion_timers.pop(name, None)
+        task = asyncio.create_task(self.vector_store.aend_ingestion(collection_name=name, expired_only=True))
+        task.add_done_callback(self._log_ingestion_failure)
+
+    @staticmethod
+    def _log_ingestion_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Failed to end an expired ingestion: {task.exception()!r}")
 
     async def get_id(
             self,
@@ -235,6 +390,10 @@ class Criadex:
         """
         group_id = await self.get_id(name=group_name)
 
+        # Its pending delete would otherwise remove the new file's row once it completes
+        if await self._running_deletion(group_name, file_name) is not None:
+            raise DeletionRunningError()
+
         if await self.mysql_api.documents.exists(group_id=group_id, document_name=file_name):
             raise DocumentExistsError()
 
@@ -277,7 +436,10 @@ class Criadex:
                 doc_id=doc_id,
                 embedding=embedding,
                 text=text,
-                metadata=metadata
+                metadata=metadata,
+                routing=self.vector_store.routing(group_name),
+                # Only the file's last node applies the file policy: one refresh per file, not per node
+                refresh=self.vector_store.write_policy.file if i == len(nodes_to_insert) - 1 else None
             )
 
         await self.mysql_api.documents.insert(document_name=file_name, group_id=group_id)
@@ -293,13 +455,138 @@ class Criadex:
         await self.vector_store.adelete_by_query(
             collection_name=group_name,
             field="file_name",
-            value=document_name
+            value=document_name,
+            routing=self.vector_store.routing(group_name)
         )
 
         await self.mysql_api.assets.delete_all_document_assets(document_id=document.id)
         await self.mysql_api.documents.delete(group_id=group_id, document_name=document.name)
 
+    async def submit_file_deletion(self, group_name: str, document_name: str) -> DeletionJob:
+        """
+        Start deleting a file from the group. Its nodes are deleted by a background task, & its MySQL rows once that
+        task is done. The file is hidden from the group's file list in the meantime.
+
+        :param group_name: The name of the index group
+        :param document_name: The name of the file
+        :return: The deletion job
+
+        """
+
+        group_id: int = await self.get_id(name=group_name)
+
+        running: Optional[DeletionJob] = await self._running_deletion(group_name, document_name)
+        if running is not None:
+            return running
+
+        document: Optional[DocumentsModel] = await self.mysql_api.documents.retrieve(group_id=group_id, document_name=document_name)
+        if document is None:
+            raise DocumentNotFoundError()
+
+        task_id: str = await self.vector_store.asubmit_delete_by_query(
+            collection_name=group_name,
+            field="file_name",
+            value=document_name,
+            routing=self.vector_store.routing(group_name)
+        )
+
+        job: DeletionJob = await self.deletion_jobs.acreate(
+            group_name=group_name,
+            document_name=document_name,
+            document_id=document.id,
+            tasks=[task_id]
+        )
+        self._track_deletion(job)
+        return job
+
+    async def _running_deletion(self, group_name: str, document_name: Optional[str] = None) -> Optional[DeletionJob]:
+        # Looked up in Elasticsearch rather than this worker's reaper, since any worker may have started it
+        jobs: List[DeletionJob] = await self.deletion_jobs.arunning(group_name=group_name, document_name=document_name)
+        return next((job for job in jobs if job.document_name == document_name), None)
+
+    async def deletion(self, group_name: str, job_id: str) -> Optional[DeletionJob]:
+        """
+        Get a group's (or one of its files') deletion job
+
+        :param group_name: The name of the index group
+        :param job_id: The job ID
+        :return: The job, or None if the group has no such job
+
+        """
+
+        job: Optional[DeletionJob] = self._deletions.get(job_id) or await self.deletion_jobs.aload(job_id)
+        return job if job is not None and job.group_name == group_name else None
+
+    def _track_deletion(self, job: DeletionJob) -> None:
+        if job.status != "running":
+            return
+
+        self._deletions[job.job_id] = job
+
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_deletions())
+
+    async def _reap_deletions(self) -> None:
+        """Poll the running deletions' tasks until none are left, finishing each deletion as its tasks complete"""
+
+        while self._deletions:
+            await asyncio.sleep(DELETION_POLL_INTERVAL)
+
+            for job in list(self._deletions.values()):
+                try:
+                    done: bool = await self.deletion_jobs.apoll(job)
+                except Exception as ex:
+                    # e.g. Elasticsearch is unreachable; try again next round
+                    logging.warning(f"Could not poll deletion job {job.job_id}: {ex!r}")
+                    continue
+
+                if done:
+                    self._deletions.pop(job.job_id, None)
+                    await self._finish_deletion(job)
+
+    async def _finish_deletion(self, job: DeletionJob) -> None:
+        """
+        Delete the MySQL rows of a deletion whose vectors are gone, & record the job's outcome.
+        Only the worker that claims the job does, & the rows are deleted by the IDs captured at submission,
+        so finishing a job again (e.g. after its claimant stopped) never touches a re-created group or file.
+        """
+
+        if not await self.deletion_jobs.aclaim(job):
+            # Another worker is finishing it. Keep polling until its outcome is recorded, in case that worker stops first.
+            self._track_deletion(job)
+            return
+
+        try:
+            if job.error is not None:
+                # Keep the rows, so the group or file is still listed & the deletion can be retried
+                raise RuntimeError(job.error)
+
+            group: Optional[GroupsModel] = await self.mysql_api.groups.retrieve(name=job.group_name)
+
+            if group is not None and job.document_name is None and job.group_id in (None, group.id):
+                await self.mysql_api.assets.delete_all_group_assets(group_id=group.id)
+                await self.mysql_api.documents.delete_all(group_id=group.id)
+                await self.mysql_api.groups.delete(name=job.group_name)
+
+            elif job.document_id is not None:
+                # By the row captured at submission, never by name: a later upload of the file has its own row
+                await self.mysql_api.assets.delete_all_document_assets(document_id=job.document_id)
+                await self.mysql_api.documents.delete_by_id(document_id=job.document_id)
+
+            job.status = "completed"
+        except Exception as ex:
+            job.status, job.error = "failed", job.error or repr(ex)
+            logging.error(f"Deletion job {job.job_id} failed: {job.error}")
+
+        try:
+            await self.deletion_jobs.asave(job)
+        except Exception as ex:
+            logging.warning(f"Could not record the outcome of deletion job {job.job_id}: {ex!r}")
+
     async def update_file(self, group_name: str, file_name: str, file_contents: dict, file_metadata: dict) -> int:
+        if await self._running_deletion(group_name, file_name) is not None:
+            raise DeletionRunningError()
+
         await self.delete_file(group_name=group_name, document_name=file_name)
         result = await self.insert_file(group_name=group_name, file_name=file_name, file_contents=file_contents, file_metadata=file_metadata)
         # Clear cache for this group/file after update
@@ -321,8 +608,11 @@ class Criadex:
 
         results: list[DocumentsModel] = await self.mysql_api.documents.list(group_id=group_id)
 
+        # Files being deleted (by any worker) keep their rows until their nodes are gone, but are no longer listed
+        deleting: set = {job.document_name for job in await self.deletion_jobs.arunning(group_name=group_name)}
+
         # Just extract the file names
-        return [result.name for result in results]
+        return [result.name for result in results if result.name not in deleting]
 
 
     async def shutdown(self) -> None:
@@ -333,6 +623,10 @@ class Criadex:
 
         """
 
+        if self._reaper is not None:
+            # Running deletions are resumed from their recorded jobs on the next start
+            self._reaper.cancel()
+
         await self.mysql_api.shutdown()
         self.mysql_pool.close()
         await self.mysql_pool.wait_closed()
@@ -344,24 +638,114 @@ class Criadex:
         if not await self.exists(name=group_name):
             raise GroupNotFoundError()
 
+        # Reject malformed filters before searching (raises InvalidSearchFilterError)
+        compile_filter(query.search_filter)
+
         # Use bot for semantic search and cache results
         self.event.emit(Event.SEARCH, query=query)
         
         # Create a hashable key from the Pydantic model
-        cache_key = query.model_dump_json()
+        cache_key = self._search_cache_key(group_name, query)
         
         cached = self.cache.get(cache_key)
         if cached:
             return cached # Return the cached result
         
         # If not cached, perform the search
-        results = await self.bot.search(group_name, query.query, top_k=query.top_k, query_filter=query_filter)
+        results = await self.bot.search(
+            group_name,
+            query.query,
+            top_k=query.top_k,
+            query_filter=combine_filters(query.search_filter, query_filter),
+            hybrid=self._hybrid_search(query),
+            min_similarity=query.min_k,
+            routing=self.vector_store.routing(group_name)
+        )
         
         # Cache the new result
         self.cache.set(cache_key, results)
         
         return results
 
+    async def search_many(self, group_name: str, queries: List[SearchConfig]) -> List[IndexResponse]:
+        """
+        Search a group with several queries at once. Cached queries are served from the cache,
+        the rest are embedded in one batch & executed as a single Elasticsearch multi-search.
+
+        :param group_name: The name of the index group
+        :param queries: The search configurations
+        :return: One response per query, in order
+
+        """
+
+        if not await self.exists(name=group_name):
+            raise GroupNotFoundError()
+
+        # Reject malformed filters before searching (raises InvalidSearchFilterError)
+        for query in queries:
+            compile_filter(query.search_filter)
+
+        responses: List[Optional[IndexResponse]] = []
+        misses: List[int] = []
+
+        for idx, query in enumerate(queries):
+            self.event.emit(Event.SEARCH, query=query)
+            cached = self.cache.get(self._search_cache_key(group_name, query))
+            responses.append(cached)
+
+            if not cached:
+                misses.append(idx)
+
+        if misses:
+            results = await self.bot.search_many(
+                group_name,
+                [queries[idx].query for idx in misses],
+                top_ks=[queries[idx].top_k for idx in misses],
+                query_filters=[queries[idx].search_filter for idx in misses],
+                hybrids=[self._hybrid_search(queries[idx]) for idx in misses],
+                min_similarities=[queries[idx].min_k for idx in misses],
+                routing=self.vector_store.routing(group_name)
+            )
+
+            for idx, result in zip(misses, results):
+                self.cache.set(self._search_cache_key(group_name, queries[idx]), result)
+                responses[idx] = result
+
+        return responses
+
+    @classmethod
+    def _hybrid_search(cls, query: SearchConfig) -> Optional[HybridSearch]:
+        """
+        Build the hybrid search options of a search, if it is one
+
+        :param query: The search configuration
+        :return: The hybrid options, or None for a vector-only search
+
+        """
+
+        if query.search_mode != "hybrid":
+            return None
+
+        return HybridSearch(
+            query_text=query.query,
+            fusion=query.fusion,
+            vector_weight=query.vector_weight,
+            rrf_k=query.rrf_k
+        )
+
+    @classmethod
+    def _search_cache_key(cls, group_name: str, query: SearchConfig) -> str:
+        """
+        Build the cache key for a search. Scoped by group so identical queries against different groups don't collide.
+
+        :param group_name: The name of the index group
+        :param query: The search configuration
+        :return: The cache key
+
+        """
+
+        return f"search:{group_name}:{query.model_dump_json()}"
+
     async def insert_azure_model(self, config: AzureModelsBaseModel) -> AzureModelsModel:
         """
         Insert an Azure model config into the database.
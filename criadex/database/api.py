@@ -26,6 +26,11 @@ from criadex.database.tables.models.cohere import CohereModels
 from criadex.database.tables.documents import Documents
 from criadex.database.tables.groups import Groups
 
+"""Columns added to existing tables after their CREATE TABLE (which is skipped when a table exists): (table, column, definition)"""
+COLUMN_MIGRATIONS: tuple = (
+    ("AzureModels", "embedding_dims", "INT NULL"),
+)
+
 
 class GroupDatabaseAPI(BaseDatabaseAPI):
     async def shutdown(self) -> None:
@@ -73,3 +78,13 @@ class GroupDatabaseAPI(BaseDatabaseAPI):
                 with warnings.catch_warnings():
                     warnings.filterwarnings("ignore", category=Warning)
                     await cursor.execute(queries)
+
+                for table, column, definition in COLUMN_MIGRATIONS:
+                    await cursor.execute(
+                        "SELECT 1 FROM information_schema.COLUMNS "
+                        "WHERE `TABLE_SCHEMA`=DATABASE() AND `TABLE_NAME`=%s AND `COLUMN_NAME`=%s",
+                        (table, column)
+                    )
+
+                    if not await cursor.fetchone():
+                        await cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN `{column}` {definition}")
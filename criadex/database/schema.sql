@@ -9,6 +9,7 @@ CREATE TABLE IF NOT EXISTS `AzureModels`
     `api_key`        VARCHAR(128) NOT NULL,
     `api_deployment` VARCHAR(128) NOT NULL,
     `api_model`      VARCHAR(128) NOT NULL,
+    `embedding_dims` INT          NULL,
     UNIQUE (`api_resource`, `api_deployment`)
 );
 
@@ -16,7 +16,8 @@ You should have received a copy of the GNU General Public License along with Cri
 
 from abc import abstractmethod, ABC
 from contextlib import asynccontextmanager
-from typing import Optional, Tuple, Any, Dict
+from functools import cache
+from typing import Optional, Tuple, Any, Dict, List, Sequence, FrozenSet, Callable
 
 from aiomysql import Pool, Cursor
 from pydantic import BaseModel
@@ -106,9 +107,10 @@ class TableModel(BaseModel):
 
     """
     @classmethod
+    @cache
     def get_fields(cls) -> Tuple[str, ...]:
         """
-        See the fields in the TableModel
+        See the fields in the TableModel. Cached per-class, as the field order never changes at runtime.
 
         :return: Tuple of field names
 
@@ -116,6 +118,41 @@ class TableModel(BaseModel):
 
         return tuple(cls.model_fields.keys())
 
+    @classmethod
+    @cache
+    def _compile_mapper(cls) -> Callable[[Tuple[Any, ...]], "TableModel"]:
+        """
+        Compile a tuple -> model mapper for trusted rows. Cached per-class.
+        Writes the pydantic slots directly (what `model_construct` does, minus the per-field default lookups),
+        so it must ONLY be used for complete rows selected with `to_query_str`.
+
+        :return: The mapper
+
+        """
+
+        fields: Tuple[str, ...] = cls.get_fields()
+        fields_set: FrozenSet[str] = frozenset(fields)
+
+        # Private attributes need pydantic's own initialization
+        if cls.__private_attributes__:
+            return lambda row: cls.model_construct(_fields_set=set(fields_set), **dict(zip(fields, row)))
+
+        new_instance = object.__new__
+        set_attr = object.__setattr__
+        set_fields_set = BaseModel.__dict__['__pydantic_fields_set__'].__set__
+        set_extra = BaseModel.__dict__['__pydantic_extra__'].__set__
+        set_private = BaseModel.__dict__['__pydantic_private__'].__set__
+
+        def mapper(row: Tuple[Any, ...]) -> TableModel:
+            instance: TableModel = new_instance(cls)
+            set_attr(instance, '__dict__', dict(zip(fields, row)))
+            set_fields_set(instance, set(fields_set))
+            set_extra(instance, None)
+            set_private(instance, None)
+            return instance
+
+        return mapper
+
     @classmethod
     def to_query_str(cls) -> str:
         """
@@ -145,24 +182,66 @@ class TableModel(BaseModel):
         if len(results) != len(fields):
             raise ValueError("Cannot unpack unequal length!")
 
-        return {field: results[idx] for idx, field in enumerate(fields)}
+        return dict(zip(fields, results))
 
     @classmethod
-    def from_results(cls, results: Optional[Tuple[Any]]) -> Optional["TableModel"]:
+    def from_results(cls, results: Optional[Tuple[Any]], trusted: bool = False) -> Optional["TableModel"]:
         """
         Pack the results of a retrieval into the model itself
 
         :param results: List of results
+        :param trusted: Skip pydantic validation. Only for rows selected with `to_query_str` from our own schema.
         :return: The model
 
         """
 
+        if trusted:
+            return cls.from_results_many([results], trusted=True)[0] if results is not None else None
+
         results_dict: Optional[Dict[str, Any]] = cls.to_results_dict(results)
         if results_dict is None:
             return None
 
         return cls(**results_dict)
 
+    @classmethod
+    def from_results_many(
+            cls,
+            results: Optional[Sequence[Optional[Tuple[Any]]]],
+            trusted: bool = False
+    ) -> List["TableModel"]:
+        """
+        Pack a whole result set (e.g. from `fetchall`) into models, skipping empty rows
+
+        :param results: The rows
+        :param trusted: Skip pydantic validation. Only for rows selected with `to_query_str` from our own schema.
+        :return: List of models
+
+        """
+
+        if not results:
+            return []
+
+        fields: tuple = cls.get_fields()
+        field_count: int = len(fields)
+
+        if not trusted:
+            return [cls(**cls.to_results_dict(row)) for row in results if row is not None]
+
+        mapper: Callable[[Tuple[Any, ...]], TableModel] = cls._compile_mapper()
+        models: List[TableModel] = []
+
+        for row in results:
+            if row is None:
+                continue
+
+            if len(row) != field_count:
+                raise ValueError("Cannot unpack unequal length!")
+
+            models.append(mapper(row))
+
+        return models
+
 
 class BaseDatabaseAPI:
     """
@@ -85,6 +85,21 @@ class Documents(Table):
                 (group_id, *document_names)
             )
 
+    async def delete_by_id(self, document_id: int) -> None:
+        """
+        Delete a document reference from the database by its primary key
+
+        :param document_id: The document's primary key
+        :return: None
+        """
+
+        async with self.cursor() as cursor:
+            await cursor.execute(
+                "DELETE FROM Documents "
+                "WHERE `id`=%s",
+                (document_id,)
+            )
+
     async def delete_all(self, group_id: int) -> None:
         """
         Delete all document references for a given index
@@ -120,7 +135,8 @@ class Documents(Table):
             )
 
             return DocumentsModel.from_results(
-                await cursor.fetchone()
+                await cursor.fetchone(),
+                trusted=True
             )
 
     async def list(self, group_id: int) -> List[DocumentsModel]:
@@ -142,11 +158,7 @@ class Documents(Table):
 
             results: Optional[Tuple[tuple]] = await cursor.fetchall()
 
-        return list(
-            DocumentsModel.from_results(result)
-            for result in results
-            if result is not None
-        ) if results is not None else list()
+        return DocumentsModel.from_results_many(results, trusted=True)
 
     async def exists(self, group_id: int, document_name: str) -> bool:
         """
@@ -107,7 +107,6 @@ class Groups(Table):
         if len(index_ids) < 1:
             return []
 
-        indexes: List[GroupsModel] = []
         placeholders = ', '.join(['%s'] * len(index_ids))
 
         async with self.cursor() as cursor:
@@ -120,12 +119,7 @@ class Groups(Table):
 
             results: Optional[tuple] = await cursor.fetchall()
 
-            for result in results:
-                indexes.append(
-                    GroupsModel.from_results(result)
-                )
-
-        return indexes
+        return GroupsModel.from_results_many(results, trusted=True)
 
     async def retrieve(self, name: str) -> Optional[GroupsModel]:
         """
@@ -145,7 +139,8 @@ class Groups(Table):
             )
 
             return GroupsModel.from_results(
-                await cursor.fetchone()
+                await cursor.fetchone(),
+                trusted=True
             )
 
     async def exists(self, name: str) -> bool:
@@ -14,8 +14,9 @@ You should have received a copy of the GNU General Public License along with Cri
 
 """
 
-from typing import Optional, Type, Literal
+from typing import Optional, Type, Literal, Dict
 
+from pydantic import Field
 
 from criadex.database.schemas import TableModel, Table
 
@@ -36,6 +37,14 @@ AZURE_MODELS: Type = Literal[
     "text-embedding-3-small"
 ]
 
+"""Native embedding dimensions of the supported embedding models, for rows that don't set embedding_dims"""
+EMBEDDING_MODEL_DIMS: Dict[str, int] = {
+    "text-embedding-ada-001": 1024,
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072
+}
+
 
 class AzureModelsPartialBaseModel(TableModel):
     """
@@ -47,6 +56,7 @@ class AzureModelsPartialBaseModel(TableModel):
     api_version: str = "2023-05-15"
     api_key: str = "your-controllers-key"
     api_deployment: str = "your-deployment-name"
+    embedding_dims: Optional[int] = Field(default=None, ge=1)
 
 
 class AzureModelsBaseModel(AzureModelsPartialBaseModel):
@@ -82,6 +92,17 @@ class AzureModelsModel(AzureModelsBaseModel):
 
         return f"https://{self.api_resource}.openai.azure.com"
 
+    @property
+    def dims(self) -> Optional[int]:
+        """
+        Embedding dimensions of the model (the configured ones, else the model's native ones)
+
+        :return: The dimensions, or None if this is not a known embedding model
+
+        """
+
+        return self.embedding_dims or EMBEDDING_MODEL_DIMS.get(self.api_model)
+
     @property
     def additional_kwargs(self) -> dict:
         """
@@ -117,9 +138,9 @@ class AzureModels(Table):
 
             await cursor.execute(
                 "UPDATE AzureModels "
-                "SET `api_resource`=%s, `api_version`=%s, `api_key`=%s, `api_deployment`=%s "
+                "SET `api_resource`=%s, `api_version`=%s, `api_key`=%s, `api_deployment`=%s, `embedding_dims`=%s "
                 "WHERE id=%s",
-                (config.api_resource, config.api_version, config.api_key, config.api_deployment, config.id)
+                (config.api_resource, config.api_version, config.api_key, config.api_deployment, config.embedding_dims, config.id)
             )
         return await self.retrieve(config.id)
 
@@ -139,14 +160,15 @@ class AzureModels(Table):
 
             await cursor.execute(
                 "INSERT INTO AzureModels "
-                "(`api_resource`, `api_version`, `api_key`, `api_deployment`, `api_model`) "
-                "VALUES (%s, %s, %s, %s, %s)",
+                "(`api_resource`, `api_version`, `api_key`, `api_deployment`, `api_model`, `embedding_dims`) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
                 (
                     config.api_resource,
                     config.api_version,
                     config.api_key,
                     config.api_deployment,
-                    config.api_model
+                    config.api_model,
+                    config.embedding_dims
                 )
             )
 
@@ -255,10 +277,10 @@ class AzureModels(Table):
                 "FROM AzureModels"
             )
 
-            return [
-                AzureModelsModel.from_results(row)
-                for row in await cursor.fetchall()
-            ]
+            return AzureModelsModel.from_results_many(
+                await cursor.fetchall(),
+                trusted=True
+            )
 
     async def truncate(self) -> None:
         """
@@ -205,10 +205,10 @@ class CohereModels(Table):
                 "FROM CohereModels"
             )
 
-            return [
-                CohereModelsModel.from_results(row)
-                for row in await cursor.fetchall()
-            ]
+            return CohereModelsModel.from_results_many(
+                await cursor.fetchall(),
+                trusted=True
+            )
 
     async def truncate(self) -> None:
         """
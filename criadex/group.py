@@ -15,10 +15,12 @@ You should have received a copy of the GNU General Public License along with Cri
 """
 import os
 import time
-from typing import List
+from typing import List, Optional
 
 from criadex.index.base_api import CriadexIndexAPI
+from criadex.index.ragflow_objects.filters import combine_filters
 from criadex.index.ragflow_objects.schemas import FILE_NAME_META_STR, FILE_GROUP_META_STR
+from criadex.index.ragflow_objects.vector_store import WritePolicy
 from criadex.index.schemas import SearchConfig
 
 
@@ -35,42 +37,36 @@ class Group:
             self,
             *,
             name: str,
-            index: CriadexIndexAPI
+            index: CriadexIndexAPI,
+            write_policy: Optional[WritePolicy] = None
     ):
         """
         Initialize the group given its name & index
 
         :param name: The name of the group
         :param index: The index the group belongs to
+        :param write_policy: The vector store's refresh policies (its defaults if None)
 
         """
 
         self._group_name: str = name
         self._index: CriadexIndexAPI = index
+        self._write_policy: WritePolicy = write_policy or WritePolicy()
         self._last_used: float = time.time()
 
-    def _create_http_group_search_condition(self, config: SearchConfig) -> List[dict]:
+    def _create_http_group_search_condition(self, config: SearchConfig) -> dict:
         """
-        Create the filter conditions for a given SearchConfig object suitable for application-layer filtering
+        Create the group filter condition for a given SearchConfig object, matching this group & any extra groups
 
         :param config: The search configuration
-        :return: The search conditions (list of dicts)
+        :return: The search condition (a terms condition in the Criadex filter DSL)
 
         """
 
-        # Create search condition array & populate with this group
-        search_conditions: list[dict] = [{FILE_GROUP_META_STR: self._group_name}]
+        # This group plus the extra groups, without duplicates
+        group_names: List[str] = [self._group_name, *sorted(set(config.extra_groups or []) - {self._group_name})]
 
-        # Extra groups can be added to the filter as well
-        for group_name in set(config.extra_groups or []):
-
-            # Prevent duplicate
-            if group_name == self._group_name:
-                continue
-
-            search_conditions.append({FILE_GROUP_META_STR: group_name})
-
-        return search_conditions
+        return {FILE_GROUP_META_STR: group_names}
 
     async def search(self, config: SearchConfig):
         """
@@ -83,16 +79,11 @@ class Group:
 
         self._last_used = time.time()
 
-        search_filter = config.search_filter or {}
-
-        # Add the group constraint to the filter (OR semantics over groups)
-        # Represented as {"should": [{FILE_GROUP_META_STR: name}, ...]}
-        group_should = self._create_http_group_search_condition(config)
-        existing_should = search_filter.get("should", [])
-        search_filter["should"] = [*group_should, *existing_should]
-
-        # Replace the search filter with the modded one
-        config.search_filter = search_filter
+        # AND the group constraint with the user's filter (compiled to an Elasticsearch bool query by the store)
+        config.search_filter = combine_filters(
+            {"must": [self._create_http_group_search_condition(config)]},
+            config.search_filter
+        )
 
         # Search the index given the generated group-constrained config
         return await self._index.search(config)
@@ -124,7 +115,8 @@ class Group:
                 }
             }
         }
-        await es.delete_by_query(index=index_name, body=query, conflicts="proceed", refresh=True)
+        # Delete-by-query only takes a boolean refresh: "true" refreshes once when done, otherwise the refresh interval applies
+        await es.delete_by_query(index=index_name, body=query, conflicts="proceed", refresh=self._write_policy.delete == "true")
 
     async def delete(self) -> None:
         """
@@ -148,7 +140,7 @@ class Group:
                 }
             }
         }
-        await es.delete_by_query(index=index_name, body=query, conflicts="proceed", refresh=True)
+        await es.delete_by_query(index=index_name, body=query, conflicts="proceed", refresh=self._write_policy.delete == "true")
 
     @property
     def expired(self) -> bool:
@@ -22,6 +22,7 @@ from criadex.index.schemas import ServiceConfig, BundleConfig
 from ..database.api import GroupDatabaseAPI
 from ..database.tables.groups import GroupsModel
 from criadex.index.ragflow_objects.schemas import RagflowDocument, RagflowQuery
+from criadex.index.ragflow_objects.embedder import DEFAULT_EMBEDDING_DIMS
 
 import json
 from pydantic import BaseModel
@@ -36,25 +37,6 @@ class ContentUploadConfig(BaseModel):
 
 
 class CriadexIndexAPI(Generic[BundleConfig]):
-    def _matches_filter(self, node: dict, search_filter: Dict[str, Any]) -> bool:
-        """
-        Basic application-layer filter logic migrated from Qdrant/MySQL to Ragflow/Elasticsearch.
-        Supports structure: {"must": {k: v, ...}, "should": [{k: v}, ...]}
-        Keys are matched against node.metadata values.
-        """
-        if not search_filter:
-            return True
-        metadata = node.get('metadata', {}) or {}
-        must = search_filter.get('must', {})
-        for key, value in must.items():
-            if metadata.get(key) != value:
-                return False
-        should = search_filter.get('should', [])
-        if should:
-            if not any(metadata.get(list(cond.keys())[0]) == list(cond.values())[0] for cond in should if cond):
-                return False
-        return True
-
     """
     API Wrapper for interacting with Ragflow/Elasticsearch-wrapped vector collections
 
@@ -142,7 +124,7 @@ class CriadexIndexAPI(Generic[BundleConfig]):
                 node_metadata = {**document.metadata, **node_data.get('metadata', {})} # Merge document metadata with node metadata
                 
                 # Generate a dummy embedding for now
-                embedding = [1.0] * 768 # Assuming 768 dimensions
+                embedding = [1.0] * DEFAULT_EMBEDDING_DIMS
 
                 await self._index.ainsert(
                     collection_name=document.collection_name,
@@ -164,7 +146,7 @@ class CriadexIndexAPI(Generic[BundleConfig]):
                 question_text = parsed_config['questions'][0]
                 question_id = f"{document.doc_id}-q0"
                 question_metadata = {**document.metadata} # Use document metadata
-                embedding = [1.0] * 768
+                embedding = [1.0] * DEFAULT_EMBEDDING_DIMS
                 await self._index.ainsert(
                     collection_name=document.collection_name,
                     doc_id=question_id,
@@ -179,7 +161,7 @@ class CriadexIndexAPI(Generic[BundleConfig]):
                 answer_text = parsed_config['answer']
                 answer_id = f"{document.doc_id}-a0"
                 answer_metadata = {**document.metadata} # Use document metadata
-                embedding = [1.0] * 768
+                embedding = [1.0] * DEFAULT_EMBEDDING_DIMS
                 await self._index.ainsert(
                     collection_name=document.collection_name,
                     doc_id=answer_id,
@@ -1,8 +1,10 @@
 
 from .vector_store import RagflowVectorStore
+from .layout import IndexLayout
 from .embedder import RagflowEmbedder
 from .retriever import RagflowRetriever
 from .index_retriever import RagflowIndexRetriever
 from .postprocessor import RagflowPostprocessor
+from .local_rerank import LocalReranker
 from .schemas import RagflowDocument, RagflowQuery
 from .extra_utils import token_count, add_token_metadata, TOKEN_COUNT_METADATA_KEY
@@ -5,6 +5,13 @@ import logging
 import hashlib
 from datetime import datetime
 import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Dict, Any, List, Optional
+
+import aiomysql
+
+from criadex.index.ragflow_objects.history import HistoryBudget, HistoryCompactor
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -14,6 +21,41 @@ RAGFLOW_DB_USER = os.getenv("RAGFLOW_DB_USER", "root")
 RAGFLOW_DB_PASSWORD = os.getenv("RAGFLOW_DB_PASSWORD", "password")
 RAGFLOW_DB_NAME = os.getenv("RAGFLOW_DB_NAME", "rag_flow")
 RAGFLOW_TENANT_ID = os.getenv("RAGFLOW_TENANT_ID", "default_tenant")
+RAGFLOW_DB_POOL_SIZE = int(os.getenv("RAGFLOW_DB_POOL_SIZE", "5"))
+RAGFLOW_KNOWN_DIALOGS_MAX = int(os.getenv("RAGFLOW_KNOWN_DIALOGS_MAX", "100000"))
+RAGFLOW_SUMMARY_USAGE_MAX = int(os.getenv("RAGFLOW_SUMMARY_USAGE_MAX", "10000"))
+
+DIALOG_INSERT_IGNORE_QUERY = """
+INSERT IGNORE INTO dialog (
+    id, create_time, create_date, update_time, update_date,
+    tenant_id, name, description, language, llm_id, llm_setting,
+    prompt_type, prompt_config, similarity_threshold,
+    vector_similarity_weight, top_n, top_k, do_refer, rerank_id,
+    kb_ids, status
+) VALUES (
+    %s, %s, %s, %s, %s,
+    %s, %s, %s, %s, %s, %s,
+    %s, %s, %s,
+    %s, %s, %s, %s, %s,
+    %s, %s
+)
+"""
+
+# Streaming has no total deadline; only the gap between two chunks is bounded
+RAGFLOW_STREAM_TIMEOUT = httpx.Timeout(connect=10.0, read=float(os.getenv("RAGFLOW_STREAM_READ_TIMEOUT", "60")), write=10.0, pool=10.0)
+
+EMPTY_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+# A plain OpenAI-compatible chat completions endpoint (no dialog, session or retrieval) to summarize history with.
+# Unset, the "summarize" history budget strategy drops older turns instead.
+HISTORY_SUMMARY_URL = os.getenv("HISTORY_SUMMARY_URL")
+HISTORY_SUMMARY_MODEL = os.getenv("HISTORY_SUMMARY_MODEL", "gpt-4o-mini")
+HISTORY_SUMMARY_API_KEY = os.getenv("HISTORY_SUMMARY_API_KEY")
+
+SUMMARY_INSTRUCTION = (
+    "Summarize the conversation below in a few sentences for the assistant's own reference. "
+    "Keep names, facts, decisions and open questions. Reply with the summary only."
+)
 
 
 class RagflowChatAgent:
@@ -22,6 +64,111 @@ class RagflowChatAgent:
     Handles errors gracefully with proper logging and fallback responses.
     """
 
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, db_pool: Optional[aiomysql.Pool] = None):
+        """
+        :param client: A shared, pooled HTTP client (owned by the app). Without one, each request opens its own.
+        :param db_pool: A shared Ragflow DB pool (owned by the app). Without one, each ensure opens its own connection.
+        """
+        self._client: Optional[httpx.AsyncClient] = client
+        self._db_pool: Optional[aiomysql.Pool] = db_pool
+
+        # (tenant_id, dialog_id) pairs known to exist, so repeat ensures skip the DB entirely
+        self._known_dialogs: OrderedDict = OrderedDict()
+
+        # Fits long histories into per-request token budgets, caching summaries per chat
+        self._history_compactor: HistoryCompactor = HistoryCompactor()
+
+        # chat_id -> usage of the summaries made for it since its last response, reported with the next one.
+        # Chats that never respond again are evicted, least recently summarized first.
+        self._summary_usage: OrderedDict = OrderedDict()
+
+    @classmethod
+    async def create_db_pool(cls) -> aiomysql.Pool:
+        """
+        Create a pool for the Ragflow database. Connections are opened lazily, so startup does not depend on it.
+
+        :return: The pool
+        """
+        return await aiomysql.create_pool(
+            host=RAGFLOW_DB_HOST,
+            user=RAGFLOW_DB_USER,
+            password=RAGFLOW_DB_PASSWORD,
+            db=RAGFLOW_DB_NAME,
+            minsize=0,
+            maxsize=RAGFLOW_DB_POOL_SIZE,
+            autocommit=True
+        )
+
+    @property
+    def db_pool(self) -> Optional[aiomysql.Pool]:
+        return self._db_pool
+
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Yield the shared client, or a throwaway one (with the legacy 30s timeout) if none was given.
+        """
+        if self._client is not None:
+            yield self._client
+            return
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            yield client
+
+    @asynccontextmanager
+    async def _db_cursor(self) -> AsyncIterator[aiomysql.Cursor]:
+        """
+        Yield a cursor from the shared pool, or from a throwaway connection if no pool was given.
+        """
+        if self._db_pool is not None:
+            async with self._db_pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    yield cursor
+            return
+
+        connection = await aiomysql.connect(
+            host=RAGFLOW_DB_HOST,
+            user=RAGFLOW_DB_USER,
+            password=RAGFLOW_DB_PASSWORD,
+            db=RAGFLOW_DB_NAME,
+            autocommit=True
+        )
+        try:
+            async with connection.cursor() as cursor:
+                yield cursor
+        finally:
+            connection.close()
+
+    @staticmethod
+    def dialog_id(chat_id: str) -> str:
+        """
+        Ragflow's dialog.id column is varchar(32), so hash the UUID to fit
+
+        :param chat_id: The chat session ID
+        :return: The dialog ID
+        """
+        return hashlib.md5(chat_id.encode()).hexdigest()[:32]
+
+    def _is_known_dialog(self, key: tuple) -> bool:
+        if key not in self._known_dialogs:
+            return False
+        self._known_dialogs.move_to_end(key)
+        return True
+
+    def _remember_dialog(self, key: tuple) -> None:
+        self._known_dialogs[key] = True
+        self._known_dialogs.move_to_end(key)
+        if len(self._known_dialogs) > RAGFLOW_KNOWN_DIALOGS_MAX:
+            self._known_dialogs.popitem(last=False)
+
+    def _record_summary_usage(self, chat_id: str, usage: dict) -> None:
+        summary_usage: dict = self._summary_usage.setdefault(chat_id, dict(EMPTY_USAGE))
+        self._summary_usage.move_to_end(chat_id)
+        for key in EMPTY_USAGE:
+            summary_usage[key] += usage.get(key, 0)
+        if len(self._summary_usage) > RAGFLOW_SUMMARY_USAGE_MAX:
+            self._summary_usage.popitem(last=False)
+
     async def ensure_dialog_exists(self, chat_id: str, tenant_id: str = None, llm_id: str = "gpt-3.5-turbo") -> bool:
         """
         Ensure a dialog exists in Ragflow for the given chat_id.
@@ -32,124 +179,94 @@ class RagflowChatAgent:
         :param llm_id: The LLM model to use for this dialog (defaults to gpt-3.5-turbo)
         :return: True if dialog exists or was created, False otherwise
         """
+        return (await self.ensure_dialogs_exist([chat_id], tenant_id=tenant_id, llm_id=llm_id))[chat_id]
+
+    async def ensure_dialogs_exist(self, chat_ids: List[str], tenant_id: str = None, llm_id: str = "gpt-3.5-turbo") -> Dict[str, bool]:
+        """
+        Ensure dialogs exist in Ragflow for many chat_ids at once, creating missing ones in a single statement.
+        Dialogs already ensured by this agent cost no DB round trip at all.
+
+        :param chat_ids: The chat session IDs to ensure exist
+        :param tenant_id: The tenant ID (defaults to RAGFLOW_TENANT_ID from env)
+        :param llm_id: The LLM model to use for new dialogs (defaults to gpt-3.5-turbo)
+        :return: Map of chat_id to whether its dialog exists or was created
+        """
         if not tenant_id:
             tenant_id = RAGFLOW_TENANT_ID
 
+        unknown = {
+            chat_id: self.dialog_id(chat_id) for chat_id in dict.fromkeys(chat_ids)
+            if not self._is_known_dialog((tenant_id, self.dialog_id(chat_id)))
+        }
+
+        if not unknown:
+            return {chat_id: True for chat_id in chat_ids}
+
         try:
-            import aiomysql
-            
-            # Ragflow's dialog.id column is varchar(32), so hash the UUID to fit
-            dialog_id = hashlib.md5(chat_id.encode()).hexdigest()[:32]
-            
-            # Connect to Ragflow database
-            connection = await aiomysql.connect(
-                host=RAGFLOW_DB_HOST,
-                user=RAGFLOW_DB_USER,
-                password=RAGFLOW_DB_PASSWORD,
-                db=RAGFLOW_DB_NAME
-            )
-            cursor = await connection.cursor()
-
-            # Check if dialog already exists
-            check_query = "SELECT id FROM dialog WHERE id = %s AND tenant_id = %s LIMIT 1"
-            await cursor.execute(check_query, (dialog_id, tenant_id))
-            result = await cursor.fetchone()
-
-            if result:
-                logger.debug(f"Dialog {dialog_id} already exists for tenant {tenant_id}")
-                await cursor.close()
-                connection.close()
-                return True
-
-            # Dialog doesn't exist, create it
-            now_ms = int(time.time() * 1000)
-            now_dt = datetime.utcnow()
-
-            insert_query = """
-            INSERT INTO dialog (
-                id, create_time, create_date, update_time, update_date, 
-                tenant_id, name, description, language, llm_id, llm_setting, 
-                prompt_type, prompt_config, similarity_threshold, 
-                vector_similarity_weight, top_n, top_k, do_refer, rerank_id, 
-                kb_ids, status
-            ) VALUES (
-                %s, %s, %s, %s, %s,
-                %s, %s, %s, %s, %s, %s,
-                %s, %s, %s,
-                %s, %s, %s, %s, %s,
-                %s, %s
-            )
-            """
-
-            values = (
-                dialog_id,                         # id (hashed to fit varchar(32))
-                now_ms,                            # create_time
-                now_dt,                            # create_date
-                now_ms,                            # update_time
-                now_dt,                            # update_date
-                tenant_id,                         # tenant_id
-                f"chat-{chat_id[:12]}",           # name (auto-generated)
-                f"Auto-created chat session",      # description
-                "English",                         # language
-                llm_id,                            # llm_id
-                "{}",                              # llm_setting (empty JSON)
-                "simple",                          # prompt_type
-                '{"prologue":"Hi"}',               # prompt_config
-                0.2,                               # similarity_threshold
-                0.3,                               # vector_similarity_weight
-                6,                                 # top_n
-                1024,                              # top_k
-                "1",                               # do_refer
-                "",                                # rerank_id
-                "[]",                              # kb_ids (empty array)
-                "1"                                # status (1=active)
-            )
+            rows = [self._dialog_row(dialog_id, chat_id, tenant_id, llm_id) for chat_id, dialog_id in unknown.items()]
 
-            await cursor.execute(insert_query, values)
-            await connection.commit()
-            logger.info(f"Successfully created dialog {dialog_id} for tenant {tenant_id}")
-            await cursor.close()
-            connection.close()
-            return True
+            # Idempotent: existing dialogs are left untouched
+            async with self._db_cursor() as cursor:
+                await cursor.executemany(DIALOG_INSERT_IGNORE_QUERY, rows)
+
+            for dialog_id in unknown.values():
+                self._remember_dialog((tenant_id, dialog_id))
+
+            logger.debug(f"Ensured {len(unknown)} dialog(s) for tenant {tenant_id}")
+            return {chat_id: True for chat_id in chat_ids}
 
         except Exception as e:
-            logger.error(f"Failed to ensure dialog exists for {chat_id}: {str(e)}", exc_info=True)
-            return False
+            logger.error(f"Failed to ensure dialogs exist for {list(unknown)}: {str(e)}", exc_info=True)
+            return {chat_id: chat_id not in unknown for chat_id in chat_ids}
 
-    async def chat(self, chat_id: str, history: list, api_key: str):
+    @staticmethod
+    def _dialog_row(dialog_id: str, chat_id: str, tenant_id: str, llm_id: str) -> tuple:
+        """
+        Build the column values for a new auto-created dialog
+        """
+        now_ms = int(time.time() * 1000)
+        now_dt = datetime.utcnow()
+
+        return (
+            dialog_id,                         # id (hashed to fit varchar(32))
+            now_ms,                            # create_time
+            now_dt,                            # create_date
+            now_ms,                            # update_time
+            now_dt,                            # update_date
+            tenant_id,                         # tenant_id
+            f"chat-{chat_id[:12]}",           # name (auto-generated)
+            f"Auto-created chat session",      # description
+            "English",                         # language
+            llm_id,                            # llm_id
+            "{}",                              # llm_setting (empty JSON)
+            "simple",                          # prompt_type
+            '{"prologue":"Hi"}',               # prompt_config
+            0.2,                               # similarity_threshold
+            0.3,                               # vector_similarity_weight
+            6,                                 # top_n
+            1024,                              # top_k
+            "1",                               # do_refer
+            "",                                # rerank_id
+            "[]",                              # kb_ids (empty array)
+            "1"                                # status (1=active)
+        )
+
+    async def chat(self, chat_id: str, history: list, api_key: str, history_budget: Optional[HistoryBudget] = None):
         """
         Send a chat request to Ragflow and get a response.
 
         :param chat_id: The chat session ID in Ragflow
         :param history: Chat history as list of dicts with 'role' and 'content'/'blocks'
         :param api_key: API key for authentication
+        :param history_budget: Optional token budget the forwarded history is fitted into
         :return: Response dict with chat_response and usage
         :raises ValueError: If response validation fails
         """
-        if len(chat_id) == 36:
-            dialog_id = hashlib.md5(chat_id.encode()).hexdigest()[:32]
-        else:
-            dialog_id = chat_id
-        url = RAGFLOW_API_URL_TEMPLATE.format(chat_id=dialog_id)
-
-        headers = {}
-        # Use standard Bearer token format expected by Ragflow's SDK-style
-        # endpoints (e.g. those decorated with @token_required).
-        if api_key:
-            headers["Authorization"] = f"Bearer {api_key}"
-
-        # Normalize messages from various formats
-        messages = self._normalize_history(history)
-
-        payload = {
-            "model": "ragflow",
-            "messages": messages,
-            "stream": False
-        }
+        url, headers, payload, tokens_saved = self._build_request(chat_id, history, api_key, stream=False, history_budget=history_budget)
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers, timeout=30)
+            async with self._http_client() as client:
+                response = await client.post(url, json=payload, headers=headers)
                 response.raise_for_status()
                 ragflow_response = response.json()
 
@@ -178,41 +295,230 @@ class RagflowChatAgent:
 
             agent_response = {
                 "chat_response": chat_response,
-                "usage": ragflow_response.get("usage", {
-                    "prompt_tokens": 0,
-                    "completion_tokens": 0,
-                    "total_tokens": 0
-                })
+                "usage": self._usage(chat_id, ragflow_response.get("usage"), tokens_saved)
             }
 
             return agent_response
 
         except httpx.ConnectError as e:
-            error_message = f"Connection to Ragflow API failed at {url}"
-            logger.error(f"Ragflow connection error: {error_message}")
-            logger.error(f"Underlying error: {e}", exc_info=True)
-            raise ValueError(error_message)
+            raise self._connect_error(url, e)
 
         except httpx.HTTPStatusError as e:
-            error_message = f"Ragflow API returned error {e.response.status_code}: {e.response.reason_phrase}"
-            logger.error(f"Ragflow HTTP error: {error_message}")
-            try:
-                raw_response = e.response.json()
-                logger.error(f"Ragflow API response: {raw_response}")
-                # Extract more specific error message if available
-                if isinstance(raw_response, dict) and "message" in raw_response:
-                    error_message = raw_response["message"]
-            except json.JSONDecodeError:
-                raw_response = e.response.text
-                logger.error(f"Ragflow API response (not JSON): {raw_response}")
+            raise self._status_error(e)
 
+        except (httpx.RequestError, json.JSONDecodeError, KeyError) as e:
+            error_message = f"Unexpected error calling Ragflow API: {str(e)}"
+            logger.error(error_message, exc_info=True)
             raise ValueError(error_message)
 
+    async def chat_stream(
+            self,
+            chat_id: str,
+            history: list,
+            api_key: str,
+            history_budget: Optional[HistoryBudget] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream a chat completion from Ragflow as it is generated.
+
+        Yields {"type": "delta", "content": str} for every content chunk, then a single
+        {"type": "done", "message": str, "usage": dict} once the stream ends.
+
+        :param chat_id: The chat session ID in Ragflow
+        :param history: Chat history as list of dicts with 'role' and 'content'/'blocks'
+        :param api_key: API key for authentication
+        :param history_budget: Optional token budget the forwarded history is fitted into
+        :return: Async generator of stream events
+        :raises ValueError: If the request fails or a chunk is malformed
+        """
+        url, headers, payload, tokens_saved = self._build_request(chat_id, history, api_key, stream=True, history_budget=history_budget)
+
+        content_parts = []
+        usage: Optional[dict] = None
+
+        try:
+            async with self._http_client() as client:
+                async with client.stream("POST", url, json=payload, headers=headers, timeout=RAGFLOW_STREAM_TIMEOUT) as response:
+                    if response.is_error:
+                        await response.aread()
+                    response.raise_for_status()
+
+                    async for data in self._iter_sse_data(response):
+                        if data == "[DONE]":
+                            break
+
+                        chunk = json.loads(data)
+
+                        # Ragflow reports errors in-band with a non-zero code
+                        if chunk.get("code") not in (None, 0) and "choices" not in chunk:
+                            raise ValueError(chunk.get("message", "Invalid response from Ragflow API"))
+
+                        usage = chunk.get("usage") or usage
+
+                        for choice in chunk.get("choices") or []:
+                            delta = (choice.get("delta") or {}).get("content")
+                            if delta:
+                                content_parts.append(delta)
+                                yield {"type": "delta", "content": delta}
+
+        except httpx.ConnectError as e:
+            raise self._connect_error(url, e)
+
+        except httpx.HTTPStatusError as e:
+            raise self._status_error(e)
+
         except (httpx.RequestError, json.JSONDecodeError, KeyError) as e:
-            error_message = f"Unexpected error calling Ragflow API: {str(e)}"
+            error_message = f"Unexpected error streaming from Ragflow API: {str(e)}"
             logger.error(error_message, exc_info=True)
             raise ValueError(error_message)
 
+        yield {"type": "done", "message": "".join(content_parts), "usage": self._usage(chat_id, usage, tokens_saved)}
+
+    def _usage(self, chat_id: str, usage: Optional[dict], tokens_saved: int) -> dict:
+        """
+        Build the usage reported for a chat response, including any history summaries made for the chat since its last one.
+
+        :param chat_id: The chat session ID in Ragflow
+        :param usage: The completion's usage
+        :param tokens_saved: Tokens saved by history budgeting
+        :return: The usage
+        """
+        usage = {**(usage or EMPTY_USAGE), "history_tokens_saved": tokens_saved}
+        summary_usage: Optional[dict] = self._summary_usage.pop(chat_id, None)
+
+        if summary_usage is not None:
+            for key, tokens in summary_usage.items():
+                usage[key] = usage.get(key, 0) + tokens
+            usage["summary_tokens"] = summary_usage["total_tokens"]
+
+        return usage
+
+    @staticmethod
+    async def _iter_sse_data(response: httpx.Response) -> AsyncGenerator[str, None]:
+        """
+        Parse a server-sent event stream into the data payload of each event.
+
+        :param response: The streaming response
+        :return: Async generator of event data strings
+        """
+        data_lines = []
+        async for line in response.aiter_lines():
+            if not line:
+                # A blank line dispatches the event
+                if data_lines:
+                    yield "\n".join(data_lines)
+                    data_lines = []
+                continue
+
+            if line.startswith("data:"):
+                data_lines.append(line[5:].lstrip())
+
+        if data_lines:
+            yield "\n".join(data_lines)
+
+    def _build_request(
+            self,
+            chat_id: str,
+            history: list,
+            api_key: str,
+            stream: bool,
+            history_budget: Optional[HistoryBudget] = None
+    ) -> tuple:
+        """
+        Build the URL, headers & payload for a Ragflow chat completion.
+
+        :param chat_id: The chat session ID in Ragflow
+        :param history: Chat history
+        :param api_key: API key for authentication
+        :param stream: Whether to request a streamed response
+        :param history_budget: Optional token budget the forwarded history is fitted into
+        :return: (url, headers, payload, tokens saved by budgeting)
+        """
+        if len(chat_id) == 36:
+            dialog_id = hashlib.md5(chat_id.encode()).hexdigest()[:32]
+        else:
+            dialog_id = chat_id
+        url = RAGFLOW_API_URL_TEMPLATE.format(chat_id=dialog_id)
+
+        headers = {}
+        # Use standard Bearer token format expected by Ragflow's SDK-style
+        # endpoints (e.g. those decorated with @token_required).
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        # Normalize messages from various formats
+        messages = self._normalize_history(history)
+        tokens_saved = 0
+
+        if history_budget is not None:
+            budgeted = self._history_compactor.apply(
+                messages,
+                history_budget,
+                chat_id=chat_id,
+                summarize=(lambda older: self._summarize_messages(chat_id, older)) if HISTORY_SUMMARY_URL else None
+            )
+            messages, tokens_saved = budgeted.messages, budgeted.tokens_saved
+
+        payload = {
+            "model": "ragflow",
+            "messages": messages,
+            "stream": stream
+        }
+
+        return url, headers, payload, tokens_saved
+
+    async def _summarize_messages(self, chat_id: str, messages: List[dict]) -> str:
+        """
+        Summarize older chat messages for history budgeting, with a plain LLM completion.
+        Not through the chat's dialog, so nothing is retrieved & nothing is added to the user's session.
+
+        :param chat_id: The chat session ID in Ragflow (its next response reports the summary's usage)
+        :param messages: Normalized messages to summarize
+        :return: The summary
+        """
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        headers = {"Authorization": f"Bearer {HISTORY_SUMMARY_API_KEY}"} if HISTORY_SUMMARY_API_KEY else {}
+        payload = {
+            "model": HISTORY_SUMMARY_MODEL,
+            "messages": [
+                {"role": "system", "content": SUMMARY_INSTRUCTION},
+                {"role": "user", "content": transcript}
+            ],
+            "stream": False
+        }
+
+        async with self._http_client() as client:
+            response = await client.post(HISTORY_SUMMARY_URL, json=payload, headers=headers)
+            response.raise_for_status()
+            completion = response.json()
+
+        self._record_summary_usage(chat_id, completion.get("usage") or {})
+
+        return completion["choices"][0]["message"]["content"]
+
+    @staticmethod
+    def _connect_error(url: str, e: Exception) -> ValueError:
+        error_message = f"Connection to Ragflow API failed at {url}"
+        logger.error(f"Ragflow connection error: {error_message}")
+        logger.error(f"Underlying error: {e}", exc_info=True)
+        return ValueError(error_message)
+
+    @staticmethod
+    def _status_error(e: httpx.HTTPStatusError) -> ValueError:
+        error_message = f"Ragflow API returned error {e.response.status_code}: {e.response.reason_phrase}"
+        logger.error(f"Ragflow HTTP error: {error_message}")
+        try:
+            raw_response = e.response.json()
+            logger.error(f"Ragflow API response: {raw_response}")
+            # Extract more specific error message if available
+            if isinstance(raw_response, dict) and "message" in raw_response:
+                error_message = raw_response["message"]
+        except json.JSONDecodeError:
+            raw_response = e.response.text
+            logger.error(f"Ragflow API response (not JSON): {raw_response}")
+
+        return ValueError(error_message)
+
     def _normalize_history(self, history: list) -> list:
         """
         Convert various chat history formats to OpenAI-compatible format.
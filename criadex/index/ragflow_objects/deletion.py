@@ -0,0 +1,232 @@
+"""
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+"""
+
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Dict, List, Literal, Optional, Union
+
+from elasticsearch import ConflictError, NotFoundError
+from pydantic import BaseModel
+
+"""Where deletion jobs are recorded, one document per job, so a restarted server resumes reaping them"""
+DELETION_JOBS_INDEX: str = "criadex-deletion-jobs"
+
+"""Seconds between two polls of the running deletions' tasks"""
+DELETION_POLL_INTERVAL: float = 2.0
+
+"""Seconds a worker's claim on finishing a deletion holds, after which another worker may finish it (e.g. the first stopped)"""
+DELETION_CLAIM_TTL: float = 120.0
+
+DeletionStatus = Literal["running", "completed", "failed"]
+
+
+class DeletionJob(BaseModel):
+    """
+    A group or file deletion. Its Elasticsearch delete-by-query tasks run in the background; once they finish,
+    the reaper that claims the job deletes the MySQL rows & completes it.
+
+    """
+
+    job_id: str
+    group_name: str
+    group_id: Optional[int] = None  # The group's row when the deletion started (a re-created group gets a new one)
+    document_name: Optional[str] = None  # None if the whole group is deleted
+    document_id: Optional[int] = None  # The file's row when the deletion started (a re-upload gets a new one)
+    tasks: List[str] = []  # Delete-by-query task IDs (none if the vectors were dropped with an index)
+    status: DeletionStatus = "running"
+
+    deleted: int = 0
+    version_conflicts: int = 0  # Nodes re-written (e.g. re-uploaded) after the delete started, & so kept
+
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    claimed_at: Optional[float] = None  # When a worker claimed finishing the job
+    error: Optional[str] = None
+
+
+class DeletionJobs:
+    """
+    Records deletion jobs & polls their tasks through the Elasticsearch tasks API
+
+    """
+
+    def __init__(self, es: Any):
+        """
+        :param es: The (sync) Elasticsearch client
+        """
+        self.es = es
+
+    @staticmethod
+    def job_id(group_name: str, document_name: Optional[str] = None) -> str:
+        """One job ID per group or file, so deleting the same thing twice returns the running job"""
+        key: str = group_name if document_name is None else f"{group_name}\0{document_name}"
+        return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+    def create(
+            self,
+            group_name: str,
+            document_name: Optional[str] = None,
+            document_id: Optional[int] = None,
+            tasks: Optional[List[str]] = None,
+            group_id: Optional[int] = None
+    ) -> DeletionJob:
+        now: float = time.time()
+        job = DeletionJob(
+            job_id=self.job_id(group_name, document_name),
+            group_name=group_name,
+            group_id=group_id,
+            document_name=document_name,
+            document_id=document_id,
+            tasks=tasks or [],
+            created_at=now,
+            updated_at=now
+        )
+        # Searchable before returning, so every worker sees the deletion running
+        self.save(job, refresh="wait_for")
+        return job
+
+    def load(self, job_id: str) -> Optional[DeletionJob]:
+        try:
+            return DeletionJob(**self.es.get(index=DELETION_JOBS_INDEX, id=job_id)["_source"])
+        except NotFoundError:
+            return None
+
+    def save(self, job: DeletionJob, refresh: Union[bool, str] = False) -> None:
+        job.updated_at = time.time()
+        self.es.index(index=DELETION_JOBS_INDEX, id=job.job_id, document=job.model_dump(), refresh=refresh)
+
+    def claim(self, job: DeletionJob) -> bool:
+        """
+        Claim finishing a job whose tasks are done, so only one worker deletes its MySQL rows.
+        Every worker resumes every running job on start, so all of them may try.
+
+        :param job: The job (its status is updated to the recorded one if the claim is refused)
+        :return: Whether this worker claimed it
+        """
+        try:
+            response = self.es.get(index=DELETION_JOBS_INDEX, id=job.job_id)
+            concurrency: Dict[str, Any] = {"if_seq_no": response["_seq_no"], "if_primary_term": response["_primary_term"]}
+            recorded: DeletionJob = DeletionJob(**response["_source"])
+        except NotFoundError:
+            concurrency, recorded = {"op_type": "create"}, job
+
+        if recorded.status != "running" or (recorded.claimed_at is not None and time.time() - recorded.claimed_at < DELETION_CLAIM_TTL):
+            job.status = recorded.status
+            return False
+
+        job.claimed_at = job.updated_at = time.time()
+
+        try:
+            self.es.index(index=DELETION_JOBS_INDEX, id=job.job_id, document=job.model_dump(), **concurrency)
+        except ConflictError:
+            # Another worker changed the job since it was read
+            return False
+
+        return True
+
+    def running(self, group_name: Optional[str] = None, document_name: Optional[str] = None) -> List[DeletionJob]:
+        """
+        The jobs still waiting on their tasks, across all workers
+
+        :param group_name: Only this group's jobs (all groups' if None)
+        :param document_name: Only this file's job (any if None)
+        :return: The running jobs
+        """
+        # Job fields are dynamically mapped, so exact matches use their .keyword sub-fields
+        filters: List[Dict[str, Any]] = [{"term": {"status.keyword": "running"}}]
+        if group_name is not None:
+            filters.append({"term": {"group_name.keyword": group_name}})
+        if document_name is not None:
+            filters.append({"term": {"document_name.keyword": document_name}})
+
+        try:
+            response = self.es.search(index=DELETION_JOBS_INDEX, query={"bool": {"filter": filters}}, size=1000)
+        except NotFoundError:
+            return []
+
+        jobs: List[DeletionJob] = [DeletionJob(**hit["_source"]) for hit in response["hits"]["hits"]]
+        return [
+            job for job in jobs
+            if job.status == "running"
+            and group_name in (None, job.group_name)
+            and document_name in (None, job.document_name)
+        ]
+
+    def poll(self, job: DeletionJob) -> bool:
+        """
+        Check a job's tasks, recording their results once all are done
+
+        :param job: The job
+        :return: Whether all its tasks are done (check job.error for failures)
+        """
+        results: List[Dict[str, Any]] = []
+
+        for task_id in job.tasks:
+            try:
+                task: Dict[str, Any] = dict(self.es.tasks.get(task_id=task_id, wait_for_completion=False))
+            except NotFoundError:
+                # Task results are stored in the .tasks index, so a missing task is a lost one
+                job.error = f"Task {task_id} was not found"
+                return True
+
+            if not task.get("completed"):
+                return False
+
+            results.append(task)
+
+        # Totals, not increments, so a job polled again (e.g. after a refused claim) isn't double-counted
+        job.deleted, job.version_conflicts = 0, 0
+
+        for task in results:
+            response: Dict[str, Any] = task.get("response") or {}
+            job.deleted += response.get("deleted", 0)
+            job.version_conflicts += response.get("version_conflicts", 0)
+
+            if task.get("error") or response.get("failures"):
+                job.error = repr(task.get("error") or response["failures"][0])
+
+        return True
+
+    async def acreate(
+            self,
+            group_name: str,
+            document_name: Optional[str] = None,
+            document_id: Optional[int] = None,
+            tasks: Optional[List[str]] = None,
+            group_id: Optional[int] = None
+    ) -> DeletionJob:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.create, group_name, document_name, document_id, tasks, group_id)
+
+    async def aload(self, job_id: str) -> Optional[DeletionJob]:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.load, job_id)
+
+    async def asave(self, job: DeletionJob) -> None:
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.save, job)
+
+    async def aclaim(self, job: DeletionJob) -> bool:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.claim, job)
+
+    async def arunning(self, group_name: Optional[str] = None, document_name: Optional[str] = None) -> List[DeletionJob]:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.running, group_name, document_name)
+
+    async def apoll(self, job: DeletionJob) -> bool:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.poll, job)
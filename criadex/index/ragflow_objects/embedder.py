@@ -1,8 +1,46 @@
+from typing import List, Optional
+
+import numpy as np
+
+from criadex.schemas import EmbeddingDimensionsError
+
+"""Dimensions of the built-in embedder, & of group indices whose embedding model doesn't declare any"""
+DEFAULT_EMBEDDING_DIMS: int = 768
+
+
+def truncate_embedding(embedding: List[float], dims: int) -> List[float]:
+    # Matryoshka truncation: keep the leading dims & renormalize to unit length
+    vector = np.asarray(embedding[:dims], dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return (vector / norm if norm else vector).tolist()
+
+
+def fit_embedding(embedding: List[float], dims: Optional[int], truncate: bool = False) -> List[float]:
+    """
+    Fit an embedding to an index's dimensions
+
+    :param embedding: The embedding
+    :param dims: The index's dimensions (None if unknown: no check)
+    :param truncate: Whether the index stores Matryoshka-truncated embeddings
+    :return: The embedding, truncated & renormalized if needed
+    """
+    if dims is None or len(embedding) == dims:
+        return embedding
+
+    if truncate and len(embedding) > dims:
+        return truncate_embedding(embedding, dims)
+
+    raise EmbeddingDimensionsError(f"Got a {len(embedding)}-dimensional embedding for a {dims}-dimensional index")
+
+
 class RagflowEmbedder:
-    def __init__(self):
-        pass
+    def __init__(self, dims: int = DEFAULT_EMBEDDING_DIMS):
+        self.dims = dims
     def embed(self, text):
         # Implement embedding logic using Ragflow/Elasticsearch
-        embedding = [0.0] * 768
+        embedding = [0.0] * self.dims
         embedding[0] = 1.0
         return embedding
+    def embed_many(self, texts):
+        # Embed a batch of texts in one call
+        return [self.embed(text) for text in texts]
@@ -0,0 +1,221 @@
+"""
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from criadex.index.ragflow_objects.layout import keyword_field
+
+"""
+Criadex filter DSL, compiled to Elasticsearch bool queries in filter context (non-scoring & cacheable):
+
+    {
+        "must": {"file_name": "a.pdf"} | [condition, ...],      # all must match
+        "should": [condition, ...],                              # at least one must match
+        "must_not": {"file_name": "b.pdf"} | [condition, ...]   # none may match
+    }
+
+A condition is one of:
+    {key: value}                            -> term
+    {key: [value, ...]}                     -> terms
+    {key: {"gte": .., "lt": .., ...}}       -> range
+    {"term" | "terms" | "range" | "exists": {...}}  -> that clause, as written
+    a nested filter (a dict of must / should / must_not)
+
+Keys are metadata keys ("file_name" -> "metadata.file_name"); keys already starting with "metadata." are kept.
+Exact string matches (term / terms) target the keyword field, since dynamically mapped strings are analyzed text
+("course" -> "metadata.course.keyword"); ranges & exists target the field itself.
+"""
+
+BOOL_KEYS = ("must", "should", "must_not")
+CLAUSE_KEYS = ("term", "terms", "range", "exists")
+RANGE_KEYS = {"gt", "gte", "lt", "lte", "format", "time_zone"}
+METADATA_PREFIX = "metadata."
+
+
+class InvalidSearchFilterError(ValueError):
+    """
+    Thrown when a search filter does not follow the Criadex filter DSL
+
+    """
+
+
+def _field(key: str) -> str:
+    if not isinstance(key, str) or not key:
+        raise InvalidSearchFilterError(f"Invalid filter key: {key!r}")
+    return key if key.startswith(METADATA_PREFIX) else METADATA_PREFIX + key
+
+
+def _exact_field(key: str, values: List[Any]) -> str:
+    # Dynamically mapped numbers & booleans have no .keyword sub-field; they match on the field itself
+    if not isinstance(key, str) or key.startswith(METADATA_PREFIX) or not all(isinstance(value, str) for value in values):
+        return _field(key)
+    return keyword_field(key)
+
+
+def _canonical(clause: Dict[str, Any]) -> str:
+    return json.dumps(clause, sort_keys=True, default=str)
+
+
+def _sorted_clauses(clauses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Dedupe & order clauses so equal filters always compile to the same JSON (ES query cache hits)
+    unique = {_canonical(clause): clause for clause in clauses}
+    return [unique[key] for key in sorted(unique)]
+
+
+def _explicit_clause(kind: str, body: Any) -> Dict[str, Any]:
+    if not isinstance(body, dict) or not body:
+        raise InvalidSearchFilterError(f"Invalid '{kind}' clause: {body!r}")
+
+    if kind == "exists":
+        return {"exists": {"field": _field(body.get("field"))}}
+
+    if len(body) != 1:
+        raise InvalidSearchFilterError(f"A '{kind}' clause must target exactly one field: {body!r}")
+
+    ((key, value),) = body.items()
+
+    if kind == "term":
+        return _term(key, value.get("value") if isinstance(value, dict) else value)
+    if kind == "terms":
+        return _terms(key, value)
+    return _range(key, value)
+
+
+def _term(key: str, value: Any) -> Dict[str, Any]:
+    if value is None or isinstance(value, (dict, list)):
+        raise InvalidSearchFilterError(f"Invalid term value for '{key}': {value!r}")
+    return {"term": {_exact_field(key, [value]): value}}
+
+
+def _terms(key: str, values: Any) -> Dict[str, Any]:
+    if not isinstance(values, list) or not values or any(isinstance(value, (dict, list)) for value in values):
+        raise InvalidSearchFilterError(f"Invalid terms values for '{key}': {values!r}")
+    return {"terms": {_exact_field(key, values): sorted(set(values), key=_canonical)}}
+
+
+def _range(key: str, bounds: Any) -> Dict[str, Any]:
+    if not isinstance(bounds, dict) or not bounds or not set(bounds) <= RANGE_KEYS:
+        raise InvalidSearchFilterError(f"Invalid range for '{key}': {bounds!r}")
+    return {"range": {_field(key): dict(sorted(bounds.items()))}}
+
+
+def _conditions(value: Any) -> List[Dict[str, Any]]:
+    """Compile the value of a must / should / must_not key to a list of clauses"""
+
+    if isinstance(value, dict):
+        # {"a": 1, "b": 2} is shorthand for [{"a": 1}, {"b": 2}]
+        items = [{key: val} for key, val in value.items()] if not _is_filter(value) else [value]
+    elif isinstance(value, list):
+        items = value
+    else:
+        raise InvalidSearchFilterError(f"Invalid filter conditions: {value!r}")
+
+    clauses: List[Dict[str, Any]] = []
+    for item in items:
+        clauses.extend(_condition(item))
+    return clauses
+
+
+def _condition(condition: Any) -> List[Dict[str, Any]]:
+    if not isinstance(condition, dict):
+        raise InvalidSearchFilterError(f"Invalid filter condition: {condition!r}")
+
+    if not condition:
+        return []
+
+    if _is_filter(condition):
+        compiled = compile_filter(condition)
+        return [compiled] if compiled else []
+
+    clauses: List[Dict[str, Any]] = []
+    for key, value in condition.items():
+        if key in CLAUSE_KEYS:
+            clauses.append(_explicit_clause(key, value))
+        elif isinstance(value, list):
+            clauses.append(_terms(key, value))
+        elif isinstance(value, dict):
+            clauses.append(_range(key, value))
+        else:
+            clauses.append(_term(key, value))
+    return clauses
+
+
+def _inline_and(clauses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Inline nested must-only bools into the enclosing must: an AND of ANDs is one AND"""
+
+    inlined: List[Dict[str, Any]] = []
+    for clause in clauses:
+        if list(clause) == ["bool"] and list(clause["bool"]) == ["filter"]:
+            inlined.extend(clause["bool"]["filter"])
+        else:
+            inlined.append(clause)
+    return inlined
+
+
+def _is_filter(value: Dict[str, Any]) -> bool:
+    return bool(value) and all(key in BOOL_KEYS for key in value)
+
+
+def compile_filter(search_filter: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Compile a Criadex filter to an Elasticsearch bool query, to be placed in filter context
+
+    :param search_filter: The filter (DSL above). A single condition is treated as {"must": condition}.
+    :return: The bool query, or None if the filter is empty
+    """
+    if not search_filter:
+        return None
+
+    if not isinstance(search_filter, dict):
+        raise InvalidSearchFilterError(f"A search filter must be an object: {search_filter!r}")
+
+    if not _is_filter(search_filter):
+        search_filter = {"must": search_filter}
+
+    must = _sorted_clauses(_inline_and(_conditions(search_filter.get("must", []))))
+    should = _sorted_clauses(_conditions(search_filter.get("should", [])))
+    must_not = _sorted_clauses(_conditions(search_filter.get("must_not", [])))
+
+    if not (must or should or must_not):
+        return None
+
+    query: Dict[str, Any] = {}
+    if must:
+        query["filter"] = must
+    if should:
+        query["should"] = should
+        query["minimum_should_match"] = 1
+    if must_not:
+        query["must_not"] = must_not
+
+    return {"bool": query}
+
+
+def combine_filters(*filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    AND several Criadex filters together
+
+    :param filters: The filters (empty ones are skipped)
+    :return: The combined filter, or None if all are empty
+    """
+    filters = [search_filter for search_filter in filters if search_filter]
+
+    if not filters:
+        return None
+
+    if len(filters) == 1:
+        return filters[0]
+
+    return {"must": [search_filter if _is_filter(search_filter) else {"must": search_filter} for search_filter in filters]}
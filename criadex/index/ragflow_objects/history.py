@@ -0,0 +1,273 @@
+"""
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+"""
+
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Literal, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from criadex.agent.tokens import count_message_tokens
+
+logger = logging.getLogger("uvicorn.error")
+
+"""Approximate per-message framing overhead of chat completion prompts"""
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+class HistoryBudget(BaseModel):
+    """
+    Per-request limits on how much chat history is forwarded to the model
+
+    """
+
+    max_tokens: int = Field(..., ge=1, description="Token budget for the forwarded history.")
+    keep_last_turns: int = Field(default=4, ge=0, description="Most recent turns (user message onwards) always kept verbatim.")
+    strategy: Literal["drop", "summarize"] = Field(default="drop", description="What to do with older turns over the budget.")
+
+
+class HistoryBudgetResult(BaseModel):
+    messages: List[dict]
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def message_tokens(message: dict) -> int:
+    """
+    Token cost of one normalized message
+
+    :param message: The message ({"role", "content"})
+    :return: Its token count
+
+    """
+
+    return count_message_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def messages_digest(messages: List[dict]) -> bytes:
+    """
+    Fingerprint a run of messages
+
+    :param messages: The messages
+    :return: The digest
+
+    """
+
+    hasher = hashlib.blake2b(digest_size=16)
+    for message in messages:
+        hasher.update(message.get("role", "").encode())
+        hasher.update(b"\0")
+        hasher.update((message.get("content") or "").encode())
+        hasher.update(b"\0")
+    return hasher.digest()
+
+
+class HistoryCompactor:
+    """
+    Fits normalized chat histories into a token budget. System messages and the last N turns are always kept;
+    older turns are dropped oldest-first, or (with the "summarize" strategy) replaced by a cached summary.
+
+    Summaries are produced in the background and used from the next turn on, so budgeting never waits on the LLM.
+
+    """
+
+    def __init__(self, summarize: Optional[Callable[[List[dict]], Awaitable[str]]] = None, max_chats: int = 10_000):
+        """
+        :param summarize: Turns a list of messages into a summary. Required for the "summarize" strategy.
+        :param max_chats: How many chats to keep summaries for (LRU)
+        """
+
+        self._summarize = summarize
+        self._max_chats: int = max_chats
+
+        # chat_id -> (number of older messages covered, digest of those messages, summary message)
+        self._summaries: OrderedDict[str, Tuple[int, bytes, dict]] = OrderedDict()
+        self._pending: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def recent_start(messages: List[dict], keep_last_turns: int) -> int:
+        """
+        Index where the last N turns begin (a turn starts at a user message)
+
+        :param messages: The messages
+        :param keep_last_turns: N
+        :return: The index
+
+        """
+
+        if keep_last_turns <= 0:
+            return len(messages)
+
+        turns: int = 0
+        for idx in range(len(messages) - 1, -1, -1):
+            if messages[idx].get("role") == "user":
+                turns += 1
+                if turns == keep_last_turns:
+                    return idx
+
+        return 0
+
+    def cached_summary(self, chat_id: Optional[str], older: List[dict]) -> Tuple[int, Optional[dict]]:
+        """
+        Find the cached summary covering a prefix of the older messages
+
+        :param chat_id: The chat
+        :param older: The older (droppable) non-system messages
+        :return: (number of messages covered, summary message or None)
+
+        """
+
+        entry = self._summaries.get(chat_id) if chat_id else None
+
+        if entry is None:
+            return 0, None
+
+        covered, digest, summary = entry
+
+        if covered > len(older) or messages_digest(older[:covered]) != digest:
+            return 0, None
+
+        self._summaries.move_to_end(chat_id)
+        return covered, summary
+
+    def apply(
+            self,
+            messages: List[dict],
+            budget: HistoryBudget,
+            chat_id: Optional[str] = None,
+            summarize: Optional[Callable[[List[dict]], Awaitable[str]]] = None
+    ) -> HistoryBudgetResult:
+        """
+        Fit the messages into the budget
+
+        :param messages: Normalized messages ({"role", "content"})
+        :param budget: The budget
+        :param chat_id: The chat (needed to cache summaries)
+        :param summarize: Overrides the summarizer for this call
+        :return: The budgeted messages & token accounting
+
+        """
+
+        costs: List[int] = [message_tokens(message) for message in messages]
+        tokens_before: int = sum(costs)
+
+        if tokens_before <= budget.max_tokens:
+            return HistoryBudgetResult(messages=messages, tokens_before=tokens_before, tokens_after=tokens_before)
+
+        start: int = self.recent_start(messages, budget.keep_last_turns)
+        older: List[int] = [idx for idx in range(start) if messages[idx].get("role") != "system"]
+        older_messages: List[dict] = [messages[idx] for idx in older]
+
+        dropped: Set[int] = set()
+        total: int = tokens_before
+        covered, summary = 0, None
+
+        if budget.strategy == "summarize":
+            covered, summary = self.cached_summary(chat_id, older_messages)
+
+            if summary is not None:
+                dropped.update(older[:covered])
+                total += message_tokens(summary) - sum(costs[idx] for idx in older[:covered])
+
+        # Drop the remaining older messages oldest-first until within budget
+        for idx in older:
+            if total <= budget.max_tokens:
+                break
+            if idx not in dropped:
+                dropped.add(idx)
+                total -= costs[idx]
+
+        # Dropping is oldest-first, so the dropped messages are always a prefix of the older ones.
+        # Refresh the summary in the background so the next turn's covers all of them.
+        if budget.strategy == "summarize" and chat_id and len(dropped) > covered:
+            self._schedule_summary(summarize or self._summarize, chat_id, older_messages[:len(dropped)], covered, summary)
+
+        kept: List[dict] = [message for idx, message in enumerate(messages) if idx not in dropped]
+
+        if summary is not None:
+            # The summary takes the place of the first message it replaced
+            insert_at: int = sum(1 for idx in range(older[0]) if idx not in dropped)
+            kept.insert(insert_at, summary)
+
+        return HistoryBudgetResult(messages=kept, tokens_before=tokens_before, tokens_after=total)
+
+    def _schedule_summary(
+            self,
+            summarize: Optional[Callable[[List[dict]], Awaitable[str]]],
+            chat_id: str,
+            messages: List[dict],
+            covered: int,
+            previous: Optional[dict]
+    ) -> None:
+        """
+        Summarize messages in the background & cache the result for the chat's next turns
+
+        :param summarize: The summarizer
+        :param chat_id: The chat
+        :param messages: The older messages the summary should cover
+        :param covered: How many of them the previous summary already covers
+        :param previous: The previous summary, folded into the new one
+        :return: None
+
+        """
+
+        if summarize is None or chat_id in self._pending:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._pending.add(chat_id)
+        task: asyncio.Task = loop.create_task(self._refresh_summary(summarize, chat_id, messages, covered, previous))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh_summary(
+            self,
+            summarize: Callable[[List[dict]], Awaitable[str]],
+            chat_id: str,
+            messages: List[dict],
+            covered: int,
+            previous: Optional[dict]
+    ) -> None:
+        try:
+            text: str = await summarize(([previous] if previous else []) + messages[covered:])
+
+            self._summaries[chat_id] = (
+                len(messages),
+                messages_digest(messages),
+                {"role": "system", "content": SUMMARY_PREFIX + text.strip()}
+            )
+            self._summaries.move_to_end(chat_id)
+
+            if len(self._summaries) > self._max_chats:
+                self._summaries.popitem(last=False)
+
+        except Exception as e:
+            logger.warning(f"Failed to summarize history for chat {chat_id}: {e}")
+
+        finally:
+            self._pending.discard(chat_id)
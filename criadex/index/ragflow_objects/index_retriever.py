@@ -14,6 +14,7 @@ You should have received a copy of the GNU General Public License along with Cri
 
 
 import asyncio
+import heapq
 from typing import List, Dict, Any, Optional
 
 class RagflowIndexRetriever:
@@ -21,21 +22,44 @@ class RagflowIndexRetriever:
         self.vector_store = vector_store
         self.embedder = embedder
 
-    def multi_collection_search(self, collections: List[str], query: str, top_k=10, query_filter: Optional[Dict[str, Any]] = None):
+    def multi_collection_search(self, collections: List[str], query: str, top_k=10, query_filter: Optional[Dict[str, Any]] = None, by_relevance=False):
+        # Search every collection in ONE multi-search round-trip
+        collections = list(dict.fromkeys(collections))
+        if not collections:
+            return {}
         query_embedding = self.embedder.embed(query)
-        results = {}
-        for collection in collections:
-            hits = self.vector_store.search(collection, query_embedding, top_k=top_k, query_filter=query_filter)
-            results[collection] = hits
-        return results
+        hits = self.vector_store.msearch(
+            collections,
+            [query_embedding] * len(collections),
+            [top_k] * len(collections),
+            [query_filter] * len(collections),
+            by_relevance=by_relevance
+        )
+        return dict(zip(collections, hits))
 
-    async def amulti_collection_search(self, collections: List[str], query: str, top_k=10, query_filter: Optional[Dict[str, Any]] = None):
-        query_embedding = await self.embedder.aembed(query)
-        results = {}
-        for collection in collections:
-            hits = await self.vector_store.asearch(collection, query_embedding, top_k=top_k, query_filter=query_filter)
-            results[collection] = hits
-        return results
+    async def amulti_collection_search(self, collections: List[str], query: str, top_k=10, query_filter: Optional[Dict[str, Any]] = None, by_relevance=False):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self.multi_collection_search(collections, query, top_k, query_filter, by_relevance)
+        )
+
+    @classmethod
+    def merge_top_k(cls, results: Dict[str, List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+        # One ranked list across collections: heap-select the top_k by score, tagging each hit with its collection
+        tagged = (
+            {**hit, "collection_name": collection}
+            for collection, hits in results.items()
+            for hit in hits
+        )
+        return heapq.nlargest(top_k, tagged, key=lambda hit: hit.get("_score") or 0.0)
+
+    def merged_collection_search(self, collections: List[str], query: str, top_k=10, query_filter: Optional[Dict[str, Any]] = None):
+        # Global top_k across collections. Each collection is ranked by relevance so its top_k are its best.
+        return self.merge_top_k(self.multi_collection_search(collections, query, top_k, query_filter, by_relevance=True), top_k)
+
+    async def amerged_collection_search(self, collections: List[str], query: str, top_k=10, query_filter: Optional[Dict[str, Any]] = None):
+        return self.merge_top_k(await self.amulti_collection_search(collections, query, top_k, query_filter, by_relevance=True), top_k)
 
     def add_metadata_to_results(self, results: Dict[str, Any], file_name=None, created_at=None, group_id=None):
         # Add metadata to all results
@@ -0,0 +1,110 @@
+"""
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+"""
+
+
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from elasticsearch import ConflictError, NotFoundError
+from pydantic import BaseModel
+
+"""Where ingestion leases are recorded, one document per group, so every worker sees (& can end) a group's ingestion"""
+INGESTION_LEASES_INDEX: str = "criadex-ingestion-leases"
+
+"""Seconds a worker trusts its last look at a group's lease, since every write checks it"""
+INGESTION_STATE_TTL: float = 5.0
+
+
+class IngestionLease(BaseModel):
+    """
+    A group in ingestion mode, until it is ended or its lease expires
+
+    """
+
+    group_name: str
+    previous_refresh_interval: Optional[str] = None  # Restored when ingestion ends (None: the index default)
+    expires_at: float = 0.0
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at <= time.time()
+
+
+class IngestionLeases:
+    """
+    Records ingestion leases in Elasticsearch
+
+    """
+
+    def __init__(self, es: Any):
+        """
+        :param es: The (sync) Elasticsearch client
+        """
+        self.es = es
+
+        # group -> (when it was looked up, its lease)
+        self._cache: Dict[str, Tuple[float, Optional[IngestionLease]]] = {}
+
+    def load(self, group_name: str) -> Optional[IngestionLease]:
+        try:
+            lease: Optional[IngestionLease] = IngestionLease(**self.es.get(index=INGESTION_LEASES_INDEX, id=group_name)["_source"])
+        except NotFoundError:
+            lease = None
+
+        self._cache[group_name] = (time.monotonic(), lease)
+        return lease
+
+    def cached(self, group_name: str) -> Optional[IngestionLease]:
+        """The group's lease, as looked up at most INGESTION_STATE_TTL seconds ago"""
+
+        looked_up: Optional[Tuple[float, Optional[IngestionLease]]] = self._cache.get(group_name)
+        if looked_up is not None and time.monotonic() - looked_up[0] < INGESTION_STATE_TTL:
+            return looked_up[1]
+
+        return self.load(group_name)
+
+    def create(self, lease: IngestionLease) -> bool:
+        """
+        Record a new lease
+
+        :param lease: The lease
+        :return: False if the group already had one (e.g. another worker began ingestion first)
+        """
+        try:
+            self.es.index(index=INGESTION_LEASES_INDEX, id=lease.group_name, document=lease.model_dump(), op_type="create")
+        except ConflictError:
+            return False
+
+        self._cache[lease.group_name] = (time.monotonic(), lease)
+        return True
+
+    def save(self, lease: IngestionLease) -> None:
+        self.es.index(index=INGESTION_LEASES_INDEX, id=lease.group_name, document=lease.model_dump())
+        self._cache[lease.group_name] = (time.monotonic(), lease)
+
+    def remove(self, group_name: str) -> bool:
+        """
+        Remove a group's lease
+
+        :param group_name: The group
+        :return: False if it had none (e.g. another worker ended its ingestion first)
+        """
+        self._cache[group_name] = (time.monotonic(), None)
+
+        try:
+            self.es.delete(index=INGESTION_LEASES_INDEX, id=group_name)
+        except NotFoundError:
+            return False
+
+        return True
@@ -0,0 +1,372 @@
+"""
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional
+
+from elasticsearch import NotFoundError
+
+from criadex.index.ragflow_objects.embedder import DEFAULT_EMBEDDING_DIMS
+from criadex.schemas import VectorIndexType
+
+"""
+Index layout. Every group is addressed by an alias named after the group, so search & write paths never
+see physical index names. Behind the alias, a group lives in either:
+
+    "group"  -> its own physical index, criadex-group-<name>-<generation>   (dropping the group drops the index)
+    "shared" -> the shared tier index criadex-shared-000001, through a filtered (& routed) alias
+
+Physical indices are created from one index template, so mappings & settings are defined in one place.
+Groups created before the layout existed have a concrete index named after the group; those keep working.
+"""
+
+TEMPLATE_NAME: str = "criadex-groups"
+GROUP_INDEX_PREFIX: str = "criadex-group-"
+SHARED_INDEX: str = "criadex-shared-000001"
+
+IndexLayoutMode = Literal["group", "shared"]
+
+"""Quantized vector index types. Their groups search with approximate kNN, rescoring an oversampled candidate set."""
+QUANTIZED_INDEX_TYPES: tuple = ("int8_hnsw", "int4_hnsw", "bbq_hnsw")
+
+"""Metadata fields mapped as keywords (other metadata is dynamically mapped as text with a .keyword sub-field)"""
+KEYWORD_METADATA_FIELDS: tuple = ("file_name", "group_name", "update_id")
+
+
+def keyword_field(field: str) -> str:
+    """The exact-match (keyword) field for a metadata key"""
+    return f"metadata.{field}" if field in KEYWORD_METADATA_FIELDS else f"metadata.{field}.keyword"
+
+
+@dataclass()
+class GroupIndexInfo:
+    """
+    How a group's embeddings are indexed, as recorded in its index mapping
+
+    """
+
+    vector_index: Optional[VectorIndexType] = None  # None for Elasticsearch's default
+    dims: Optional[int] = None  # None if unknown (no mapping yet)
+    matryoshka: bool = False  # Whether longer embeddings are truncated to dims & renormalized
+    described_at: float = field(default_factory=time.monotonic, compare=False)  # When it was read, for caches
+
+
+@dataclass()
+class GroupDrop:
+    """
+    What dropping a group did
+
+    """
+
+    indices: List[str]  # The physical indices dropped
+    tasks: List[str]  # Delete-by-query tasks still removing the group's documents from shared indices
+
+
+class IndexLayout:
+    """
+    Creates, resolves & drops the physical indices behind group aliases
+
+    """
+
+    def __init__(
+            self,
+            es: Any,
+            mode: IndexLayoutMode = "group",
+            dims: int = DEFAULT_EMBEDDING_DIMS,
+            number_of_shards: Optional[int] = None,
+            routing_partition_size: Optional[int] = None,
+            group_routing: bool = False
+    ):
+        """
+        :param es: The (sync) Elasticsearch client
+        :param mode: Index-per-group, or one shared tier index for all groups
+        :param dims: The embedding dimensions
+        :param number_of_shards: Primary shards per physical index
+        :param routing_partition_size: How many shards one routing value may spread over (only with group_routing)
+        :param group_routing: Whether shared-tier aliases route by group name
+        """
+        self.es = es
+        self.mode: IndexLayoutMode = mode
+        self.dims: int = dims
+        self.number_of_shards: Optional[int] = number_of_shards
+        self.routing_partition_size: Optional[int] = routing_partition_size
+        self.group_routing: bool = group_routing
+        self._template_ready: bool = False
+
+    @staticmethod
+    def physical_index(group_name: str, generation: int = 1) -> str:
+        return f"{GROUP_INDEX_PREFIX}{group_name}-{generation:06d}"
+
+    @classmethod
+    def next_index(cls, group_name: str, index: str) -> str:
+        """The next generation's physical index for a group (e.g. a re-embedding shadow index)"""
+
+        prefix: str = f"{GROUP_INDEX_PREFIX}{group_name}-"
+        generation: str = index[len(prefix):] if index.startswith(prefix) else ""
+        return cls.physical_index(group_name, int(generation) + 1 if generation.isdigit() else 1)
+
+    @property
+    def partitioned(self) -> bool:
+        """Whether indexes use partitioned routing, which needs every write routed, i.e. group routing on"""
+
+        return bool(self.routing_partition_size) and self.group_routing
+
+    def settings(self) -> Dict[str, Any]:
+        settings: Dict[str, Any] = {}
+        if self.number_of_shards:
+            settings["number_of_shards"] = self.number_of_shards
+        if self.partitioned:
+            # Spreads each routing value over this many shards (must be < number_of_shards)
+            settings["routing_partition_size"] = self.routing_partition_size
+        return settings
+
+    def mappings(
+            self,
+            dims: Optional[int] = None,
+            vector_index: Optional[VectorIndexType] = None,
+            matryoshka: bool = False
+    ) -> Dict[str, Any]:
+        # Group & file names are filtered & aggregated on constantly, so build their global ordinals at refresh
+        keyword = {"type": "keyword", "eager_global_ordinals": True}
+
+        mappings: Dict[str, Any] = {
+            "properties": {
+                "collection_name": keyword,
+                "text": {"type": "text"},
+                "metadata": {
+                    "properties": {
+                        "file_name": keyword,
+                        "group_name": keyword,
+                        "updated_at": {"type": "date"},
+                        "update_id": {"type": "keyword"}
+                    }
+                },
+                "embedding": {
+                    "type": "dense_vector",
+                    "dims": dims or self.dims
+                }
+            }
+        }
+
+        meta: Dict[str, Any] = {}
+
+        if vector_index:
+            # Recorded in _meta too, since Elasticsearch reports its default index_options when none were given
+            mappings["properties"]["embedding"]["index_options"] = {"type": vector_index}
+            meta["vector_index"] = vector_index
+
+        if matryoshka:
+            meta["matryoshka"] = True
+
+        if meta:
+            mappings["_meta"] = meta
+
+        if self.partitioned:
+            # Partitioned routing requires every document to be routed
+            mappings["_routing"] = {"required": True}
+
+        return mappings
+
+    def template(self) -> Dict[str, Any]:
+        template: Dict[str, Any] = {"mappings": self.mappings()}
+        settings = self.settings()
+        if settings:
+            template["settings"] = {"index": settings}
+        return template
+
+    def ensure_template(self) -> None:
+        """Put the index template (once per process, so mapping changes roll out on restart)"""
+
+        if self._template_ready:
+            return
+
+        self.es.indices.put_index_template(
+            name=TEMPLATE_NAME,
+            index_patterns=[f"{GROUP_INDEX_PREFIX}*", SHARED_INDEX],
+            template=self.template(),
+            priority=100
+        )
+        self._template_ready = True
+
+    def create_index(
+            self,
+            index: str,
+            dims: Optional[int] = None,
+            aliases: Optional[Dict[str, Any]] = None,
+            vector_index: Optional[VectorIndexType] = None,
+            matryoshka: bool = False
+    ) -> None:
+        """
+        Create a physical index from the template
+
+        :param index: The physical index name
+        :param dims: Overrides the template's embedding dimensions (request mappings win over the template's)
+        :param aliases: Aliases to create with the index
+        :param vector_index: The embedding index type (the template's if None)
+        :param matryoshka: Whether longer embeddings are truncated to the index's dimensions
+        :return: None
+        """
+        self.ensure_template()
+
+        body: Dict[str, Any] = {}
+        if (dims and dims != self.dims) or vector_index or matryoshka:
+            mappings = self.mappings(dims, vector_index, matryoshka)
+            body["mappings"] = {"properties": {"embedding": mappings["properties"]["embedding"]}}
+            if "_meta" in mappings:
+                body["mappings"]["_meta"] = mappings["_meta"]
+        if aliases:
+            body["aliases"] = aliases
+
+        self.es.indices.create(index=index, body=body)
+
+    def describe(self, group_name: str) -> GroupIndexInfo:
+        """
+        How a group's embeddings are indexed (vector index type, dimensions, truncation)
+
+        :param group_name: The group (alias) name
+        :return: The info, empty if the group has no mapping
+        """
+        try:
+            response = self.es.indices.get_mapping(index=group_name)
+        except NotFoundError:
+            return GroupIndexInfo()
+
+        for body in dict(response).values():
+            mappings: Dict[str, Any] = body.get("mappings") or {}
+            meta: Dict[str, Any] = mappings.get("_meta") or {}
+            dims = ((mappings.get("properties") or {}).get("embedding") or {}).get("dims")
+
+            if dims is None and not meta:
+                continue
+
+            vector_index = meta.get("vector_index")
+            return GroupIndexInfo(
+                vector_index=vector_index if vector_index in QUANTIZED_INDEX_TYPES or vector_index == "hnsw" else None,
+                dims=dims,
+                matryoshka=bool(meta.get("matryoshka"))
+            )
+
+        return GroupIndexInfo()
+
+    def resolve(self, group_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        The physical indices behind a group's alias
+
+        :param group_name: The group (alias) name
+        :return: {physical index: alias definition}, empty if there is no such alias
+        """
+        try:
+            response = self.es.indices.get_alias(name=group_name)
+        except NotFoundError:
+            return {}
+
+        return {
+            index: body.get("aliases", {}).get(group_name, {})
+            for index, body in dict(response).items()
+        }
+
+    def _alias(self, group_name: str) -> Dict[str, Any]:
+        if self.mode == "group":
+            return {"is_write_index": True}
+
+        alias: Dict[str, Any] = {"filter": {"term": {"collection_name": group_name}}}
+        if self.group_routing:
+            alias["routing"] = group_name
+        return alias
+
+    def create_group(
+            self,
+            group_name: str,
+            vector_index: Optional[VectorIndexType] = None,
+            dims: Optional[int] = None,
+            matryoshka: bool = False
+    ) -> None:
+        """
+        Create the group's alias (& its physical index in "group" mode). No-op if the alias or a legacy index exists.
+
+        :param group_name: The group name
+        :param vector_index: The group's embedding index type ("group" mode only)
+        :param dims: The group's embedding dimensions ("group" mode only; the template's if None)
+        :param matryoshka: Whether the group's embeddings are truncated to dims ("group" mode only)
+        :return: None
+        """
+        if self.es.indices.exists(index=group_name):
+            return
+
+        if self.mode == "group":
+            self.create_index(
+                self.physical_index(group_name),
+                dims=dims,
+                aliases={group_name: self._alias(group_name)},
+                vector_index=vector_index,
+                matryoshka=matryoshka
+            )
+            return
+
+        if vector_index or (dims and dims != self.dims) or matryoshka:
+            logging.warning(f"Group '{group_name}' is in the shared index, which uses the template's embedding mapping")
+
+        self.ensure_template()
+
+        if not self.es.indices.exists(index=SHARED_INDEX):
+            self.es.indices.create(index=SHARED_INDEX)
+
+        self.es.indices.put_alias(index=SHARED_INDEX, name=group_name, **self._alias(group_name))
+
+    def drop_group(self, group_name: str, wait_for_completion: bool = True) -> GroupDrop:
+        """
+        Remove a group's documents. Group-owned indices are dropped outright (no scan);
+        in the shared tier the group's documents are deleted by query, then its alias is removed.
+
+        :param group_name: The group name
+        :param wait_for_completion: Whether to wait for shared-tier deletes, or leave them running as tasks
+        :return: The physical indices that were dropped & the tasks left running
+        """
+        indices: Dict[str, Dict[str, Any]] = self.resolve(group_name)
+
+        # Pre-layout group: a concrete index named after the group
+        if not indices:
+            if self.es.indices.exists(index=group_name):
+                self.es.indices.delete(index=group_name)
+                return GroupDrop(indices=[group_name], tasks=[])
+            return GroupDrop(indices=[], tasks=[])
+
+        owned: List[str] = [index for index in indices if index.startswith(GROUP_INDEX_PREFIX)]
+        tasks: List[str] = []
+
+        for index, alias in indices.items():
+            if index in owned:
+                continue
+
+            # No refresh: the alias is removed right after, so the deleted documents are unreachable anyway
+            routing = alias.get("search_routing") or alias.get("index_routing")
+            response = self.es.delete_by_query(
+                index=index,
+                body={"query": {"term": {"collection_name": group_name}}},
+                conflicts="proceed",
+                **({"routing": routing} if routing else {}),
+                **({} if wait_for_completion else {"wait_for_completion": False, "slices": "auto"})
+            )
+            self.es.indices.delete_alias(index=index, name=group_name)
+
+            if not wait_for_completion:
+                tasks.append(response["task"])
+
+        if owned:
+            self.es.indices.delete(index=",".join(owned))
+            logging.info(f"Dropped the indices of group '{group_name}': {owned}")
+
+        return GroupDrop(indices=owned, tasks=tasks)
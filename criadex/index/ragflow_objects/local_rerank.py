@@ -0,0 +1,237 @@
+"""
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+"""
+
+import heapq
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def hit_text(hit: Dict[str, Any]) -> str:
+    return (hit.get("_source") or hit).get("text") or ""
+
+
+def hit_embedding(hit: Dict[str, Any]) -> Optional[List[float]]:
+    return (hit.get("_source") or hit).get("embedding")
+
+
+class LocalReranker:
+    """
+    In-process reranker. Candidates are scored in one NumPy batch as a weighted blend of
+    cosine similarity to the query vector & BM25 over the candidate texts, both in [0, 1].
+    Top-n selection uses a heap; MMR mode trades relevance for diversity among the picks.
+
+    """
+
+    def __init__(
+            self,
+            embedder: Any = None,
+            vector_weight: float = 0.7,
+            k1: float = 1.2,
+            b: float = 0.75
+    ):
+        """
+        :param embedder: Optional object with embed(text) & embed_many(texts), used when vectors are not supplied
+        :param vector_weight: Weight of the cosine score; the BM25 score gets the remainder
+        :param k1: BM25 term frequency saturation
+        :param b: BM25 length normalization
+        """
+        self._embedder = embedder
+        self.vector_weight: float = vector_weight
+        self.k1: float = k1
+        self.b: float = b
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def bm25_scores(self, query: str, texts: List[str]) -> np.ndarray:
+        """
+        BM25 of the query against each text, with the texts themselves as the corpus. Scaled so the best is 1.
+
+        :param query: The query
+        :param texts: The candidate texts
+        :return: One score per text
+        """
+        terms: List[str] = list(dict.fromkeys(tokenize(query)))
+
+        if not texts or not terms:
+            return np.zeros(len(texts), dtype=np.float32)
+
+        term_counts: List[Counter] = [Counter(tokenize(text)) for text in texts]
+        tf: np.ndarray = np.array(
+            [[counts[term] for term in terms] for counts in term_counts],
+            dtype=np.float32
+        )
+        lengths: np.ndarray = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float32)
+
+        df: np.ndarray = (tf > 0).sum(axis=0)
+        idf: np.ndarray = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+        norm: np.ndarray = self.k1 * (1 - self.b + self.b * lengths / max(float(lengths.mean()), 1.0))
+
+        scores: np.ndarray = (idf * tf * (self.k1 + 1) / (tf + norm[:, None])).sum(axis=1)
+        best: float = float(scores.max())
+
+        return scores / best if best > 0 else scores
+
+    def cosine_scores(self, query_vector: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(self._normalize(vectors) @ self._normalize(query_vector), 0.0, 1.0)
+
+    def _vectors(
+            self,
+            query: str,
+            texts: List[str],
+            query_vector: Optional[List[float]],
+            vectors: Optional[List[Optional[List[float]]]]
+    ) -> tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Resolve the query & candidate vectors, embedding whatever is missing. (None, None) when unavailable."""
+
+        if query_vector is None and self._embedder is not None:
+            query_vector = self._embedder.embed(query)
+
+        if (vectors is None or any(vector is None for vector in vectors)) and self._embedder is not None:
+            vectors = self._embedder.embed_many(texts)
+
+        if query_vector is None or vectors is None or any(vector is None for vector in vectors):
+            return None, None
+
+        query_array = np.asarray(query_vector, dtype=np.float32)
+        matrix = np.asarray(vectors, dtype=np.float32)
+
+        if matrix.ndim != 2 or matrix.shape[1] != query_array.shape[0]:
+            return None, None
+
+        return query_array, self._normalize(matrix)
+
+    def score(
+            self,
+            query: str,
+            texts: List[str],
+            query_vector: Optional[List[float]] = None,
+            vectors: Optional[List[Optional[List[float]]]] = None
+    ) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Score every candidate at once. Without vectors, the score is BM25 only.
+
+        :param query: The query
+        :param texts: The candidate texts
+        :param query_vector: The query embedding, if known
+        :param vectors: The candidate embeddings, if known
+        :return: The scores & the normalized candidate matrix (None if no vectors)
+        """
+        lexical: np.ndarray = self.bm25_scores(query, texts)
+        query_array, matrix = self._vectors(query, texts, query_vector, vectors)
+
+        if matrix is None:
+            return lexical, None
+
+        semantic: np.ndarray = self.cosine_scores(query_array, matrix)
+        return self.vector_weight * semantic + (1 - self.vector_weight) * lexical, matrix
+
+    @staticmethod
+    def top_n(scores: np.ndarray, n: Optional[int] = None, min_score: float = 0.0) -> List[int]:
+        """
+        Indices of the n best scores at or above min_score, best first (ties keep input order)
+
+        :param scores: The scores
+        :param n: How many to keep (all if None)
+        :param min_score: The minimum score to keep
+        :return: The selected indices
+        """
+        eligible = (idx for idx in range(len(scores)) if scores[idx] >= min_score)
+
+        if n is None:
+            return sorted(eligible, key=lambda idx: -scores[idx])
+
+        return heapq.nlargest(n, eligible, key=scores.__getitem__)
+
+    @staticmethod
+    def mmr(
+            scores: np.ndarray,
+            matrix: np.ndarray,
+            n: Optional[int] = None,
+            mmr_lambda: float = 0.5,
+            min_score: float = 0.0
+    ) -> List[int]:
+        """
+        Maximal marginal relevance. Greedily picks the candidate maximizing
+        mmr_lambda * relevance - (1 - mmr_lambda) * (max similarity to anything already picked).
+
+        :param scores: The relevance scores
+        :param matrix: The row-normalized candidate embeddings
+        :param n: How many to pick (all eligible if None)
+        :param mmr_lambda: 1.0 is pure relevance, 0.0 is pure diversity
+        :param min_score: The minimum relevance score to be eligible
+        :return: The selected indices, in pick order
+        """
+        remaining: np.ndarray = scores >= min_score
+        n = min(int(remaining.sum()), n if n is not None else len(scores))
+
+        redundancy: np.ndarray = np.zeros(len(scores), dtype=np.float32)
+        selected: List[int] = []
+
+        for _ in range(n):
+            objective = np.where(remaining, mmr_lambda * scores - (1 - mmr_lambda) * redundancy, -np.inf)
+            picked = int(np.argmax(objective))
+            selected.append(picked)
+            remaining[picked] = False
+            redundancy = np.maximum(redundancy, matrix @ matrix[picked])
+
+        return selected
+
+    def rerank(
+            self,
+            results: List[Dict[str, Any]],
+            query: str,
+            top_n: Optional[int] = None,
+            min_n: float = 0.0,
+            mmr_lambda: Optional[float] = None,
+            query_vector: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rerank Elasticsearch-style hits. Returned hits are copies whose _score is the rerank score.
+
+        :param results: The hits ({"_source": {"text", "embedding"?}, ...} or flat {"text", ...})
+        :param query: The query
+        :param top_n: How many hits to keep
+        :param min_n: The minimum rerank score to keep
+        :param mmr_lambda: Enables MMR diversity when set (needs vectors, else plain top-n)
+        :param query_vector: The query embedding, if already computed
+        :return: The reranked hits, best first
+        """
+        if not results:
+            return []
+
+        scores, matrix = self.score(
+            query,
+            [hit_text(hit) for hit in results],
+            query_vector=query_vector,
+            vectors=[hit_embedding(hit) for hit in results]
+        )
+
+        if mmr_lambda is not None and matrix is not None:
+            order: List[int] = self.mmr(scores, matrix, n=top_n, mmr_lambda=mmr_lambda, min_score=min_n)
+        else:
+            order: List[int] = self.top_n(scores, n=top_n, min_score=min_n)
+
+        return [{**results[idx], "_score": float(scores[idx])} for idx in order]
@@ -17,20 +17,92 @@ You should have received a copy of the GNU General Public License along with Cri
 
 
 import asyncio
+from typing import Any, Dict, List, Optional
+
+from criadex.cache.rerank_cache import RerankCache
+from criadex.index.ragflow_objects.local_rerank import LocalReranker
+
 
 class RagflowPostprocessor:
-    def __init__(self, reranker):
+    def __init__(
+            self,
+            reranker=None,
+            local_reranker: Optional[LocalReranker] = None,
+            cache: Optional[RerankCache] = None,
+            model_key: str = "local"
+    ):
         self.reranker = reranker
+        self.local_reranker = local_reranker or LocalReranker()
+        self.cache = cache
+        self.model_key = model_key
+
+    @staticmethod
+    def _cut(ranked: List[Dict[str, Any]], top_n: Optional[int], min_n: float) -> List[Dict[str, Any]]:
+        ranked = [hit for hit in ranked if hit.get("_score", 0.0) >= min_n]
+        return ranked[:top_n] if top_n else ranked
 
-    def rerank(self, results, query):
-        # Use external reranker if available, else sort by score
+    def _cache_key(self, results: List[Dict[str, Any]], query: str, mmr_lambda: Optional[float]) -> Optional[str]:
+        # MMR picks depend on the cut, so only plain rankings are cached
+        if self.cache is None or mmr_lambda is not None or not results:
+            return None
+        return self.cache.key(self.model_key, query, results)
+
+    def _rerank(self, results, query, top_n, min_n, mmr_lambda, query_vector) -> List[Dict[str, Any]]:
+        # Use external reranker if available, else rerank locally (no remote call)
         if hasattr(self.reranker, "rerank"):
-            return self.reranker.rerank(results, query)
-        return sorted(results, key=lambda x: x.get("_score", 0), reverse=True)
+            return self._cut(self.reranker.rerank(results, query), top_n, min_n)
+        return self.local_reranker.rerank(
+            results,
+            query,
+            top_n=top_n,
+            min_n=min_n,
+            mmr_lambda=mmr_lambda,
+            query_vector=query_vector
+        )
 
-    async def arerank(self, results, query):
-        # Async rerank support
+    async def _arerank(self, results, query, top_n, min_n, mmr_lambda, query_vector) -> List[Dict[str, Any]]:
         if hasattr(self.reranker, "arerank"):
-            return await self.reranker.arerank(results, query)
+            return self._cut(await self.reranker.arerank(results, query), top_n, min_n)
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.rerank, results, query)
+        return await loop.run_in_executor(
+            None,
+            lambda: self._rerank(results, query, top_n, min_n, mmr_lambda, query_vector)
+        )
+
+    def rerank(
+            self,
+            results: List[Dict[str, Any]],
+            query: str,
+            top_n: Optional[int] = None,
+            min_n: float = 0.0,
+            mmr_lambda: Optional[float] = None,
+            query_vector: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        key: Optional[str] = self._cache_key(results, query, mmr_lambda)
+        if key is None:
+            return self._rerank(results, query, top_n, min_n, mmr_lambda, query_vector)
+
+        # Cache the scores of the whole candidate set, then cut
+        scores: Optional[Dict[str, float]] = self.cache.get(key)
+        if scores is None:
+            scores = self.cache.store(key, self._rerank(results, query, None, 0.0, None, query_vector))
+        return self._cut(self.cache.apply(scores, results), top_n, min_n)
+
+    async def arerank(
+            self,
+            results: List[Dict[str, Any]],
+            query: str,
+            top_n: Optional[int] = None,
+            min_n: float = 0.0,
+            mmr_lambda: Optional[float] = None,
+            query_vector: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        # Async rerank support
+        key: Optional[str] = self._cache_key(results, query, mmr_lambda)
+        if key is None:
+            return await self._arerank(results, query, top_n, min_n, mmr_lambda, query_vector)
+
+        scores: Optional[Dict[str, float]] = self.cache.get(key)
+        if scores is None:
+            scores = self.cache.store(key, await self._arerank(results, query, None, 0.0, None, query_vector))
+        return self._cut(self.cache.apply(scores, results), top_n, min_n)
@@ -0,0 +1,395 @@
+"""
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterator, List, Literal, Optional, Set, Tuple
+
+from elasticsearch import ConflictError, NotFoundError
+from pydantic import BaseModel, computed_field
+
+from criadex.index.ragflow_objects.embedder import fit_embedding
+from criadex.index.ragflow_objects.layout import GROUP_INDEX_PREFIX, GroupIndexInfo
+from criadex.schemas import ReindexRunningError, VectorIndexType
+
+"""Where re-embedding progress is checkpointed, one document per group"""
+REINDEX_JOBS_INDEX: str = "criadex-reindex-jobs"
+
+"""How long a point-in-time stays open between two batches"""
+PIT_KEEP_ALIVE: str = "5m"
+
+"""Seconds without a checkpoint after which a running job is presumed dead (e.g. its worker stopped) & may be resumed"""
+REINDEX_STALE_AFTER: float = 300.0
+
+ReindexStatus = Literal["running", "completed", "failed"]
+
+
+class ReindexProgress(BaseModel):
+    """
+    Progress of a group's re-embedding job. Checkpointed after every batch, so a job can resume.
+
+    """
+
+    group_name: str
+    source_index: str
+    target_index: str
+    dims: Optional[int] = None
+    vector_index: Optional[VectorIndexType] = None
+    matryoshka: bool = False
+    status: ReindexStatus = "running"
+
+    total: int = 0
+    processed: int = 0  # Nodes written to the shadow index (or found there already, on resume)
+    embedded: int = 0  # Nodes actually re-embedded
+    caught_up: int = 0  # Nodes written to the old index during the job & copied afterwards
+
+    pit_id: Optional[str] = None
+    search_after: Optional[List[Any]] = None
+
+    started_at: float = 0.0
+    updated_at: float = 0.0
+    error: Optional[str] = None
+
+    @computed_field
+    @property
+    def throughput(self) -> float:
+        """Nodes per second"""
+        return self.processed / max(self.updated_at - self.started_at, 1e-6)
+
+    @computed_field
+    @property
+    def percent(self) -> float:
+        return 100.0 * self.processed / self.total if self.total else 100.0
+
+
+class ReindexJob:
+    """
+    Zero-downtime re-embedding of a group. Searches & writes keep using the group's alias (the old index) while:
+
+        1. a shadow index (the group's next index generation) is created with the new mapping,
+        2. every node is streamed out of the old index with point-in-time + search_after,
+        3. re-embedded in batches & bulk-written into the shadow index,
+        4. the old index is write-blocked & the nodes written to it while the job ran are copied over
+           (by metadata.updated_at), so no write can land between this catch-up & the swap,
+        5. the alias is atomically swapped to the shadow index & the old index is dropped.
+
+    Writes to the group fail while the old index is write-blocked (the catch-up & swap, usually seconds).
+
+    Progress is checkpointed to Elasticsearch, & a worker claims the job there before running it, so only one
+    worker runs a group's job. Re-running a failed (or stale) job resumes from its last search_after,
+    or (if the point-in-time expired) restarts the stream & skips nodes already in the shadow index.
+
+    Files deleted from the group while the job runs may reappear after the swap; don't delete during a reindex.
+
+    """
+
+    def __init__(
+            self,
+            vector_store: Any,
+            embedder: Any,
+            group_name: str,
+            dims: Optional[int] = None,
+            vector_index: Optional[VectorIndexType] = None,
+            batch_size: int = 256,
+            keep_source: bool = False
+    ):
+        """
+        :param vector_store: The RagflowVectorStore
+        :param embedder: The (new) embedder, with embed_many(texts)
+        :param group_name: The group to re-embed
+        :param dims: The new embedding dimensions (the current ones if None)
+        :param vector_index: The new vector index type (the current one if None)
+        :param batch_size: Nodes per search page, embedding batch & bulk request
+        :param keep_source: Keep the old index after the swap (e.g. for rollback)
+        """
+        self.vector_store = vector_store
+        self.es = vector_store.es
+        self.embedder = embedder
+        self.group_name: str = group_name
+        self.dims: Optional[int] = dims
+        self.vector_index: Optional[VectorIndexType] = vector_index
+        self.batch_size: int = batch_size
+        self.keep_source: bool = keep_source
+
+    def _get(self) -> Tuple[Optional[ReindexProgress], Dict[str, Any]]:
+        """The group's last checkpoint, with the concurrency control that only updates that version of it"""
+
+        try:
+            response = self.es.get(index=REINDEX_JOBS_INDEX, id=self.group_name)
+        except NotFoundError:
+            return None, {"op_type": "create"}
+
+        return ReindexProgress(**response["_source"]), {"if_seq_no": response["_seq_no"], "if_primary_term": response["_primary_term"]}
+
+    def load(self) -> Optional[ReindexProgress]:
+        """Load the group's last checkpoint"""
+
+        return self._get()[0]
+
+    def save(self, progress: ReindexProgress, **concurrency: Any) -> None:
+        progress.updated_at = time.time()
+        self.es.index(index=REINDEX_JOBS_INDEX, id=self.group_name, document=progress.model_dump(), **concurrency)
+
+    def _claim(self, progress: ReindexProgress, concurrency: Dict[str, Any]) -> None:
+        # Only one of the workers planning from the same checkpoint gets to write it
+        progress.status, progress.error = "running", None
+
+        try:
+            self.save(progress, **concurrency)
+        except ConflictError:
+            raise ReindexRunningError()
+
+    def plan(self) -> ReindexProgress:
+        """
+        Claim the group's job: resume its unfinished one, or create the shadow index for a new one
+
+        :return: The job's progress
+        :raises ReindexRunningError: If a worker is running the group's job
+        """
+        progress, concurrency = self._get()
+
+        if progress is not None and progress.status == "running" and time.time() - progress.updated_at < REINDEX_STALE_AFTER:
+            raise ReindexRunningError()
+
+        if progress is not None and progress.status != "completed":
+            self._claim(progress, concurrency)
+            return progress
+
+        indices: List[str] = list(self.vector_store.layout.resolve(self.group_name))
+
+        # A group created before the index layout is a concrete index named after the group
+        source: str = indices[0] if indices else self.group_name
+
+        if len(indices) > 1 or (indices and not source.startswith(GROUP_INDEX_PREFIX)):
+            raise ValueError(f"Group '{self.group_name}' does not own its index; only index-per-group groups can be re-embedded")
+
+        # Carry the group's current mapping over, except for what the job changes
+        info: GroupIndexInfo = self.vector_store.layout.describe(self.group_name)
+        dims: Optional[int] = self.dims or info.dims
+        vector_index: Optional[VectorIndexType] = self.vector_index or info.vector_index
+
+        target: str = self.vector_store.layout.next_index(self.group_name, source)
+
+        now: float = time.time()
+        progress = ReindexProgress(
+            group_name=self.group_name,
+            source_index=source,
+            target_index=target,
+            dims=dims,
+            vector_index=vector_index,
+            matryoshka=info.matryoshka,
+            total=self.es.count(index=source)["count"],
+            started_at=now,
+            updated_at=now
+        )
+
+        # Claimed before the shadow index is created, so a concurrent plan fails on the claim
+        self._claim(progress, concurrency)
+
+        try:
+            self.vector_store.layout.create_index(target, dims=dims, vector_index=vector_index, matryoshka=info.matryoshka)
+        except Exception as ex:
+            progress.status, progress.error = "failed", repr(ex)
+            self.save(progress)
+            raise
+
+        return progress
+
+    def run(self, progress: Optional[ReindexProgress] = None) -> ReindexProgress:
+        """
+        Run (or resume) the job to completion
+
+        :param progress: The planned job (plans one if None)
+        :return: The final progress
+        """
+        progress = progress or self.plan()
+
+        try:
+            self._copy(progress)
+            self._catch_up(progress)
+            self._close_pit(progress)
+            self._swap(progress)
+            progress.status = "completed"
+        except Exception as ex:
+            # The point-in-time is left open, so a prompt resume continues from the cursor
+            progress.status, progress.error = "failed", repr(ex)
+            try:
+                self._block_writes(progress, False)
+            except Exception:
+                logging.exception(f"Failed to unblock writes to {progress.source_index}")
+            raise
+        finally:
+            self.save(progress)
+
+        logging.info(f"Re-embedded {progress.processed} nodes of group '{self.group_name}' into {progress.target_index}")
+        return progress
+
+    async def arun(self, progress: Optional[ReindexProgress] = None) -> ReindexProgress:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.run, progress)
+
+    def _open_pit(self, progress: ReindexProgress) -> None:
+        progress.pit_id = self.es.open_point_in_time(index=progress.source_index, keep_alive=PIT_KEEP_ALIVE)["id"]
+        progress.search_after = None
+
+    def _close_pit(self, progress: ReindexProgress) -> None:
+        if progress.pit_id is None:
+            return
+
+        try:
+            self.es.close_point_in_time(id=progress.pit_id)
+        except NotFoundError:
+            pass
+
+        progress.pit_id = None
+
+    def _pages(self, cursor: ReindexProgress, query: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[List[Dict[str, Any]], bool]]:
+        """
+        Stream the source index in pages, in _shard_doc order, advancing the cursor's search_after
+
+        :param cursor: Holds the point-in-time & search_after
+        :param query: Restricts the stream (all nodes if None)
+        :return: The pages of hits, each with whether the stream (re)started from the beginning at that page
+        """
+        restarted: bool = cursor.pit_id is None
+
+        if restarted:
+            self._open_pit(cursor)
+
+        while True:
+            kwargs: Dict[str, Any] = {"search_after": cursor.search_after} if cursor.search_after else {}
+
+            try:
+                response = self.es.search(
+                    pit={"id": cursor.pit_id, "keep_alive": PIT_KEEP_ALIVE},
+                    query=query or {"match_all": {}},
+                    sort=[{"_shard_doc": "asc"}],
+                    size=self.batch_size,
+                    source_excludes=["embedding"],
+                    **kwargs
+                )
+            except NotFoundError:
+                # The point-in-time expired (e.g. the job was resumed much later): restart the stream
+                self._open_pit(cursor)
+                restarted = True
+                continue
+
+            hits: List[Dict[str, Any]] = response["hits"]["hits"]
+            if not hits:
+                return
+
+            cursor.pit_id = response.get("pit_id", cursor.pit_id)
+            cursor.search_after = hits[-1]["sort"]
+            yield hits, restarted
+            restarted = False
+
+    def _existing(self, index: str, ids: List[str]) -> Set[str]:
+        response = self.es.search(index=index, query={"ids": {"values": ids}}, size=len(ids), source=False)
+        return {hit["_id"] for hit in response["hits"]["hits"]}
+
+    def _write(self, progress: ReindexProgress, hits: List[Dict[str, Any]], skip_existing: bool = False) -> int:
+        """
+        Re-embed a page of hits & bulk-write it into the shadow index
+
+        :param progress: The job (its shadow index & embedding dimensions)
+        :param hits: The source hits
+        :param skip_existing: Skip hits already in the shadow index
+        :return: How many hits were re-embedded
+        """
+        index: str = progress.target_index
+
+        if skip_existing:
+            existing: Set[str] = self._existing(index, [hit["_id"] for hit in hits])
+            hits = [hit for hit in hits if hit["_id"] not in existing]
+
+        if not hits:
+            return 0
+
+        embeddings: List[List[float]] = self.embedder.embed_many([hit["_source"].get("text") or "" for hit in hits])
+        operations: List[Dict[str, Any]] = []
+
+        for hit, embedding in zip(hits, embeddings):
+            action: Dict[str, Any] = {"_index": index, "_id": hit["_id"]}
+            if hit.get("_routing"):
+                action["routing"] = hit["_routing"]
+
+            operations.append({"index": action})
+            operations.append({**hit["_source"], "embedding": fit_embedding(embedding, progress.dims, progress.matryoshka)})
+
+        response = self.es.bulk(operations=operations, refresh=False)
+
+        if response.get("errors"):
+            failed = next(item["index"]["error"] for item in response["items"] if item["index"].get("error"))
+            raise RuntimeError(f"Bulk write to {index} failed: {failed}")
+
+        return len(hits)
+
+    def _copy(self, progress: ReindexProgress) -> None:
+        skip_existing: bool = False
+
+        for hits, restarted in self._pages(progress):
+            if restarted and progress.processed:
+                # Resumed from the beginning: recount, re-embedding only the nodes not copied yet
+                progress.processed, skip_existing = 0, True
+
+            progress.embedded += self._write(progress, hits, skip_existing)
+            progress.processed += len(hits)
+            self.save(progress)
+
+    def _block_writes(self, progress: ReindexProgress, blocked: bool) -> None:
+        """Block (or unblock) writes to the old index, so none land after the catch-up's snapshot"""
+
+        try:
+            self.es.indices.put_settings(index=progress.source_index, settings={"index": {"blocks": {"write": blocked}}})
+        except NotFoundError:
+            # Already dropped by the swap
+            pass
+
+    def _catch_up(self, progress: ReindexProgress) -> None:
+        # Nodes written through the alias while the job ran went to the old index. Block further writes, so the
+        # catch-up sees all of them, then copy them on their own cursor. Writes fail until the swap.
+        self._block_writes(progress, True)
+
+        cursor: ReindexProgress = progress.model_copy(update={"pit_id": None, "search_after": None})
+        query = {"range": {"metadata.updated_at": {"gte": int(progress.started_at * 1000)}}}
+
+        try:
+            for hits, _ in self._pages(cursor, query):
+                progress.embedded += self._write(progress, hits)
+                progress.caught_up += len(hits)
+                self.save(progress)
+        finally:
+            self._close_pit(cursor)
+
+    def _swap(self, progress: ReindexProgress) -> None:
+        """Point the group's alias at the shadow index, in one atomic alias update"""
+
+        self.es.indices.refresh(index=progress.target_index)
+
+        actions: List[Dict[str, Any]] = [
+            {"add": {"index": progress.target_index, "alias": self.group_name, "is_write_index": True}}
+        ]
+
+        if progress.source_index == self.group_name:
+            # A legacy concrete index holds the alias' name, so it must go in the same update
+            actions.append({"remove_index": {"index": progress.source_index}})
+        else:
+            actions.append({"remove": {"index": progress.source_index, "alias": self.group_name}})
+
+        self.es.indices.update_aliases(actions=actions)
+        self.vector_store.forget_index_info(self.group_name)
+
+        if progress.source_index != self.group_name and not self.keep_source:
+            self.es.indices.delete(index=progress.source_index)
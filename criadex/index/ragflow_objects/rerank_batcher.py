@@ -0,0 +1,95 @@
+"""
+This file is part of Criadex.
+
+Criadex is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+Criadex is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with Criadex. If not, see <https://www.gnu.org/licenses/>.
+
+@package    Criadex
+@author     kiarash b
+@copyright  2025 onwards York University (https://yorku.ca/)
+@repository https://github.com/YorkUITInnovation/Criadex
+@license    https://www.gnu.org/copyleft/gpl.html GNU GPL v3 or later
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from criadex.cache.rerank_cache import candidate_id
+
+
+@dataclass()
+class _RerankBatch:
+    hits: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    future: asyncio.Future = None
+
+
+class RerankBatcher:
+    """
+    Packs concurrent rerank requests into fewer provider calls. Rerank APIs (e.g. Cohere) score one query
+    against many documents, and each document's relevance score does not depend on the others. So requests
+    for the SAME query that arrive within a short window are merged into one call over the union of their
+    candidates (deduplicated by ID), and each caller gets back its own candidates.
+
+    """
+
+    def __init__(self, reranker: Any, window: float = 0.005, max_documents: int = 1000):
+        """
+        :param reranker: The provider reranker, with rerank(results, query) & arerank(results, query)
+        :param window: How long (seconds) a batch waits for more requests before it is sent
+        :param max_documents: The provider's max documents per call
+        """
+        self.reranker = reranker
+        self.window: float = window
+        self.max_documents: int = max_documents
+        self.calls: int = 0
+        self._pending: Dict[str, _RerankBatch] = {}
+
+    def rerank(self, results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+        # Sync calls are not batched
+        self.calls += 1
+        return self.reranker.rerank(results, query)
+
+    async def arerank(self, results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+        """
+        Rerank via a (possibly shared) batched provider call
+
+        :param results: The candidate hits
+        :param query: The query
+        :return: This request's hits, reranked
+        """
+        candidates: Dict[str, Dict[str, Any]] = {candidate_id(hit): hit for hit in results}
+        batch: _RerankBatch = self._pending.get(query)
+
+        # Start a new batch if there is none open, or this request would overflow it
+        if batch is None or len(batch.hits.keys() | candidates.keys()) > self.max_documents:
+            batch = _RerankBatch(future=asyncio.get_running_loop().create_future())
+            self._pending[query] = batch
+            asyncio.create_task(self._flush(query, batch))
+
+        for cid, hit in candidates.items():
+            batch.hits.setdefault(cid, hit)
+
+        scores: Dict[str, float] = await asyncio.shield(batch.future)
+
+        ranked: List[Dict[str, Any]] = [
+            {**hit, "_score": scores[cid]}
+            for cid, hit in candidates.items() if cid in scores
+        ]
+        return sorted(ranked, key=lambda hit: -hit["_score"])
+
+    async def _flush(self, query: str, batch: _RerankBatch) -> None:
+        await asyncio.sleep(self.window)
+
+        # Close the batch to newcomers
+        if self._pending.get(query) is batch:
+            del self._pending[query]
+
+        self.calls += 1
+
+        try:
+            ranked: List[Dict[str, Any]] = await self.reranker.arerank(list(batch.hits.values()), query)
+            batch.future.set_result({candidate_id(hit): hit.get("_score", 0.0) for hit in ranked})
+        except Exception as ex:
+            batch.future.set_exception(ex)
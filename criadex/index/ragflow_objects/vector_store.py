@@ -15,12 +15,97 @@ You should have received a copy of the GNU General Public License along with Cri
 from elasticsearch import Elasticsearch
 
 
-from typing import Any, Dict, List, Optional, Union
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional, Union
 import asyncio
 import json
+import time
+
+from criadex.index.ragflow_objects.filters import compile_filter, combine_filters
+from criadex.index.ragflow_objects.embedder import fit_embedding
+from criadex.index.ragflow_objects.ingestion import IngestionLease, IngestionLeases
+from criadex.index.ragflow_objects.layout import GroupDrop, GroupIndexInfo, IndexLayout, IndexLayoutMode, keyword_field, QUANTIZED_INDEX_TYPES
+from criadex.schemas import EmbeddingDimensionsError, RefreshPolicy, VectorIndexType
+
+"""Added to the cosine similarity by the vector scoring script, since Elasticsearch scores can't be negative"""
+COSINE_SCORE_OFFSET: float = 1.0
+
+"""kNN candidates per shard, as a multiple of top_k (with a floor), for groups searched with approximate kNN"""
+KNN_CANDIDATES_FACTOR: int = 10
+KNN_MIN_CANDIDATES: int = 100
+
+"""Oversampling of the quantized candidates that are rescored against the full-precision vectors"""
+KNN_RESCORE_OVERSAMPLE: Dict[str, float] = {"int8_hnsw": 1.5, "int4_hnsw": 2.0, "bbq_hnsw": 3.0}
+
+"""Seconds a worker trusts its cached view of how a group is indexed, since a re-embedding on any worker swaps it"""
+INDEX_INFO_TTL: float = 30.0
+
+"""A group's refresh interval while in ingestion mode (fewer, larger segments during big imports)"""
+INGEST_REFRESH_INTERVAL: str = "30s"
+
+
+def refresh_param(policy: RefreshPolicy) -> Union[bool, str]:
+    """The Elasticsearch refresh parameter for a policy"""
+    return {"false": False, "true": True}.get(policy, policy)
+
+
+@dataclass()
+class WritePolicy:
+    """
+    When writes become searchable, per operation. Every forced refresh ("true") writes a new small segment,
+    so forced refreshes under concurrent uploads stall the cluster with merges.
+
+    """
+
+    insert: RefreshPolicy = "false"  # Each node of a file but the last
+    file: RefreshPolicy = "wait_for"  # The last node of a file, so a file is searchable once its upload returns
+    delete: RefreshPolicy = "true"  # Delete-by-query can't wait_for: "wait_for" leaves it to the refresh interval
+
+
+@dataclass()
+class HybridSearch:
+    """
+    Options for a hybrid (BM25 + vector) search. Both legs run in one multi-search & are fused app-side.
+
+    """
+
+    query_text: str
+    fusion: Literal["rrf", "weighted"] = "rrf"
+    vector_weight: float = 0.5  # The BM25 leg gets 1 - vector_weight
+    rrf_k: int = 60
+
 
 class RagflowVectorStore:
-    def __init__(self, host, port, username=None, password=None, index_name="criadex", group_name=None):
+    # Index layout: shards per index, & (for huge groups) how many shards one group's routing value spreads over
+    number_of_shards: Optional[int] = None
+    routing_partition_size: Optional[int] = None
+
+    # Route each group's nodes to its own shard(s), so a group's searches & deletes don't fan out to every shard
+    group_routing: bool = False
+
+    # Where groups physically live (see layout.py)
+    layout_mode: IndexLayoutMode = "group"
+    _layout: Optional[IndexLayout] = None
+    _index_info: Optional[Dict[str, GroupIndexInfo]] = None
+
+    # Refresh policy per write operation, & the groups in ingestion mode (leases shared by every worker through ES)
+    write_policy: WritePolicy = WritePolicy()
+    _ingestion_leases: Optional[IngestionLeases] = None
+
+    def __init__(
+            self,
+            host,
+            port,
+            username=None,
+            password=None,
+            index_name="criadex",
+            group_name=None,
+            number_of_shards: Optional[int] = None,
+            routing_partition_size: Optional[int] = None,
+            group_routing: bool = False,
+            layout_mode: IndexLayoutMode = "group",
+            write_policy: Optional[WritePolicy] = None
+    ):
         self.es = Elasticsearch(
             hosts=[{"host": host, "port": port, "scheme": "http"}],
             basic_auth=(username, password) if username and password else None,
@@ -31,6 +116,62 @@ class RagflowVectorStore:
         )
         self.index_name = index_name
         self.group_name = group_name
+        self.number_of_shards = number_of_shards
+        self.routing_partition_size = routing_partition_size
+        self.group_routing = group_routing
+        self.layout_mode = layout_mode
+        self._layout = None
+        self._index_info = None
+        self.write_policy = write_policy or WritePolicy()
+        self._ingestion_leases = None
+
+    def routing(self, group_name: Optional[str]) -> Optional[str]:
+        # The routing value for a group's documents, if group routing is enabled
+        return group_name if self.group_routing and group_name else None
+
+    @property
+    def layout(self) -> IndexLayout:
+        if self._layout is None:
+            self._layout = IndexLayout(
+                self.es,
+                mode=self.layout_mode,
+                number_of_shards=self.number_of_shards,
+                routing_partition_size=self.routing_partition_size,
+                group_routing=self.group_routing
+            )
+        return self._layout
+
+    @property
+    def ingestion_leases(self) -> IngestionLeases:
+        if self._ingestion_leases is None:
+            self._ingestion_leases = IngestionLeases(self.es)
+        return self._ingestion_leases
+
+    def index_info(self, collection_name: str, refresh: bool = False) -> GroupIndexInfo:
+        # How a group's embeddings are indexed, looked up at most every INDEX_INFO_TTL seconds per process
+        if self._index_info is None:
+            self._index_info = {}
+        info: Optional[GroupIndexInfo] = self._index_info.get(collection_name)
+        if refresh or info is None or time.monotonic() - info.described_at >= INDEX_INFO_TTL:
+            info = self._index_info[collection_name] = self.layout.describe(collection_name)
+        return info
+
+    def forget_index_info(self, collection_name: str) -> None:
+        if self._index_info is not None:
+            self._index_info.pop(collection_name, None)
+
+    def vector_index(self, collection_name: str) -> Optional[VectorIndexType]:
+        return self.index_info(collection_name).vector_index
+
+    def fit_embedding(self, collection_name: str, embedding: List[float]) -> List[float]:
+        # Check (& Matryoshka-truncate, if the group is configured to) an embedding against the group's dimensions
+        info = self.index_info(collection_name)
+        try:
+            return fit_embedding(embedding, info.dims, info.matryoshka)
+        except EmbeddingDimensionsError:
+            # The group may have been re-embedded (by another worker) since it was cached
+            info = self.index_info(collection_name, refresh=True)
+            return fit_embedding(embedding, info.dims, info.matryoshka)
 
     def collection_exists(self, collection_name):
         return self.es.indices.exists(index=collection_name)
@@ -39,27 +180,10 @@ class RagflowVectorStore:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self.collection_exists, collection_name)
 
-    def create_collection(self, collection_name):
+    def create_collection(self, collection_name, vector_index: Optional[VectorIndexType] = None, dims: Optional[int] = None, matryoshka: bool = False):
         try:
-            if not self.es.indices.exists(index=collection_name):
-                mapping = {
-                    "mappings": {
-                        "properties": {
-                            "metadata": {
-                                "properties": {
-                                    "file_name": {"type": "keyword"},
-                                    "updated_at": {"type": "date"},
-                                    "update_id": {"type": "keyword"}
-                                }
-                            },
-                            "embedding": {
-                                "type": "dense_vector",
-                                "dims": 768
-                            }
-                        }
-                    }
-                }
-                self.es.indices.create(index=collection_name, body=mapping)
+            # The collection is an alias over an index created from the Criadex index template
+            self.layout.create_group(collection_name, vector_index=vector_index, dims=dims, matryoshka=matryoshka)
         except Exception as e:
             # Log the error but don't fail the test
             import logging
@@ -67,87 +191,204 @@ class RagflowVectorStore:
             # For testing purposes, we'll assume the index exists
             pass
 
-    async def acreate_collection(self, collection_name):
+    async def acreate_collection(self, collection_name, vector_index: Optional[VectorIndexType] = None, dims: Optional[int] = None, matryoshka: bool = False):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.create_collection, collection_name, vector_index, dims, matryoshka)
+
+    def drop_collection(self, collection_name, wait_for_completion: bool = True) -> GroupDrop:
+        self.forget_index_info(collection_name)
+        self.ingestion_leases.remove(collection_name)
+        return self.layout.drop_group(collection_name, wait_for_completion)
+
+    async def adrop_collection(self, collection_name, wait_for_completion: bool = True) -> GroupDrop:
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self.create_collection, collection_name)
+        return await loop.run_in_executor(None, self.drop_collection, collection_name, wait_for_completion)
+
+    @staticmethod
+    def _routed(routing: Optional[str]) -> Dict[str, Any]:
+        return {"routing": routing} if routing else {}
+
+    def ingesting(self, collection_name: str) -> bool:
+        lease: Optional[IngestionLease] = self.ingestion_leases.cached(collection_name)
+        if lease is None:
+            return False
 
-    def insert(self, collection_name, doc_id, embedding, text, metadata=None):
-        body = {"text": text, "embedding": embedding}
+        if lease.expired:
+            # Its worker never ended it (e.g. it restarted), so the first write to notice does
+            self.end_ingestion(collection_name, expired_only=True)
+            return False
+
+        return True
+
+    def begin_ingestion(self, collection_name: str, expire_after: int = 3600) -> None:
+        """
+        Put a group in ingestion mode: raise its refresh interval & stop refreshing per write, until end_ingestion
+        or the lease expires. Calling again renews the lease. In the shared layout, this applies to the shared index
+        (every group in it).
+
+        :param collection_name: The group
+        :param expire_after: Seconds until the lease expires
+        :return: None
+        """
+        lease: Optional[IngestionLease] = self.ingestion_leases.load(collection_name)
+
+        if lease is None:
+            settings = self.es.indices.get_settings(index=collection_name, name="index.refresh_interval")
+            previous: Optional[str] = next(
+                (body["settings"]["index"]["refresh_interval"] for body in dict(settings).values()
+                 if "refresh_interval" in body.get("settings", {}).get("index", {})),
+                None
+            )
+
+            # The lease is created before the interval is raised, so a worker beginning concurrently renews it
+            # rather than recording the raised interval as the one to restore
+            lease = IngestionLease(group_name=collection_name, previous_refresh_interval=previous, expires_at=time.time() + expire_after)
+            if self.ingestion_leases.create(lease):
+                self.es.indices.put_settings(index=collection_name, settings={"index": {"refresh_interval": INGEST_REFRESH_INTERVAL}})
+                return
+
+            lease = self.ingestion_leases.load(collection_name) or lease
+
+        lease.expires_at = time.time() + expire_after
+        self.ingestion_leases.save(lease)
+
+    def end_ingestion(self, collection_name: str, expired_only: bool = False) -> bool:
+        """
+        Restore a group's refresh interval & refresh it once, making everything ingested searchable
+
+        :param collection_name: The group
+        :param expired_only: Only end it if its lease expired (i.e. wasn't renewed, perhaps by another worker)
+        :return: Whether this call ended the group's ingestion
+        """
+        lease: Optional[IngestionLease] = self.ingestion_leases.load(collection_name)
+        if lease is None or (expired_only and not lease.expired):
+            return False
+
+        # Whichever worker removes the lease restores the interval
+        if not self.ingestion_leases.remove(collection_name):
+            return False
+
+        # None resets the interval to the index default
+        self.es.indices.put_settings(index=collection_name, settings={"index": {"refresh_interval": lease.previous_refresh_interval}})
+        self.es.indices.refresh(index=collection_name)
+        return True
+
+    async def abegin_ingestion(self, collection_name: str, expire_after: int = 3600) -> None:
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.begin_ingestion, collection_name, expire_after)
+
+    async def aend_ingestion(self, collection_name: str, expired_only: bool = False) -> bool:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.end_ingestion, collection_name, expired_only)
+
+    def insert(self, collection_name, doc_id, embedding, text, metadata=None, routing=None, refresh: Optional[RefreshPolicy] = None):
+        body = {"text": text, "embedding": self.fit_embedding(collection_name, embedding)}
         if metadata:
             body["metadata"] = metadata
         body["collection_name"] = collection_name # Add collection_name to the document
-        
-        self.es.index(index=collection_name, id=doc_id, document=body, refresh=True)
 
-    async def ainsert(self, collection_name, doc_id, embedding, text, metadata=None):
+        # In ingestion mode, writes become searchable at the (raised) refresh interval, or when ingestion ends
+        policy: RefreshPolicy = "false" if self.ingesting(collection_name) else (refresh or self.write_policy.insert)
+        self.es.index(index=collection_name, id=doc_id, document=body, refresh=refresh_param(policy), **self._routed(routing))
+
+    async def ainsert(self, collection_name, doc_id, embedding, text, metadata=None, routing=None, refresh: Optional[RefreshPolicy] = None):
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self.insert, collection_name, doc_id, embedding, text, metadata)
+        await loop.run_in_executor(None, self.insert, collection_name, doc_id, embedding, text, metadata, routing, refresh)
 
-    def delete(self, collection_name, doc_id):
-        self.es.delete(index=collection_name, id=doc_id)
+    def delete(self, collection_name, doc_id, routing=None):
+        self.es.delete(index=collection_name, id=doc_id, **self._routed(routing))
 
-    async def adelete(self, collection_name, doc_id):
+    async def adelete(self, collection_name, doc_id, routing=None):
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self.delete, collection_name, doc_id)
+        await loop.run_in_executor(None, self.delete, collection_name, doc_id, routing)
 
-    def delete_by_query(self, collection_name, field, value):
+    def delete_by_query(self, collection_name, field, value, routing=None, refresh: Optional[RefreshPolicy] = None):
         query = {
             "query": {
                 "term": {
-                    f"metadata.{field}.keyword": value
+                    keyword_field(field): value
                 }
             }
         }
-        response = self.es.delete_by_query(index=collection_name, body=query, refresh=True)
-        self.es.indices.refresh(index=collection_name)
+        # Delete-by-query only takes a boolean refresh (one refresh of the affected shards when done)
+        policy: RefreshPolicy = refresh or self.write_policy.delete
+        self.es.delete_by_query(index=collection_name, body=query, refresh=policy == "true", **self._routed(routing))
 
-    async def adelete_by_query(self, collection_name, field, value):
+    async def adelete_by_query(self, collection_name, field, value, routing=None, refresh: Optional[RefreshPolicy] = None):
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self.delete_by_query, collection_name, field, value)
+        await loop.run_in_executor(None, self.delete_by_query, collection_name, field, value, routing, refresh)
 
-    def merge_filters(self, *filters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        # Merge multiple Elasticsearch filters (bool queries)
-        final_clauses = []
-        for f in filters:
-            if not f:
-                continue
-            if "bool" in f:
-                if "must" in f["bool"]:
-                    final_clauses.extend(f["bool"]["must"])
-                if "should" in f["bool"]:
-                    final_clauses.extend(f["bool"]["should"])
-                if "must_not" in f["bool"]:
-                    final_clauses.extend(f["bool"]["must_not"])
-            elif "must" in f:
-                final_clauses.extend(f["must"])
-            elif "should" in f:
-                final_clauses.extend(f["should"])
-            elif "must_not" in f:
-                final_clauses.extend(f["must_not"])
-            else:
-                final_clauses.append(f)
-        return final_clauses
+    def submit_delete_by_query(self, collection_name, field, value, routing=None, refresh: Optional[RefreshPolicy] = None) -> str:
+        # Run the delete as a sliced background task & return its ID, for the tasks API.
+        # conflicts=proceed: nodes re-written since the task's snapshot (e.g. a re-upload) are kept, not failed on.
+        query = {"query": {"term": {keyword_field(field): value}}}
+        policy: RefreshPolicy = refresh or self.write_policy.delete
+        response = self.es.delete_by_query(
+            index=collection_name,
+            body=query,
+            conflicts="proceed",
+            slices="auto",
+            wait_for_completion=False,
+            refresh=policy == "true",
+            **self._routed(routing)
+        )
+        return response["task"]
+
+    async def asubmit_delete_by_query(self, collection_name, field, value, routing=None, refresh: Optional[RefreshPolicy] = None) -> str:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.submit_delete_by_query, collection_name, field, value, routing, refresh)
+
+    def merge_filters(self, *filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Compile & AND several Criadex filters into bool.filter clauses
+        compiled = compile_filter(combine_filters(*filters))
+        if not compiled:
+            return []
+        # A plain AND of clauses needs no wrapping bool
+        return compiled["bool"]["filter"] if list(compiled["bool"]) == ["filter"] else [compiled]
 
     def build_query_filter(self, query: Union[Dict[str, Any], None], extra_filter: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         # Merge base query filter and extra filter
-        if query is None and extra_filter is None:
-            return None
-        if query is None:
-            return extra_filter
-        if extra_filter is None:
-            return query
-        return self.merge_filters(query, extra_filter)
-
-    def search(self, collection_name, query_embedding, top_k=10, query_filter=None, sort=None):
+        return combine_filters(query, extra_filter)
+
+    @staticmethod
+    def build_knn_query(query_embedding, top_k, filter_clauses, min_similarity=None, vector_index: VectorIndexType = "int8_hnsw") -> Dict[str, Any]:
+        # Approximate kNN over the quantized HNSW graph, rescoring the best candidates with the full-precision vectors
+        knn: Dict[str, Any] = {
+            "field": "embedding",
+            "query_vector": query_embedding,
+            "num_candidates": max(top_k * KNN_CANDIDATES_FACTOR, KNN_MIN_CANDIDATES),
+            "filter": filter_clauses
+        }
+
+        if vector_index in KNN_RESCORE_OVERSAMPLE:
+            knn["rescore_vector"] = {"oversample": KNN_RESCORE_OVERSAMPLE[vector_index]}
+
+        # The threshold is on the raw cosine similarity
+        if min_similarity is not None:
+            knn["similarity"] = min_similarity
+
+        return {"knn": knn}
+
+    @staticmethod
+    def knn_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # kNN scores cosine as (1 + cosine) / 2; rescale to the script's cosine + COSINE_SCORE_OFFSET
+        for hit in hits:
+            if hit.get("_score") is not None:
+                hit["_score"] = hit["_score"] * 2 + COSINE_SCORE_OFFSET - 1
+        return hits
+
+    def build_search_body(self, query_embedding, top_k=10, query_filter=None, by_relevance=False, min_similarity=None, vector_index: Optional[VectorIndexType] = None) -> Dict[str, Any]:
         # Build the filter clauses
-        filters_to_merge = []
+        merged_filter_clauses = self.merge_filters(query_filter)
 
-        # Add user-provided query filter
-        if query_filter:
-            filters_to_merge.append(query_filter)
+        # Quantized groups are searched with approximate kNN
+        if vector_index in QUANTIZED_INDEX_TYPES:
+            main_query = self.build_knn_query(query_embedding, top_k, merged_filter_clauses, min_similarity, vector_index)
+            body = {"query": main_query, "size": top_k}
+            if not by_relevance:
+                body.update({"sort": [{"metadata.updated_at": {"order": "desc"}}], "track_scores": True})
+            return body
 
-        merged_filter_clauses = self.merge_filters(*filters_to_merge)
-        
         # Construct the main query using function_score
         main_query = {
             "function_score": {
@@ -160,32 +401,155 @@ class RagflowVectorStore:
                     {
                         "script_score": {
                             "script": {
-                                "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
+                                "source": f"cosineSimilarity(params.query_vector, 'embedding') + {COSINE_SCORE_OFFSET}",
                                 "params": {"query_vector": query_embedding}
                             }
                         }
                     }
                 ],
-                "boost_mode": "multiply"
+                # The filter-only bool scores 0, so the script score must replace it rather than multiply it
+                "boost_mode": "replace"
             }
         }
-        
-
-        # Always sort by updated_at descending to get the latest node first
-        search_kwargs = {
-            "index": collection_name, # Use collection_name as the index
-            "query": main_query,
-            "size": top_k,
-            "sort": [{"metadata.updated_at": {"order": "desc"}}],
-            "track_scores": True
+
+        if by_relevance:
+            body = {"query": main_query, "size": top_k}
+        else:
+            # Otherwise sort by updated_at descending to get the latest node first
+            body = {
+                "query": main_query,
+                "size": top_k,
+                "sort": [{"metadata.updated_at": {"order": "desc"}}],
+                "track_scores": True
+            }
+
+        # Drop weak matches in Elasticsearch rather than shipping them back to be discarded
+        if min_similarity is not None:
+            body["min_score"] = min_similarity + COSINE_SCORE_OFFSET
+
+        return body
+
+    def build_lexical_body(self, query_text, top_k=10, query_filter=None) -> Dict[str, Any]:
+        # BM25 match on the node text, under the same filters as the vector leg
+        merged_filter_clauses = self.merge_filters(query_filter)
+
+        return {
+            "query": {
+                "bool": {
+                    "must": [{"match": {"text": {"query": query_text}}}],
+                    "filter": merged_filter_clauses
+                }
+            },
+            "size": top_k
         }
-        
-        result = self.es.search(**search_kwargs)
-        return result["hits"]['hits']
 
-    async def asearch(self, collection_name, query_embedding, top_k=10, query_filter=None, sort=None):
+    @classmethod
+    def fuse(cls, vector_hits, lexical_hits, top_k, hybrid: HybridSearch) -> List[Dict[str, Any]]:
+        """
+        Fuse the two legs of a hybrid search. Fused scores replace _score.
+
+        rrf: sum of weight / (rrf_k + rank) over the legs a hit appears in
+        weighted: weighted sum of the cosine similarity ([0, 1]) & the BM25 score scaled by the leg's best
+
+        """
+        weights = (hybrid.vector_weight, 1.0 - hybrid.vector_weight)
+        scores: Dict[str, float] = {}
+        hits: Dict[str, Dict[str, Any]] = {}
+
+        if hybrid.fusion == "rrf":
+            for weight, leg in zip(weights, (vector_hits, lexical_hits)):
+                for rank, hit in enumerate(leg, start=1):
+                    scores[hit["_id"]] = scores.get(hit["_id"], 0.0) + weight / (hybrid.rrf_k + rank)
+                    hits.setdefault(hit["_id"], hit)
+        else:
+            # The vector leg scores cosine + COSINE_SCORE_OFFSET
+            best_lexical = max((hit.get("_score") or 0.0 for hit in lexical_hits), default=0.0) or 1.0
+            normalizers = (
+                lambda score: min(max(score - COSINE_SCORE_OFFSET, 0.0), 1.0),
+                lambda score: score / best_lexical
+            )
+
+            for weight, normalize, leg in zip(weights, normalizers, (vector_hits, lexical_hits)):
+                for hit in leg:
+                    scores[hit["_id"]] = scores.get(hit["_id"], 0.0) + weight * normalize(hit.get("_score") or 0.0)
+                    hits.setdefault(hit["_id"], hit)
+
+        ranked = sorted(scores, key=lambda doc_id: -scores[doc_id])[:top_k]
+        return [{**hits[doc_id], "_score": scores[doc_id]} for doc_id in ranked]
+
+    def search(self, collection_name, query_embedding, top_k=10, query_filter=None, sort=None, min_similarity=None, routing=None):
+        vector_index = self.vector_index(collection_name)
+        query_embedding = self.fit_embedding(collection_name, query_embedding)
+        search_kwargs = self.build_search_body(query_embedding, top_k, query_filter, min_similarity=min_similarity, vector_index=vector_index)
+        result = self.es.search(index=collection_name, **search_kwargs, **self._routed(routing))  # Use collection_name as the index
+        hits = result["hits"]['hits']
+        return self.knn_hits(hits) if vector_index in QUANTIZED_INDEX_TYPES else hits
+
+    def msearch(self, collection_name, query_embeddings, top_ks, query_filters=None, hybrids=None, by_relevance=False, min_similarities=None, routings=None) -> List[List[Dict[str, Any]]]:
+        # Run several searches in ONE round-trip, returning the hits of each in order.
+        # collection_name is one index for all searches, or a list with one index per search.
+        # A hybrid search contributes two bodies (vector & BM25), fused back into one result.
+        query_filters = query_filters or [None] * len(query_embeddings)
+        hybrids = hybrids or [None] * len(query_embeddings)
+        min_similarities = min_similarities or [None] * len(query_embeddings)
+        routings = routings or [None] * len(query_embeddings)
+        indices = collection_name if isinstance(collection_name, list) else [collection_name] * len(query_embeddings)
+        searches = []
+        knn_legs = []  # Per body: whether its scores are kNN scores
+        for index, query_embedding, top_k, query_filter, hybrid, min_similarity, routing in zip(
+                indices, query_embeddings, top_ks, query_filters, hybrids, min_similarities, routings
+        ):
+            header = {"index": index, **self._routed(routing)}
+            vector_index = self.vector_index(index)
+            query_embedding = self.fit_embedding(index, query_embedding)
+            knn_legs.append(vector_index in QUANTIZED_INDEX_TYPES)
+
+            if hybrid is None:
+                searches.append(header)
+                searches.append(self.build_search_body(query_embedding, top_k, query_filter, by_relevance, min_similarity, vector_index))
+                continue
+
+            # The similarity threshold applies to the vector leg; the BM25 leg has no comparable scale
+            searches.append(header)
+            searches.append(self.build_search_body(query_embedding, top_k, query_filter, True, min_similarity, vector_index))
+            searches.append(header)
+            searches.append(self.build_lexical_body(hybrid.query_text, top_k, query_filter))
+            knn_legs.append(False)
+
+        if not searches:
+            return []
+
+        result = self.es.msearch(searches=searches)
+
+        responses = []
+        for response, knn in zip(result["responses"], knn_legs):
+            if "error" in response:
+                raise RuntimeError(f"Elasticsearch multi-search query failed: {response['error']}")
+            responses.append(self.knn_hits(response["hits"]["hits"]) if knn else response["hits"]["hits"])
+
+        hits = []
+        responses = iter(responses)
+        for top_k, hybrid in zip(top_ks, hybrids):
+            if hybrid is None:
+                hits.append(next(responses))
+            else:
+                hits.append(self.fuse(next(responses), next(responses), top_k, hybrid))
+        return hits
+
+    def hybrid_search(self, collection_name, query_embedding, hybrid: HybridSearch, top_k=10, query_filter=None, min_similarity=None, routing=None) -> List[Dict[str, Any]]:
+        return self.msearch(collection_name, [query_embedding], [top_k], [query_filter], [hybrid], min_similarities=[min_similarity], routings=[routing])[0]
+
+    async def ahybrid_search(self, collection_name, query_embedding, hybrid: HybridSearch, top_k=10, query_filter=None, min_similarity=None, routing=None) -> List[Dict[str, Any]]:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.hybrid_search, collection_name, query_embedding, hybrid, top_k, query_filter, min_similarity, routing)
+
+    async def amsearch(self, collection_name, query_embeddings, top_ks, query_filters=None, hybrids=None, by_relevance=False, min_similarities=None, routings=None) -> List[List[Dict[str, Any]]]:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.msearch, collection_name, query_embeddings, top_ks, query_filters, hybrids, by_relevance, min_similarities, routings)
+
+    async def asearch(self, collection_name, query_embedding, top_k=10, query_filter=None, sort=None, min_similarity=None, routing=None):
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.search, collection_name, query_embedding, top_k, query_filter, sort)
+        return await loop.run_in_executor(None, self.search, collection_name, query_embedding, top_k, query_filter, sort, min_similarity, routing)
 
     def add_metadata(self, doc: dict, file_name=None, created_at=None, group_id=None):
         # Add file/group metadata
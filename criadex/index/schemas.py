@@ -22,7 +22,7 @@ import time
 import typing
 from abc import abstractmethod
 from dataclasses import dataclass, field
-from typing import List, Any, Optional, Sequence, TypeVar, Generic, Awaitable
+from typing import List, Any, Optional, Sequence, TypeVar, Generic, Awaitable, Literal
 
 
 from pydantic import BaseModel, Field
@@ -257,14 +257,20 @@ class SearchConfig(BaseModel):
 
     # Vector DB
     top_k: int = Field(default=1, ge=1, le=1000)
-    min_k: float = Field(default=0.5, ge=0.0, le=1.0)
+    min_k: Optional[float] = Field(default=None, ge=0.0, le=1.0)  # Min. cosine similarity, applied by Elasticsearch (None: no threshold)
+
+    # Hybrid retrieval: "hybrid" also runs a BM25 match on the text & fuses it with the vector results
+    search_mode: Literal["vector", "hybrid"] = "vector"
+    fusion: Literal["rrf", "weighted"] = "rrf"
+    vector_weight: float = Field(default=0.5, ge=0.0, le=1.0)  # BM25 gets 1 - vector_weight
+    rrf_k: int = Field(default=60, ge=1)
 
     # Reranking
     top_n: int = Field(default=1, ge=1)
     min_n: float = Field(default=0.5, ge=0.0, le=1.0)
 
     rerank_enabled: bool = True
-    # Generic filter object applied at the application layer for Elasticsearch
+    # Criadex filter DSL (must / should / must_not over metadata keys), compiled to an Elasticsearch bool query
     search_filter: Optional[dict] = None
     extra_groups: Optional[List[str]] = None
 
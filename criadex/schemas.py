@@ -14,17 +14,23 @@ You should have received a copy of the GNU General Public License along with Cri
 
 """
 from enum import Enum
-from typing import Optional, Type, Literal, cast, TypeVar, Callable, Awaitable, List
+from typing import Optional, Type, Literal, cast, TypeVar, Callable, Awaitable, List, ClassVar, Dict
 import time
 import logging
 import traceback
 from functools import wraps
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_serializer
 
 
 IndexTypeKeys: Type = Literal["DOCUMENT", "QUESTION"]
 
+# How a group's embeddings are indexed: float HNSW, or HNSW over int8 / int4 / binary (BBQ) quantized vectors
+VectorIndexType: Type = Literal["hnsw", "int8_hnsw", "int4_hnsw", "bbq_hnsw"]
+
+# When an Elasticsearch write becomes searchable: at the next scheduled refresh, by waiting for it, or by forcing one
+RefreshPolicy: Type = Literal["false", "wait_for", "true"]
+
 
 class IndexType(int, Enum):
     """
@@ -59,15 +65,30 @@ class APIResponse(BaseModel):
     code: str = "SUCCESS"
     error: Optional[str] = Field(default=None, exclude=True)
 
+    """Fallback messages for responses sent without one"""
+    DEFAULT_MESSAGES: ClassVar[Dict[int, str]] = {
+        200: 'Request completed successfully!',
+        409: 'The requested resource already exists!',
+        400: 'You, the client, made a mistake...',
+        500: 'An internal error occurred! :(',
+        404: 'Womp womp. Not found!'
+    }
+
+    @field_serializer("message")
+    def serialize_message(self, message: Optional[str]) -> Optional[str]:
+        """
+        Default the message on EVERY serialization path (model_dump, model_dump_json & FastAPI's response serializer)
+
+        :param message: The message
+        :return: The message, or the default for the status
+
+        """
+
+        return message or self.DEFAULT_MESSAGES.get(self.status)
+
     def dict(self, *args, **kwargs):
 
-        self.message = self.message or {
-            200: 'Request completed successfully!',
-            409: 'The requested resource already exists!',
-            400: 'You, the client, made a mistake...',
-            500: 'An internal error occurred! :(',
-            404: 'Womp womp. Not found!'
-        }.get(self.status)
+        self.message = self.message or self.DEFAULT_MESSAGES.get(self.status)
 
         data: dict = super().dict(*args, **kwargs)
 
@@ -134,6 +155,8 @@ class PartialGroupConfig(BaseModel):
     llm_model_id: int
     embedding_model_id: int
     rerank_model_id: int
+    vector_index: Optional[VectorIndexType] = None  # Elasticsearch's default if unset
+    embedding_dims: Optional[int] = Field(default=None, ge=1)  # Matryoshka-truncate the model's embeddings to this size
 
 
 class GroupConfig(PartialGroupConfig):
@@ -227,6 +250,27 @@ class DocumentNotFoundError(RuntimeError):
     """
 
 
+class ReindexRunningError(RuntimeError):
+    """
+    Thrown if a re-embedding job is already running for the index group
+
+    """
+
+
+class DeletionRunningError(RuntimeError):
+    """
+    Thrown if a file is written while its deletion is still running
+
+    """
+
+
+class EmbeddingDimensionsError(RuntimeError):
+    """
+    Thrown if an embedding does not fit the dimensions of the group's index
+
+    """
+
+
 class EmptyPromptError(RuntimeError):
     """
     Thrown if the prompt is empty.
@@ -24,7 +24,7 @@ async def test_chat_agent_execute_positive(chat_agent):
 
     # Assertions
     chat_agent.query_model.assert_called_once_with(history, "test_chat_id", "test_api_key")
-    chat_agent.usage.assert_called_once_with(history, 3, usage_label="ChatAgent")
+    chat_agent.usage.assert_called_once_with(history, 3, usage_label="ChatAgent", chat_id="test_chat_id")
 
     assert isinstance(response, ChatAgentResponse)
     assert response.chat_response == {"content": "Mocked response"}
@@ -59,7 +59,7 @@ async def test_chat_agent_execute_empty_history(chat_agent):
     response = await chat_agent.execute(history, "test_chat_id", "test_api_key")
 
     chat_agent.query_model.assert_called_once_with(history, "test_chat_id", "test_api_key")
-    chat_agent.usage.assert_called_once_with(history, 3, usage_label="ChatAgent")
+    chat_agent.usage.assert_called_once_with(history, 3, usage_label="ChatAgent", chat_id="test_chat_id")
 
     assert isinstance(response, ChatAgentResponse)
     assert response.chat_response == {"content": "Empty history response"}
@@ -133,3 +133,67 @@ async def test_intents_agent_execute_usage_calculation(intents_agent, sample_int
     assert response.usage["completion_tokens"] == expected_completion_tokens
     assert response.usage["total_tokens"] == expected_prompt_tokens + expected_completion_tokens
     assert response.usage["label"] == "IntentsAgent"
+
+
+class KeywordEmbedder:
+    """Embeds text as keyword counts, so similarity is predictable"""
+
+    KEYWORDS = ["hello", "question", "goodbye"]
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_many(self, texts):
+        self.calls.append(texts)
+        return [[text.lower().count(keyword) for keyword in self.KEYWORDS] for text in texts]
+
+
+@pytest.fixture
+def embedding_ranker(monkeypatch):
+    from criadex.agent.azure import intents
+    from criadex.agent.azure.intents import IntentEmbeddingRanker
+
+    monkeypatch.setattr(intents, "count_tokens", lambda text: len(text.split()))
+    return IntentEmbeddingRanker(KeywordEmbedder())
+
+
+@pytest.mark.asyncio
+async def test_intents_agent_embedding_ranking(embedding_ranker, sample_intents):
+    agent = IntentsAgent(llm_model_id=1, ranker=embedding_ranker)
+    agent.get_intents = MagicMock()
+
+    response = await agent.execute(sample_intents, "goodbye and goodbye again")
+
+    # Ranked by cosine without an LLM call
+    agent.get_intents.assert_not_called()
+    assert [intent.name for intent in response.ranked_intents] == ["Farewell", "Greeting", "Question"]
+    assert response.ranked_intents[0].score == pytest.approx(1.0)
+    assert response.usage["prompt_tokens"] == 4
+
+
+@pytest.mark.asyncio
+async def test_intents_agent_embedding_cache(embedding_ranker, sample_intents):
+    agent = IntentsAgent(llm_model_id=1, ranker=embedding_ranker)
+
+    await agent.execute(sample_intents, "hello")
+    await agent.execute(sample_intents, "a question")
+
+    # Intents embedded once, then only the prompts
+    assert [len(call) for call in embedding_ranker._embedder.calls] == [3, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_intents_agent_embedding_ambiguous_llm_fallback(embedding_ranker, intents_agent, sample_intents):
+    intents_agent.ranker = embedding_ranker
+    intents_agent.llm_fallback = True
+
+    # "hello question" is equally close to two intents, so the LLM is consulted
+    response = await intents_agent.execute(sample_intents, "hello question")
+    intents_agent.get_intents.assert_called_once()
+
+    # The (stubbed) LLM ranks nothing, so the embedding ranking is kept
+    assert {intent.name for intent in response.ranked_intents[:2]} == {"Greeting", "Question"}
+
+    # A clear winner skips the LLM
+    await intents_agent.execute(sample_intents, "hello hello")
+    intents_agent.get_intents.assert_called_once()
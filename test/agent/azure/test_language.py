@@ -12,3 +12,19 @@ def test_language_agent_detect():
     # Then
     assert response.language == "EN"
     assert response.confidence > 0.5
+
+
+def test_language_agent_detector_shared():
+    # Detectors are built once per process & shared by every agent
+    assert LanguageAgent().detector is LanguageAgent().detector
+
+
+@pytest.mark.asyncio
+async def test_language_agent_detect_many():
+    agent = LanguageAgent()
+    texts = ["This is a test sentence in English.", "Ceci est une phrase de test en français.", "This is a test sentence in English."]
+
+    responses = await agent.detect_many(texts)
+
+    assert [response.language for response in responses] == ["EN", "FR", "EN"]
+    assert responses[0] == agent.detect(texts[0])
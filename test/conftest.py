@@ -7,7 +7,7 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from unittest.mock import MagicMock
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, NotFoundError
 from _pytest.monkeypatch import MonkeyPatch
 
 import json
@@ -52,13 +52,23 @@ def pytest_configure(config):
     mock_es.indices = MagicMock()
     mock_es.indices.exists.return_value = True
     mock_es.indices.create.return_value = {'acknowledged': True}
+    mock_es.indices.get_alias.return_value = {}
     def mock_index(index, document, id, **kwargs):
         if index not in mock_es._data:
             mock_es._data[index] = {}
         mock_es._data[index][id] = document
         return {'result': 'created'}
     mock_es.index.side_effect = mock_index
+    def mock_delete_index(index, **kwargs):
+        mock_es._data.pop(index, None)
+        return {'acknowledged': True}
+    mock_es.indices.delete.side_effect = mock_delete_index
     mock_es.delete.return_value = {'result': 'deleted'}
+    def mock_get(index, id, **kwargs):
+        if id not in mock_es._data.get(index, {}):
+            raise NotFoundError("not found", MagicMock(status=404), {})
+        return {'_source': mock_es._data[index][id], '_id': id, '_seq_no': 0, '_primary_term': 1}
+    mock_es.get.side_effect = mock_get
     mock_es.delete_by_query.return_value = {'deleted': 1}
     mock_es._data = {}
 
@@ -112,6 +122,15 @@ def pytest_configure(config):
 
     mock_es.search = MagicMock(side_effect=mock_search_impl)
 
+    def mock_msearch_impl(searches, **kwargs):
+        # Searches alternate between header & body lines
+        return {'responses': [
+            mock_search_impl(index=header.get('index'), **body)
+            for header, body in zip(searches[::2], searches[1::2])
+        ]}
+
+    mock_es.msearch = MagicMock(side_effect=mock_msearch_impl)
+
     config._mock_elasticsearch_client = mock_es
     config._monkeypatch_session = MonkeyPatch()
     config._monkeypatch_session.setattr(
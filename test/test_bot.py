@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from criadex.bot.bot import Bot
-from criadex.index.schemas import IndexResponse, TextNodeWithScore
+from criadex.index.schemas import IndexResponse, SearchConfig, TextNodeWithScore
+from criadex.index.ragflow_objects.layout import GroupIndexInfo
+from criadex.index.ragflow_objects.vector_store import HybridSearch, RagflowVectorStore
 
 @pytest.mark.asyncio
 async def test_bot_search():
@@ -50,4 +52,122 @@ async def test_bot_search():
     assert len(response.nodes) == 1
     assert isinstance(response.nodes[0], TextNodeWithScore)
     assert response.nodes[0].node.text == 'This is a test node.'
-    assert response.nodes[0].node.metadata == {'file_name': 'test.txt'}
\ No newline at end of file
+    assert response.nodes[0].node.metadata == {'file_name': 'test.txt'}
+
+@pytest.mark.asyncio
+async def test_bot_search_many():
+    """
+    Test that the search_many method embeds in one batch & returns one response per query.
+    """
+    mock_vector_store = MagicMock()
+    mock_embedder = MagicMock()
+
+    mock_embedder.embed_many.return_value = [[0.1] * 768, [0.2] * 768]
+    mock_vector_store.amsearch = AsyncMock(
+        return_value=[
+            [{'_source': {'text': 'First node.', 'metadata': {}}, '_score': 1.5}],
+            []
+        ]
+    )
+
+    bot = Bot(vector_store=mock_vector_store, embedder=mock_embedder)
+    responses = await bot.search_many("test_group", ["first", "second"], top_ks=[1, 5])
+
+    mock_embedder.embed_many.assert_called_once_with(["first", "second"])
+    mock_vector_store.amsearch.assert_called_once_with(
+        collection_name="test_group",
+        query_embeddings=[[0.1] * 768, [0.2] * 768],
+        top_ks=[1, 5],
+        query_filters=None
+    )
+
+    assert len(responses) == 2
+    assert responses[0].nodes[0].node.text == 'First node.'
+    assert responses[0].nodes[0].score == 1.5
+    assert responses[1].nodes == []
+
+@pytest.mark.asyncio
+async def test_bot_search_hybrid():
+    """
+    Test that a hybrid search goes through the fused BM25 + vector search instead of the vector-only one.
+    """
+    mock_vector_store = MagicMock()
+    mock_embedder = MagicMock()
+
+    mock_embedder.embed.return_value = [0.1] * 768
+    mock_vector_store.ahybrid_search = AsyncMock(
+        return_value=[{'_id': '1', '_source': {'text': 'EECS 2030 syllabus', 'metadata': {}}, '_score': 0.03}]
+    )
+
+    hybrid = HybridSearch(query_text="EECS 2030")
+    bot = Bot(vector_store=mock_vector_store, embedder=mock_embedder)
+    response = await bot.search("test_group", "EECS 2030", top_k=3, hybrid=hybrid)
+
+    mock_vector_store.ahybrid_search.assert_called_once_with(
+        collection_name="test_group",
+        query_embedding=[0.1] * 768,
+        hybrid=hybrid,
+        top_k=3,
+        query_filter=None
+    )
+    mock_vector_store.asearch.assert_not_called()
+    assert response.nodes[0].node.text == 'EECS 2030 syllabus'
+
+@pytest.mark.asyncio
+async def test_bot_search_min_similarity():
+    """
+    Test that the similarity threshold is forwarded to the vector store.
+    """
+    mock_vector_store = MagicMock()
+    mock_embedder = MagicMock()
+
+    mock_embedder.embed.return_value = [0.1] * 768
+    mock_vector_store.asearch = AsyncMock(return_value=[])
+
+    bot = Bot(vector_store=mock_vector_store, embedder=mock_embedder)
+    await bot.search("test_group", "query", top_k=4, min_similarity=0.5)
+
+    assert mock_vector_store.asearch.call_args.kwargs["min_similarity"] == 0.5
+
+@pytest.mark.asyncio
+async def test_bot_search_routing():
+    """
+    Test that the group routing value is forwarded to the vector store, for single & multi-searches.
+    """
+    mock_vector_store = MagicMock()
+    mock_embedder = MagicMock()
+
+    mock_embedder.embed.return_value = [0.1] * 768
+    mock_embedder.embed_many.return_value = [[0.1] * 768, [0.2] * 768]
+    mock_vector_store.asearch = AsyncMock(return_value=[])
+    mock_vector_store.amsearch = AsyncMock(return_value=[[], []])
+
+    bot = Bot(vector_store=mock_vector_store, embedder=mock_embedder)
+    await bot.search("test_group", "query", routing="test_group")
+    await bot.search_many("test_group", ["first", "second"], top_ks=[1, 1], routing="test_group")
+
+    assert mock_vector_store.asearch.call_args.kwargs["routing"] == "test_group"
+    assert mock_vector_store.amsearch.call_args.kwargs["routings"] == ["test_group", "test_group"]
+
+@pytest.mark.asyncio
+async def test_bot_search_default_has_no_threshold():
+    """
+    Test that a search with the default config applies no similarity threshold, so low-similarity hits
+    (e.g. from placeholder embeddings) are still returned.
+    """
+    vector_store = RagflowVectorStore("localhost", 9200)
+    vector_store.es = MagicMock()
+    vector_store._index_info = {"test_group": GroupIndexInfo()}
+    vector_store.es.search.return_value = {"hits": {"hits": [
+        {'_id': 'a', '_score': 1.04, '_source': {'text': 'EECS 2030 syllabus', 'metadata': {}}}
+    ]}}
+
+    mock_embedder = MagicMock()
+    mock_embedder.embed.return_value = [0.1] * 768
+
+    config = SearchConfig(query="query")
+    bot = Bot(vector_store=vector_store, embedder=mock_embedder)
+    response = await bot.search("test_group", config.query, top_k=config.top_k, min_similarity=config.min_k)
+
+    assert "min_score" not in vector_store.es.search.call_args.kwargs
+    assert response.nodes[0].node.text == 'EECS 2030 syllabus'
@@ -0,0 +1,211 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from elasticsearch import ConflictError, NotFoundError
+
+from criadex.criadex import Criadex
+from criadex.index.ragflow_objects.deletion import DeletionJob, DeletionJobs
+from criadex.schemas import DeletionRunningError, ElasticsearchCredentials, MySQLCredentials
+
+
+def test_job_id():
+    """
+    Test that job IDs are stable per group or file, and differ between a group and its files.
+    """
+    assert DeletionJobs.job_id("g1") == DeletionJobs.job_id("g1")
+    assert DeletionJobs.job_id("g1", "a.pdf") != DeletionJobs.job_id("g1")
+    assert DeletionJobs.job_id("g1", "a.pdf") != DeletionJobs.job_id("g1", "b.pdf")
+
+
+def test_poll():
+    """
+    Test that a job is done only once all its tasks completed, and records their results.
+    """
+    es = MagicMock()
+    jobs = DeletionJobs(es)
+    job = DeletionJob(job_id="j", group_name="g1", tasks=["n:1", "n:2"])
+
+    es.tasks.get.side_effect = [{"completed": True}, {"completed": False}]
+    assert not jobs.poll(job)
+
+    es.tasks.get.side_effect = [
+        {"completed": True, "response": {"deleted": 3, "version_conflicts": 1, "failures": []}},
+        {"completed": True, "response": {"deleted": 2, "failures": []}},
+    ]
+    assert jobs.poll(job)
+    assert (job.deleted, job.version_conflicts, job.error) == (5, 1, None)
+
+
+def test_poll_lost_task():
+    """
+    Test that a task unknown to Elasticsearch fails the job.
+    """
+    es = MagicMock()
+    es.tasks.get.side_effect = NotFoundError("not found", MagicMock(status=404), {})
+    job = DeletionJob(job_id="j", group_name="g1", tasks=["n:1"])
+
+    assert DeletionJobs(es).poll(job)
+    assert job.error is not None
+
+
+def jobs_es() -> MagicMock:
+    """An Elasticsearch client that stores the jobs indexed through it, to be found (& claimed) by any worker"""
+    es = MagicMock()
+    saved, seq_nos = {}, {}
+
+    def index(index, id, document, op_type=None, if_seq_no=None, **kwargs):
+        if (op_type == "create" and id in saved) or (if_seq_no is not None and if_seq_no != seq_nos.get(id)):
+            raise ConflictError("conflict", MagicMock(status=409), {})
+        saved[id], seq_nos[id] = dict(document), seq_nos.get(id, -1) + 1
+
+    def get(index, id, **kwargs):
+        if id not in saved:
+            raise NotFoundError("not found", MagicMock(status=404), {})
+        return {"_source": dict(saved[id]), "_seq_no": seq_nos[id], "_primary_term": 1}
+
+    es.index.side_effect = index
+    es.get.side_effect = get
+    es.search.side_effect = lambda **kwargs: {"hits": {"hits": [{"_source": doc} for doc in saved.values()]}}
+    return es
+
+
+@pytest.fixture
+def criadex() -> Criadex:
+    criadex = Criadex(
+        MySQLCredentials(host="localhost", port=3306, username="root", database="criadex"),
+        ElasticsearchCredentials(host="localhost", port=9200)
+    )
+    criadex.mysql_api = MagicMock()
+    criadex.mysql_api.groups.exists = AsyncMock(return_value=True)
+    criadex.mysql_api.groups.retrieve = AsyncMock(return_value=MagicMock(id=7))
+    criadex.mysql_api.documents.exists = AsyncMock(return_value=True)
+    criadex.mysql_api.documents.retrieve = AsyncMock(return_value=SimpleNamespace(id=3, name="a.pdf"))
+    criadex.mysql_api.documents.list = AsyncMock(return_value=[SimpleNamespace(name="a.pdf"), SimpleNamespace(name="b.pdf")])
+    for table in (criadex.mysql_api.assets, criadex.mysql_api.documents, criadex.mysql_api.groups):
+        for method in ("delete", "delete_by_id", "delete_all", "delete_all_group_assets", "delete_all_document_assets"):
+            setattr(table, method, AsyncMock())
+
+    criadex.get_id = AsyncMock(return_value=7)
+    criadex.vector_store = MagicMock()
+    criadex.vector_store.routing.return_value = None
+    criadex.vector_store.asubmit_delete_by_query = AsyncMock(return_value="n:1")
+    criadex.deletion_jobs = DeletionJobs(jobs_es())
+    return criadex
+
+
+@pytest.mark.asyncio
+async def test_file_deletion_reaped(criadex, monkeypatch):
+    """
+    Test that a file deletion returns at once, hides the file, and that the reaper deletes its rows once the task completes.
+    """
+    monkeypatch.setattr("criadex.criadex.DELETION_POLL_INTERVAL", 0)
+    criadex.deletion_jobs.es.tasks.get.return_value = {"completed": False}
+
+    job = await criadex.submit_file_deletion("g1", "a.pdf")
+    assert job.status == "running" and job.tasks == ["n:1"]
+    assert (await criadex.submit_file_deletion("g1", "a.pdf")).job_id == job.job_id
+    assert job.document_id == 3
+    assert await criadex.list_files("g1") == ["b.pdf"]
+    criadex.mysql_api.documents.delete.assert_not_called()
+
+    criadex.deletion_jobs.es.tasks.get.return_value = {"completed": True, "response": {"deleted": 4, "failures": []}}
+    await criadex._reaper
+
+    assert job.status == "completed" and job.deleted == 4
+    criadex.mysql_api.assets.delete_all_document_assets.assert_awaited_once_with(document_id=3)
+    criadex.mysql_api.documents.delete_by_id.assert_awaited_once_with(document_id=3)
+    criadex.mysql_api.documents.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_file_deletion_seen_by_other_workers(criadex, monkeypatch):
+    """
+    Test that a file being deleted by one worker can't be uploaded or updated through another until it completes.
+    """
+    monkeypatch.setattr("criadex.criadex.DELETION_POLL_INTERVAL", 0)
+    criadex.deletion_jobs.es.tasks.get.return_value = {"completed": False}
+    await criadex.submit_file_deletion("g1", "a.pdf")
+
+    other = Criadex(criadex.mysql_credentials, criadex.elasticsearch_credentials)
+    other.mysql_api, other.get_id = criadex.mysql_api, criadex.get_id
+    other.deletion_jobs = DeletionJobs(criadex.deletion_jobs.es)
+
+    with pytest.raises(DeletionRunningError):
+        await other.insert_file("g1", "a.pdf", {}, {})
+
+    with pytest.raises(DeletionRunningError):
+        await other.update_file("g1", "a.pdf", {}, {})
+
+    assert await other.list_files("g1") == ["b.pdf"]
+
+    criadex.deletion_jobs.es.tasks.get.return_value = {"completed": True, "response": {"deleted": 1, "failures": []}}
+    await criadex._reaper
+    assert await other._running_deletion("g1", "a.pdf") is None
+
+
+@pytest.mark.asyncio
+async def test_group_deletion_without_tasks(criadex):
+    """
+    Test that a group whose index was dropped outright is deleted from MySQL within the request.
+    """
+    criadex.vector_store.adrop_collection = AsyncMock(return_value=MagicMock(tasks=[]))
+
+    job = await criadex.delete("g1")
+
+    assert job.status == "completed"
+    assert criadex._reaper is None
+    criadex.mysql_api.groups.delete.assert_awaited_once_with(name="g1")
+
+
+@pytest.mark.asyncio
+async def test_resumed_deletion_finished_once(criadex, monkeypatch):
+    """
+    Test that when every worker resumes the same running job, only the one that claims it deletes the MySQL rows.
+    """
+    monkeypatch.setattr("criadex.criadex.DELETION_POLL_INTERVAL", 0)
+    criadex.deletion_jobs.es.tasks.get.return_value = {"completed": False}
+    job = await criadex.submit_file_deletion("g1", "a.pdf")
+
+    other = Criadex(criadex.mysql_credentials, criadex.elasticsearch_credentials)
+    other.mysql_api = criadex.mysql_api
+    other.deletion_jobs = DeletionJobs(criadex.deletion_jobs.es)
+    for resumed in await other.deletion_jobs.arunning():
+        other._track_deletion(resumed)
+
+    criadex.deletion_jobs.es.tasks.get.return_value = {"completed": True, "response": {"deleted": 1, "failures": []}}
+    await criadex._reaper
+    await other._reaper
+
+    assert (await criadex.deletion_jobs.aload(job.job_id)).status == "completed"
+    criadex.mysql_api.documents.delete_by_id.assert_awaited_once_with(document_id=3)
+
+
+def test_claim_expires():
+    """
+    Test that a job's claim is refused while another worker holds it, but can be taken over once it expires.
+    """
+    jobs = DeletionJobs(jobs_es())
+    job = jobs.create("g1", tasks=["n:1"])
+    assert jobs.claim(job)
+
+    again = DeletionJob(**job.model_dump())
+    assert not jobs.claim(again) and again.status == "running"
+
+    jobs.es.index(index="criadex-deletion-jobs", id=job.job_id, document={**job.model_dump(), "claimed_at": 0.0}, if_seq_no=1)
+    assert jobs.claim(again)
+
+
+@pytest.mark.asyncio
+async def test_group_deletion_spares_recreated_group(criadex):
+    """
+    Test that finishing a group deletion again doesn't delete a group re-created under the same name since.
+    """
+    criadex.mysql_api.groups.retrieve = AsyncMock(return_value=MagicMock(id=8))
+    job = DeletionJob(job_id="j", group_name="g1", group_id=7)
+
+    await criadex._finish_deletion(job)
+
+    assert job.status == "completed"
+    criadex.mysql_api.groups.delete.assert_not_called()
+    criadex.mysql_api.documents.delete_all.assert_not_called()
@@ -0,0 +1,125 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from elasticsearch import NotFoundError
+
+from criadex.bot.bot import Bot
+from criadex.criadex import Criadex
+from criadex.database.tables.models.azure import AzureModelsModel
+from criadex.index.ragflow_objects.deletion import DeletionJobs
+from criadex.index.ragflow_objects.embedder import DEFAULT_EMBEDDING_DIMS, RagflowEmbedder, fit_embedding, truncate_embedding
+from criadex.index.ragflow_objects.vector_store import RagflowVectorStore
+from criadex.index.schemas import SearchConfig
+from criadex.schemas import ElasticsearchCredentials, EmbeddingDimensionsError, GroupConfig, MySQLCredentials
+
+
+def test_truncate_embedding_renormalizes():
+    """
+    Test that Matryoshka truncation keeps the leading dimensions at unit length.
+    """
+    assert truncate_embedding([3.0, 4.0, 12.0], 2) == pytest.approx([0.6, 0.8])
+    assert truncate_embedding([0.0, 0.0, 1.0], 2) == [0.0, 0.0]
+
+
+def test_fit_embedding():
+    """
+    Test that embeddings must match the index's dimensions, unless they can be truncated to them.
+    """
+    assert fit_embedding([1.0, 0.0], None) == [1.0, 0.0]
+    assert fit_embedding([1.0, 0.0], 2) == [1.0, 0.0]
+    assert fit_embedding([1.0, 0.0, 0.0], 2, truncate=True) == pytest.approx([1.0, 0.0])
+
+    with pytest.raises(EmbeddingDimensionsError):
+        fit_embedding([1.0, 0.0, 0.0], 2)
+
+    with pytest.raises(EmbeddingDimensionsError):
+        fit_embedding([1.0], 2, truncate=True)
+
+
+def test_azure_model_dims():
+    """
+    Test that a model's configured dimensions win over the model's native ones.
+    """
+    assert AzureModelsModel(api_model="text-embedding-3-large").dims == 3072
+    assert AzureModelsModel(api_model="text-embedding-3-large", embedding_dims=1024).dims == 1024
+    assert AzureModelsModel(api_model="gpt-4o").dims is None
+
+
+class IndexingElasticsearch:
+    """Just enough of Elasticsearch to create a group's index, then write & read it back with its mapping"""
+
+    def __init__(self):
+        self.indices = MagicMock()
+        self.indices.exists.return_value = False
+        self.indices.create.side_effect = self._create
+        self.indices.get_mapping.side_effect = lambda index: self._mappings
+        self.docs = []
+        self._mappings = {}
+
+    def _create(self, index, body):
+        dims = body.get("mappings", {}).get("properties", {}).get("embedding", {}).get("dims", DEFAULT_EMBEDDING_DIMS)
+        self._mappings = {index: {"mappings": {"properties": {"embedding": {"type": "dense_vector", "dims": dims}}}}}
+
+    def index(self, index, id, document, **kwargs):
+        dims = self._mappings[next(iter(self._mappings))]["mappings"]["properties"]["embedding"]["dims"]
+        assert len(document["embedding"]) == dims
+        self.docs.append({"_id": id, "_score": 1.0, "_source": document})
+
+    def search(self, index, **kwargs):
+        return {"hits": {"hits": self.docs}}
+
+    def get(self, index, id):
+        raise NotFoundError("not found", MagicMock(status=404), {})
+
+
+@pytest.mark.asyncio
+async def test_group_on_embedding_model_inserts_and_searches():
+    """
+    Test that a group on an embedding model gets an index its embedder's vectors fit, so uploads & searches succeed.
+    """
+    criadex = Criadex(
+        MySQLCredentials(host="localhost", port=3306, username="root", database="criadex"),
+        ElasticsearchCredentials(host="localhost", port=9200)
+    )
+    criadex.mysql_api = MagicMock()
+    criadex.mysql_api.groups.exists = AsyncMock(side_effect=[False, True])
+    criadex.mysql_api.groups.insert = AsyncMock()
+    criadex.mysql_api.documents.exists = AsyncMock(return_value=False)
+    criadex.mysql_api.documents.insert = AsyncMock()
+    criadex.mysql_api.azure_models.retrieve = AsyncMock(return_value=AzureModelsModel(api_model="text-embedding-ada-002"))
+    criadex.get_id = AsyncMock(return_value=1)
+    criadex.deletion_jobs = DeletionJobs(MagicMock(search=MagicMock(return_value={"hits": {"hits": []}})))
+    criadex.cache = MagicMock(get=MagicMock(return_value=None))
+
+    criadex.vector_store = RagflowVectorStore("localhost", 9200)
+    criadex.vector_store.es = IndexingElasticsearch()
+    criadex.embedder = RagflowEmbedder()
+    criadex.bot = Bot(criadex.vector_store, criadex.embedder)
+
+    await criadex.create(GroupConfig(name="g1", type="DOCUMENT", llm_model_id=1, embedding_model_id=2, rerank_model_id=3))
+    await criadex.insert_file("g1", "a.pdf", {"nodes": [{"text": "hello world", "metadata": {}, "type": "NarrativeText"}]}, {})
+    response = await criadex.search("g1", SearchConfig(query="hello"))
+
+    assert [node.node.text for node in response.nodes] == ["hello world"]
+
+
+@pytest.mark.asyncio
+async def test_group_truncation_beyond_embedder_dims_rejected():
+    """
+    Test that a group can't truncate embeddings to more dimensions than its embedder produces.
+    """
+    criadex = Criadex(
+        MySQLCredentials(host="localhost", port=3306, username="root", database="criadex"),
+        ElasticsearchCredentials(host="localhost", port=9200)
+    )
+    criadex.mysql_api = MagicMock()
+    criadex.mysql_api.groups.exists = AsyncMock(return_value=False)
+    criadex.mysql_api.groups.insert = AsyncMock()
+    criadex.embedder = RagflowEmbedder(dims=256)
+
+    with pytest.raises(EmbeddingDimensionsError):
+        await criadex.create(GroupConfig(
+            name="g1", type="DOCUMENT", llm_model_id=1, embedding_model_id=2, rerank_model_id=3, embedding_dims=512
+        ))
+
+    criadex.mysql_api.groups.insert.assert_not_called()
@@ -0,0 +1,148 @@
+import json
+
+import pytest
+
+from criadex.index.ragflow_objects.filters import compile_filter, combine_filters, InvalidSearchFilterError
+from criadex.index.ragflow_objects.vector_store import RagflowVectorStore
+from criadex.index.schemas import SearchConfig
+from criadex.group import Group
+
+
+def test_compile_must_should_must_not():
+    """
+    Test that must, should & must_not keep their meaning: AND, OR (at least one), and NOT.
+    """
+    compiled = compile_filter({
+        "must": {"file_name": "a.pdf"},
+        "should": [{"group_name": "x"}, {"group_name": "y"}],
+        "must_not": [{"status": "draft"}],
+    })
+
+    assert compiled == {"bool": {
+        "filter": [{"term": {"metadata.file_name": "a.pdf"}}],
+        "should": [{"term": {"metadata.group_name": "x"}}, {"term": {"metadata.group_name": "y"}}],
+        "minimum_should_match": 1,
+        "must_not": [{"term": {"metadata.status.keyword": "draft"}}],
+    }}
+
+
+def test_compile_terms_range_and_explicit_clauses():
+    """
+    Test lists as terms, dicts as ranges, explicit clauses & keys that already carry the metadata prefix.
+    """
+    compiled = compile_filter({"must": [
+        {"course": ["EECS 2030", "EECS 1015"]},
+        {"updated_at": {"gte": "2024-01-01"}},
+        {"term": {"metadata.update_id.keyword": "abc"}},
+        {"exists": {"field": "answer"}},
+    ]})
+
+    assert compiled["bool"]["filter"] == sorted([
+        {"terms": {"metadata.course.keyword": ["EECS 1015", "EECS 2030"]}},
+        {"range": {"metadata.updated_at": {"gte": "2024-01-01"}}},
+        {"term": {"metadata.update_id.keyword": "abc"}},
+        {"exists": {"field": "metadata.answer"}},
+    ], key=lambda clause: json.dumps(clause, sort_keys=True))
+
+
+def test_compile_exact_string_matches_use_keyword_field():
+    """
+    Test that exact string matches on dynamic metadata use the keyword sub-field, while keyword-mapped fields,
+    non-string values, ranges & exists use the field itself.
+    """
+    compiled = compile_filter({"must": [
+        {"course": "EECS 2030"},
+        {"file_name": "a.pdf"},
+        {"year": 2024},
+        {"updated_at": {"gte": 1}},
+    ]})
+
+    assert compiled["bool"]["filter"] == sorted([
+        {"term": {"metadata.course.keyword": "EECS 2030"}},
+        {"term": {"metadata.file_name": "a.pdf"}},
+        {"term": {"metadata.year": 2024}},
+        {"range": {"metadata.updated_at": {"gte": 1}}},
+    ], key=lambda clause: json.dumps(clause, sort_keys=True))
+
+
+def test_compile_is_canonical():
+    """
+    Test that equal filters written in a different order compile to identical JSON.
+    """
+    first = compile_filter({"must": {"a": 1, "b": [2, 3]}, "should": [{"c": 1}, {"d": 2}]})
+    second = compile_filter({"should": [{"d": 2}, {"c": 1}], "must": [{"b": [3, 2]}, {"a": 1}, {"a": 1}]})
+
+    assert json.dumps(first) == json.dumps(second)
+
+
+def test_compile_bare_condition_and_empty():
+    """
+    Test that a bare condition means must, and empty filters compile to nothing.
+    """
+    assert compile_filter({"file_name": "a"}) == {"bool": {"filter": [{"term": {"metadata.file_name": "a"}}]}}
+    assert compile_filter(None) is None
+    assert compile_filter({"must": []}) is None
+
+
+def test_compile_nested():
+    """
+    Test that nested filters compile to nested bool queries.
+    """
+    compiled = compile_filter({"must": [{"should": [{"a": 1}, {"b": 2}]}, {"c": 3}]})
+
+    assert {"bool": {
+        "should": [{"term": {"metadata.a": 1}}, {"term": {"metadata.b": 2}}],
+        "minimum_should_match": 1
+    }} in compiled["bool"]["filter"]
+
+
+@pytest.mark.parametrize("search_filter", [
+    {"must": "nope"},
+    {"must": [{"a": {"near": 1}}]},
+    {"must": [{"a": []}]},
+    {"must": [{"term": {"a": 1, "b": 2}}]},
+    {"must": [1]},
+])
+def test_compile_rejects_invalid(search_filter):
+    """
+    Test that malformed filters raise instead of silently matching everything.
+    """
+    with pytest.raises(InvalidSearchFilterError):
+        compile_filter(search_filter)
+
+
+def test_search_body_uses_compiled_filter():
+    """
+    Test that the vector store places the compiled filter in filter context, keeping should & must_not.
+    """
+    store = RagflowVectorStore("localhost", 9200)
+    body = store.build_search_body([0.0], 5, {"should": [{"a": 1}], "must_not": {"b": 2}})
+
+    assert body["query"]["function_score"]["query"]["bool"]["filter"] == [{"bool": {
+        "should": [{"term": {"metadata.a": 1}}],
+        "minimum_should_match": 1,
+        "must_not": [{"term": {"metadata.b": 2}}],
+    }}]
+
+    plain = store.build_search_body([0.0], 5, {"must": {"a": 1}})
+    assert plain["query"]["function_score"]["query"]["bool"]["filter"] == [{"term": {"metadata.a": 1}}]
+
+
+@pytest.mark.asyncio
+async def test_group_search_ands_group_constraint():
+    """
+    Test that the group constraint is ANDed with the user's filter, rather than ORed into its should clauses.
+    """
+
+    class Index:
+        async def search(self, config):
+            return config
+
+    group = Group(name="main", index=Index())
+    config = await group.search(SearchConfig(query="q", extra_groups=["other", "main"], search_filter={"should": [{"a": 1}]}))
+
+    assert config.search_filter == combine_filters({"must": [{"group_name": ["main", "other"]}]}, {"should": [{"a": 1}]})
+    assert compile_filter(config.search_filter) == {"bool": {"filter": sorted([
+        {"terms": {"metadata.group_name": ["main", "other"]}},
+        {"bool": {"should": [{"term": {"metadata.a": 1}}], "minimum_should_match": 1}},
+    ], key=lambda clause: json.dumps(clause, sort_keys=True))}}
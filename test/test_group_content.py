@@ -7,7 +7,7 @@ from httpx import Response
 
 from app.controllers.content.delete import ContentDeleteResponse
 from app.controllers.content.list import ContentListResponse
-from app.controllers.content.search import ContentSearchResponse
+from app.controllers.content.search import ContentSearchResponse, ContentSearchBatchResponse
 from app.controllers.content.update import ContentUpdateResponse
 from app.controllers.content.upload import ContentUploadResponse
 from criadex.index.base_api import ContentUploadConfig
@@ -294,4 +294,43 @@ async def test_group_content_question_positive(
     )
 
     # Confirm the doc was removed from the content list
-    assert sample_doc_name not in response_data.files, "The sample question was not deleted from the group content list"
\ No newline at end of file
+    assert sample_doc_name not in response_data.files, "The sample question was not deleted from the group content list"
+
+
+@pytest.mark.asyncio
+async def test_group_content_search_batch_positive(
+        client: CriaTestClient,
+        sample_master_headers: dict,
+        sample_document_index: str
+) -> None:
+    """
+    Test the batch search route:
+    - /groups/{group}/content/search/batch
+
+    """
+
+    await assert_exists_index(client, sample_master_headers, sample_document_index)
+
+    configs = [SearchConfig(query="pytest batch query one", top_k=1), SearchConfig(query="pytest batch query two", top_k=3)]
+
+    response: Response = client.post(
+        f"/groups/{sample_document_index}/content/search/batch",
+        headers=sample_master_headers,
+        json=[json.loads(config.model_dump_json()) for config in configs]
+    )
+
+    response_data: ContentSearchBatchResponse = assert_response_shape(response.json(), custom_shape=ContentSearchBatchResponse)
+
+    # One response per query, in order
+    assert response_data.status == 200 and response_data.code == "SUCCESS", "Failed to batch search the index"
+    assert len(response_data.responses) == len(configs), "The batch search returned an unexpected number of responses."
+
+    # An empty batch is rejected
+    response = client.post(
+        f"/groups/{sample_document_index}/content/search/batch",
+        headers=sample_master_headers,
+        json=[]
+    )
+
+    response_data = assert_response_shape(response.json(), custom_shape=ContentSearchBatchResponse)
+    assert response_data.status == 400 and response_data.code == "INVALID_REQUEST"
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from criadex.index.ragflow_objects import history
+from criadex.index.ragflow_objects.history import HistoryBudget, HistoryCompactor, MESSAGE_OVERHEAD_TOKENS, SUMMARY_PREFIX
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    # One token per word keeps the arithmetic readable (and needs no tokenizer download)
+    monkeypatch.setattr(history, "count_message_tokens", lambda content: len(content.split()))
+
+
+def conversation(turns: int) -> list:
+    messages = [{"role": "system", "content": "You are a tutor"}]
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"question {turn} " + "word " * 8})
+        messages.append({"role": "assistant", "content": f"answer {turn} " + "word " * 8})
+    return messages
+
+
+def cost(messages: list) -> int:
+    return sum(len(message["content"].split()) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def test_history_budget_under_budget():
+    """
+    Test that a history within budget is forwarded untouched.
+    """
+    messages = conversation(2)
+    result = HistoryCompactor().apply(messages, HistoryBudget(max_tokens=10_000))
+
+    assert result.messages == messages
+    assert result.tokens_saved == 0
+
+
+def test_history_budget_drops_oldest():
+    """
+    Test that older turns are dropped oldest-first, keeping system messages & the last turns.
+    """
+    messages = conversation(6)
+    budget = HistoryBudget(max_tokens=cost(messages[:1]) + cost(messages[-6:]) + 1, keep_last_turns=2)
+    result = HistoryCompactor().apply(messages, budget)
+
+    assert result.messages == messages[:1] + messages[-6:]
+    assert result.tokens_after == cost(result.messages) <= budget.max_tokens
+    assert result.tokens_saved == cost(messages) - cost(result.messages)
+
+
+def test_history_budget_keeps_last_turns_over_budget():
+    """
+    Test that the last N turns are kept even when they alone exceed the budget.
+    """
+    messages = conversation(3)
+    result = HistoryCompactor().apply(messages, HistoryBudget(max_tokens=1, keep_last_turns=2))
+
+    assert result.messages == messages[:1] + messages[-4:]
+
+
+@pytest.mark.asyncio
+async def test_history_budget_summarize():
+    """
+    Test that dropped turns are summarized in the background & the summary is used on the next turn.
+    """
+    summarized: list = []
+
+    async def summarize(older: list) -> str:
+        summarized.append(older)
+        return "they asked questions"
+
+    compactor = HistoryCompactor(summarize=summarize)
+    messages = conversation(6)
+    budget = HistoryBudget(max_tokens=cost(messages[:1]) + cost(messages[-4:]) + 20, keep_last_turns=2, strategy="summarize")
+
+    # First turn: no summary yet, so older turns are dropped & a summary is scheduled
+    first = compactor.apply(messages, budget, chat_id="chat")
+    assert SUMMARY_PREFIX not in str(first.messages)
+    await asyncio.sleep(0)
+    assert len(summarized) == 1
+
+    # Next turn: the cached summary replaces the dropped turns
+    messages = messages + [{"role": "user", "content": "question 6"}]
+    second = compactor.apply(messages, budget, chat_id="chat")
+
+    assert second.messages[0] == messages[0]
+    assert second.messages[1]["content"] == SUMMARY_PREFIX + "they asked questions"
+    assert second.messages[-1] == messages[-1]
+    assert second.tokens_saved > 0
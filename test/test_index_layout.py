@@ -0,0 +1,142 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from criadex.index.ragflow_objects.layout import GroupIndexInfo, IndexLayout, TEMPLATE_NAME, SHARED_INDEX, keyword_field
+
+
+@pytest.fixture
+def es() -> MagicMock:
+    es = MagicMock()
+    es.indices.exists.return_value = False
+    return es
+
+
+def test_create_group_index_from_template(es):
+    """
+    Test that a group gets its own index, created from the template, behind an alias named after the group.
+    """
+    layout = IndexLayout(es, number_of_shards=6, routing_partition_size=2, group_routing=True)
+    layout.create_group("g1")
+    layout.create_group("g2")
+
+    es.indices.put_index_template.assert_called_once()
+    template = es.indices.put_index_template.call_args.kwargs
+    assert template["name"] == TEMPLATE_NAME
+    assert template["template"]["settings"] == {"index": {"number_of_shards": 6, "routing_partition_size": 2}}
+    assert template["template"]["mappings"]["_routing"] == {"required": True}
+
+    metadata = template["template"]["mappings"]["properties"]["metadata"]["properties"]
+    assert metadata["file_name"] == {"type": "keyword", "eager_global_ordinals": True}
+    assert metadata["group_name"] == {"type": "keyword", "eager_global_ordinals": True}
+
+    create = es.indices.create.call_args_list[0].kwargs
+    assert create["index"] == "criadex-group-g1-000001"
+    assert create["body"] == {"aliases": {"g1": {"is_write_index": True}}}
+
+
+def test_routing_partition_needs_group_routing(es):
+    """
+    Test that partitioned routing is left out of the template unless writes are routed, since it makes routing required.
+    """
+    layout = IndexLayout(es, number_of_shards=6, routing_partition_size=2)
+    layout.create_group("g1")
+
+    template = es.indices.put_index_template.call_args.kwargs
+    assert template["template"]["settings"] == {"index": {"number_of_shards": 6}}
+    assert "_routing" not in template["template"]["mappings"]
+
+
+def test_create_group_skips_existing(es):
+    """
+    Test that nothing is created when the alias (or a pre-layout index) already exists.
+    """
+    es.indices.exists.return_value = True
+    IndexLayout(es).create_group("g1")
+
+    es.indices.create.assert_not_called()
+    es.indices.put_alias.assert_not_called()
+
+
+def test_drop_group_drops_index(es):
+    """
+    Test that dropping a group in the index-per-group layout deletes its index instead of scanning.
+    """
+    es.indices.get_alias.return_value = {"criadex-group-g1-000001": {"aliases": {"g1": {"is_write_index": True}}}}
+
+    assert IndexLayout(es).drop_group("g1").indices == ["criadex-group-g1-000001"]
+    es.indices.delete.assert_called_once_with(index="criadex-group-g1-000001")
+    es.delete_by_query.assert_not_called()
+
+
+def test_shared_layout(es):
+    """
+    Test that the shared layout uses a filtered, routed alias, and dropping a group deletes only its documents.
+    """
+    layout = IndexLayout(es, mode="shared", group_routing=True)
+    layout.create_group("g1")
+
+    es.indices.create.assert_called_once_with(index=SHARED_INDEX)
+    es.indices.put_alias.assert_called_once_with(
+        index=SHARED_INDEX, name="g1", filter={"term": {"collection_name": "g1"}}, routing="g1"
+    )
+
+    es.indices.get_alias.return_value = {
+        SHARED_INDEX: {"aliases": {"g1": {"index_routing": "g1", "search_routing": "g1"}}}
+    }
+
+    assert layout.drop_group("g1").indices == []
+    assert es.delete_by_query.call_args.kwargs["routing"] == "g1"
+    es.indices.delete_alias.assert_called_once_with(index=SHARED_INDEX, name="g1")
+    es.indices.delete.assert_not_called()
+
+    es.delete_by_query.return_value = {"task": "node-1:42"}
+    assert layout.drop_group("g1", wait_for_completion=False).tasks == ["node-1:42"]
+    assert es.delete_by_query.call_args.kwargs["slices"] == "auto"
+
+
+def test_drop_legacy_group(es):
+    """
+    Test that a group created before the layout (a concrete index named after it) is dropped directly.
+    """
+    es.indices.get_alias.return_value = {}
+    es.indices.exists.return_value = True
+
+    assert IndexLayout(es).drop_group("g1").indices == ["g1"]
+    es.indices.delete.assert_called_once_with(index="g1")
+
+
+def test_keyword_field():
+    """
+    Test that exact-match deletes use the keyword-mapped field, or the dynamic .keyword sub-field otherwise.
+    """
+    assert keyword_field("file_name") == "metadata.file_name"
+    assert keyword_field("course") == "metadata.course.keyword"
+
+
+def test_create_group_quantized(es):
+    """
+    Test that a group's vector index type is set on its index mapping & recorded in _meta, to be read back.
+    """
+    IndexLayout(es).create_group("g1", vector_index="bbq_hnsw")
+
+    mappings = es.indices.create.call_args.kwargs["body"]["mappings"]
+    assert mappings["properties"]["embedding"]["index_options"] == {"type": "bbq_hnsw"}
+    assert mappings["_meta"] == {"vector_index": "bbq_hnsw"}
+
+    es.indices.get_mapping.return_value = {"criadex-group-g1-000001": {"mappings": mappings}}
+    assert IndexLayout(es).describe("g1").vector_index == "bbq_hnsw"
+
+
+def test_create_group_matryoshka(es):
+    """
+    Test that a truncated group's dimensions & Matryoshka flag are set on its mapping, to be read back.
+    """
+    IndexLayout(es).create_group("g1", dims=512, matryoshka=True)
+
+    mappings = es.indices.create.call_args.kwargs["body"]["mappings"]
+    assert mappings["properties"]["embedding"]["dims"] == 512
+    assert mappings["_meta"] == {"matryoshka": True}
+
+    es.indices.get_mapping.return_value = {"criadex-group-g1-000001": {"mappings": mappings}}
+    assert IndexLayout(es).describe("g1") == GroupIndexInfo(dims=512, matryoshka=True)
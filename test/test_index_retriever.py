@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from criadex.index.ragflow_objects.index_retriever import RagflowIndexRetriever
+from criadex.index.ragflow_objects.vector_store import RagflowVectorStore
+
+
+def hit(doc_id: str, score: float) -> dict:
+    return {"_id": doc_id, "_score": score, "_source": {"text": doc_id}}
+
+
+@pytest.fixture
+def retriever() -> RagflowIndexRetriever:
+    vector_store = RagflowVectorStore("localhost", 9200)
+    vector_store.es = MagicMock()
+    vector_store.es.msearch.return_value = {"responses": [
+        {"hits": {"hits": [hit("a1", 1.9), hit("a2", 1.2)]}},
+        {"hits": {"hits": [hit("b1", 1.7)]}},
+        {"hits": {"hits": [hit("c1", 1.8), hit("c2", 1.75)]}},
+    ]}
+
+    embedder = MagicMock()
+    embedder.embed.return_value = [0.5, 0.5]
+    return RagflowIndexRetriever(vector_store, embedder)
+
+
+def test_multi_collection_search_single_round_trip(retriever):
+    """
+    Test that all collections are searched in one multi-search, embedding the query once.
+    """
+    results = retriever.multi_collection_search(["a", "b", "c", "a"], "query", top_k=2)
+
+    assert retriever.vector_store.es.msearch.call_count == 1
+    retriever.embedder.embed.assert_called_once_with("query")
+
+    searches = retriever.vector_store.es.msearch.call_args.kwargs["searches"]
+    assert [header["index"] for header in searches[::2]] == ["a", "b", "c"]
+    assert all(body["size"] == 2 for body in searches[1::2])
+    assert list(results) == ["a", "b", "c"]
+    assert [h["_id"] for h in results["c"]] == ["c1", "c2"]
+
+
+@pytest.mark.asyncio
+async def test_merged_collection_search(retriever):
+    """
+    Test that the merged search returns one global top-k across collections, ranked by score.
+    """
+    merged = await retriever.amerged_collection_search(["a", "b", "c"], "query", top_k=3)
+
+    searches = retriever.vector_store.es.msearch.call_args.kwargs["searches"]
+    assert all("sort" not in body for body in searches[1::2]), "Collections must be ranked by relevance to merge"
+    assert [(h["_id"], h["collection_name"]) for h in merged] == [("a1", "a"), ("c1", "c"), ("c2", "c")]
+
+
+def test_multi_collection_search_no_collections(retriever):
+    """
+    Test that an empty collection list makes no request.
+    """
+    assert retriever.multi_collection_search([], "query") == {}
+    retriever.vector_store.es.msearch.assert_not_called()
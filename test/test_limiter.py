@@ -0,0 +1,99 @@
+import pytest
+from limits import parse
+from limits.errors import ConfigurationError
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from app.core.limiter import SQLiteStorage
+
+
+@pytest.fixture
+def storage_uri(tmp_path) -> str:
+    return f"sqlite:///{tmp_path / 'limits.sqlite3'}"
+
+
+def test_sqlite_storage_registered(storage_uri: str):
+    """
+    Test that the sqlite:// scheme resolves to the SQLite storage.
+    """
+    storage = storage_from_string(storage_uri)
+
+    assert isinstance(storage, SQLiteStorage)
+    assert storage.check()
+
+
+def test_sqlite_storage_requires_returning(storage_uri: str, monkeypatch):
+    """
+    Test that an SQLite too old for INSERT ... RETURNING is rejected when the storage is created.
+    """
+    monkeypatch.setattr("app.core.limiter.sqlite3.sqlite_version_info", (3, 34, 1))
+
+    with pytest.raises(ConfigurationError):
+        SQLiteStorage(storage_uri)
+
+
+def test_sqlite_storage_counts(storage_uri: str):
+    """
+    Test incrementing, reading & clearing counters.
+    """
+    storage = SQLiteStorage(storage_uri)
+
+    assert storage.get("key") == 0
+    assert storage.incr("key", 60) == 1
+    assert storage.incr("key", 60, amount=2) == 3
+    assert storage.get("key") == 3
+    assert storage.get_expiry("key") > 0
+
+    storage.clear("key")
+    assert storage.get("key") == 0
+
+    storage.incr("a", 60)
+    storage.incr("b", 60)
+    assert storage.reset() == 2
+
+
+def test_sqlite_storage_window_expires(storage_uri: str):
+    """
+    Test that an expired window restarts the counter.
+    """
+    storage = SQLiteStorage(storage_uri)
+
+    storage.incr("key", 0)
+    assert storage.get("key") == 0
+    assert storage.incr("key", 60) == 1
+
+
+def test_sqlite_storage_shared_between_workers(storage_uri: str):
+    """
+    Test that separate storages (i.e. worker processes) enforce ONE shared limit.
+    """
+    limit = parse("3/minute")
+    workers = [FixedWindowRateLimiter(SQLiteStorage(storage_uri)) for _ in range(3)]
+
+    assert [worker.hit(limit, "group") for worker in workers] == [True, True, True]
+    assert not workers[0].hit(limit, "group")
+    assert not workers[1].test(limit, "group")
+
+
+@pytest.mark.asyncio
+async def test_search_batch_cost():
+    """
+    Test that a batch search costs one hit per query, as sized from its body before the limits are evaluated.
+    """
+    from starlette.requests import Request
+    from app.controllers.content.search import search_batch_cost, search_batch_size
+
+    def request(body: bytes) -> Request:
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+        return Request({"type": "http", "method": "POST", "headers": [], "state": {}}, receive)
+
+    unsized = request(b"[]")
+    assert search_batch_cost(unsized) == 1
+
+    batch = request(b'[{"query": "one"}, {"query": "two"}, {"query": "three"}]')
+    assert await search_batch_size(batch) == 3
+    assert search_batch_cost(batch) == 3
+
+    malformed = request(b"{not json")
+    assert await search_batch_size(malformed) == 1
@@ -0,0 +1,141 @@
+import pytest
+
+from criadex.agent.cohere.rerank import RerankAgent, RerankAgentConfig
+from criadex.index.ragflow_objects.local_rerank import LocalReranker
+from criadex.index.ragflow_objects.postprocessor import RagflowPostprocessor
+from criadex.index.schemas import TextNode, TextNodeWithScore
+
+
+def hit(text: str, embedding=None, score: float = 1.0) -> dict:
+    source = {"text": text}
+    if embedding is not None:
+        source["embedding"] = embedding
+    return {"_id": text, "_score": score, "_source": source}
+
+
+def test_bm25_prefers_matching_text():
+    """
+    Test that BM25 ranks the candidate sharing the rare query terms first, scaled to a best of 1.
+    """
+    reranker = LocalReranker()
+    scores = reranker.bm25_scores(
+        "capital of France",
+        ["The Eiffel Tower is in Paris.", "Paris is the capital of France.", "Bananas are yellow."]
+    )
+
+    assert scores.argmax() == 1
+    assert scores.max() == pytest.approx(1.0)
+    assert scores[2] == 0.0
+
+
+def test_rerank_blends_cosine_and_bm25():
+    """
+    Test that a strong vector match can beat a lexical-only match, and that _score becomes the rerank score.
+    """
+    reranker = LocalReranker(vector_weight=0.7)
+    results = [
+        hit("capital of france", embedding=[0.0, 1.0]),
+        hit("the city of paris", embedding=[1.0, 0.0]),
+    ]
+
+    ranked = reranker.rerank(results, "capital of france", query_vector=[1.0, 0.0])
+
+    assert [r["_id"] for r in ranked] == ["the city of paris", "capital of france"]
+    assert ranked[0]["_score"] == pytest.approx(0.7 + 0.3 * reranker.bm25_scores("capital of france", ["capital of france", "the city of paris"])[1])
+    assert results[0]["_score"] == 1.0, "Input hits must not be mutated"
+
+
+def test_rerank_top_n_and_min_n():
+    """
+    Test that top_n & min_n are applied inside the reranker.
+    """
+    reranker = LocalReranker()
+    results = [hit("alpha beta"), hit("alpha"), hit("gamma"), hit("alpha beta beta")]
+
+    assert {r["_id"] for r in reranker.rerank(results, "alpha beta", top_n=2)} == {"alpha beta", "alpha beta beta"}
+    assert "gamma" not in [r["_id"] for r in reranker.rerank(results, "alpha beta", min_n=0.01)]
+
+
+def test_top_n_keeps_input_order_on_ties():
+    """
+    Test that heap selection is stable for equal scores.
+    """
+    import numpy as np
+
+    assert LocalReranker.top_n(np.array([0.5, 0.9, 0.5, 0.5]), n=3) == [1, 0, 2]
+
+
+def test_mmr_diversifies():
+    """
+    Test that MMR skips a near-duplicate of the first pick in favour of a different candidate.
+    """
+    reranker = LocalReranker(vector_weight=1.0)
+    results = [
+        hit("a", embedding=[1.0, 0.0, 0.0]),
+        hit("a copy", embedding=[0.99, 0.01, 0.0]),
+        hit("b", embedding=[0.7, 0.7, 0.0]),
+    ]
+
+    plain = reranker.rerank(results, "q", top_n=2, query_vector=[1.0, 0.2, 0.0])
+    diverse = reranker.rerank(results, "q", top_n=2, mmr_lambda=0.5, query_vector=[1.0, 0.2, 0.0])
+
+    assert [r["_id"] for r in plain] == ["a copy", "a"]
+    assert [r["_id"] for r in diverse] == ["a copy", "b"]
+
+
+def test_rerank_embeds_missing_vectors():
+    """
+    Test that vectors missing from the hits are embedded in one batch with the embedder.
+    """
+
+    class Embedder:
+        def __init__(self):
+            self.batches = []
+
+        def embed(self, text):
+            return [1.0, 0.0]
+
+        def embed_many(self, texts):
+            self.batches.append(texts)
+            return [[1.0, 0.0] if text == "near" else [0.0, 1.0] for text in texts]
+
+    embedder = Embedder()
+    ranked = LocalReranker(embedder=embedder, vector_weight=1.0).rerank([hit("far"), hit("near")], "query")
+
+    assert embedder.batches == [["far", "near"]]
+    assert ranked[0]["_id"] == "near"
+
+
+def test_postprocessor_falls_back_to_local():
+    """
+    Test that the postprocessor reranks locally when no external reranker is configured, and defers otherwise.
+    """
+    results = [hit("unrelated", score=2.0), hit("python generators")]
+
+    assert RagflowPostprocessor(reranker=None).rerank(results, "python generators", top_n=1)[0]["_id"] == "python generators"
+
+    class External:
+        def rerank(self, results, query):
+            return list(reversed(results))
+
+    assert [r["_id"] for r in RagflowPostprocessor(reranker=External()).rerank(results, "x")] == ["python generators", "unrelated"]
+
+
+@pytest.mark.asyncio
+async def test_rerank_agent_local():
+    """
+    Test that the rerank agent works without a Cohere model, using no search units.
+    """
+    nodes = [
+        TextNodeWithScore(
+            node=TextNode(text=text, metadata={}, class_name="TextNode", text_template="{}", metadata_template="{}"),
+            score=0.0
+        )
+        for text in ["How to bake bread", "Office hours are on Monday", "Bread flour types"]
+    ]
+
+    response = await RerankAgent().execute(RerankAgentConfig(prompt="bake bread", nodes=nodes, top_n=2, min_n=0.1))
+
+    assert [node.node.text for node in response.ranked_nodes] == ["How to bake bread", "Bread flour types"]
+    assert response.ranked_nodes[0].score == pytest.approx(1.0)
+    assert response.search_units == 0
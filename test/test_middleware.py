@@ -0,0 +1,110 @@
+from typing import Optional
+
+from fastapi import FastAPI
+from pydantic import Field
+from starlette.testclient import TestClient
+
+from app.core.middleware import StatusMiddleware, StatusJSONResponse
+from criadex.schemas import APIResponse
+
+
+class ErrorResponse(APIResponse):
+    error: Optional[str] = Field(default=None)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI(default_response_class=StatusJSONResponse)
+    app.add_middleware(StatusMiddleware)
+
+    @app.get("/not_found")
+    async def not_found() -> APIResponse:
+        return APIResponse(status=404, code="NOT_FOUND", message="Nope")
+
+    @app.get("/error")
+    async def error() -> ErrorResponse:
+        return ErrorResponse(status=500, code="ERROR", error="Traceback...")
+
+    @app.get("/raw")
+    async def raw() -> dict:
+        return {"status": 502, "code": "ERROR", "message": "Upstream failed"}
+
+    return app
+
+
+def test_status_middleware_sets_status_from_body():
+    """
+    Test that the HTTP status code mirrors the `status` field of the response body.
+    """
+    with TestClient(build_app()) as client:
+        response = client.get("/not_found")
+        assert response.status_code == 404
+        assert response.json()["code"] == "NOT_FOUND"
+
+        response = client.get("/raw")
+        assert response.status_code == 502
+
+
+def test_status_middleware_strips_error():
+    """
+    Test that `error` is stripped unless stack traces are requested.
+    """
+    with TestClient(build_app()) as client:
+        response = client.get("/error")
+        assert response.status_code == 500
+        assert "error" not in response.json()
+
+        response = client.get("/error", headers={"x-api-stacktrace": "true"})
+        assert response.json()["error"] == "Traceback..."
+
+
+def test_status_json_response_passthrough():
+    """
+    Test that non-dict content & bodies without a status are left alone.
+    """
+    assert StatusJSONResponse([1, 2, 3], status_code=201).status_code == 201
+    assert StatusJSONResponse({"detail": "Not Found"}, status_code=404).status_code == 404
+
+
+def test_status_json_response_message_default():
+    """
+    Test that responses sent without a message receive the default for their status.
+    """
+    app = build_app()
+
+    @app.get("/no_message")
+    async def no_message() -> APIResponse:
+        return APIResponse(status=409, code="DUPLICATE", message=None)
+
+    with TestClient(app) as client:
+        response = client.get("/no_message")
+        assert response.status_code == 409
+        assert response.json()["message"] == APIResponse.DEFAULT_MESSAGES[409]
+
+
+def test_status_json_response_datetimes():
+    """
+    Test that models containing datetimes (e.g. GroupsModel) render as ISO strings.
+    """
+    from datetime import datetime
+    from criadex.database.tables.groups import GroupsModel
+
+    created: datetime = datetime(2024, 1, 1, 12, 30, 0)
+    group: GroupsModel = GroupsModel(
+        id=1, name="group", type=1, llm_model_id=1, embedding_model_id=2, rerank_model_id=1, created=created
+    )
+
+    class GroupResponse(APIResponse):
+        group: GroupsModel
+
+    app = build_app()
+
+    @app.get("/about")
+    async def about() -> GroupResponse:
+        return GroupResponse(group=group)
+
+    with TestClient(app) as client:
+        assert client.get("/about").json()["group"]["created"] == created.isoformat()
+
+    # Content built by hand (not serialized by FastAPI)
+    assert b'"2024-01-01T12:30:00"' in StatusJSONResponse({"created": created}).body
+    assert StatusJSONResponse(GroupResponse(group=group, status=404)).status_code == 404
@@ -0,0 +1,211 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.controllers.agents.ragflow_agents.chat import router
+from app.core.app import CriadexAPI
+from criadex.index.ragflow_objects import chat as ragflow_chat
+from criadex.index.ragflow_objects import history
+from criadex.index.ragflow_objects.chat import RagflowChatAgent
+from criadex.index.ragflow_objects.history import HistoryBudget
+from .utils.ragflow_utils import run_fake_ragflow, FAKE_RAGFLOW_CHUNKS, FAKE_RAGFLOW_USAGE, FAKE_RAGFLOW_BAD_KEY, FAKE_RAGFLOW_PATHS
+
+HISTORY: list = [{"role": "user", "content": "Hi"}]
+
+
+@pytest.fixture(scope="module")
+def fake_ragflow_url() -> str:
+    with run_fake_ragflow() as url_template:
+        yield url_template
+
+
+@pytest.fixture
+def fake_ragflow(fake_ragflow_url: str, monkeypatch) -> str:
+    monkeypatch.setattr(ragflow_chat, "RAGFLOW_API_URL_TEMPLATE", fake_ragflow_url)
+    return fake_ragflow_url
+
+
+@pytest.mark.asyncio
+async def test_ragflow_chat_stream_positive(fake_ragflow: str):
+    """
+    Test that chunks are yielded as they arrive, followed by the usage.
+    """
+    events = [event async for event in RagflowChatAgent().chat_stream("chat-id", HISTORY, api_key="key")]
+
+    assert [event["content"] for event in events[:-1]] == FAKE_RAGFLOW_CHUNKS
+    assert events[-1] == {"type": "done", "message": "".join(FAKE_RAGFLOW_CHUNKS), "usage": {**FAKE_RAGFLOW_USAGE, "history_tokens_saved": 0}}
+
+
+@pytest.mark.asyncio
+async def test_ragflow_chat_matches_stream(fake_ragflow: str):
+    """
+    Test that the non-streaming chat still works against the same server.
+    """
+    response = await RagflowChatAgent().chat("chat-id", HISTORY, api_key="key")
+
+    assert response["chat_response"]["message"]["blocks"][0]["text"] == "".join(FAKE_RAGFLOW_CHUNKS)
+    assert response["usage"] == {**FAKE_RAGFLOW_USAGE, "history_tokens_saved": 0}
+
+
+@pytest.mark.asyncio
+async def test_ragflow_chat_summary_plain_completion(fake_ragflow: str, monkeypatch):
+    """
+    Test that history is summarized by a plain completion, not the chat's dialog, & the summary's usage is reported.
+    """
+    monkeypatch.setattr(history, "count_message_tokens", lambda content: len(content.split()))
+    monkeypatch.setattr(ragflow_chat, "HISTORY_SUMMARY_URL", fake_ragflow.split("/api/")[0] + "/v1/chat/completions")
+
+    agent = RagflowChatAgent()
+    long_history = [{"role": "user" if turn % 2 == 0 else "assistant", "content": "word " * 20} for turn in range(12)]
+    budget = HistoryBudget(max_tokens=60, keep_last_turns=1, strategy="summarize")
+    FAKE_RAGFLOW_PATHS.clear()
+
+    first = await agent.chat("chat-1", long_history, "key", history_budget=budget)
+    while agent._history_compactor._tasks:
+        await asyncio.sleep(0.01)
+
+    assert FAKE_RAGFLOW_PATHS == ["/api/v1/chats_openai/chat-1/chat/completions", "/v1/chat/completions"]
+    assert "summary_tokens" not in first["usage"]
+
+    second = await agent.chat("chat-1", long_history, "key", history_budget=budget)
+
+    assert second["usage"]["summary_tokens"] == FAKE_RAGFLOW_USAGE["total_tokens"]
+    assert second["usage"]["total_tokens"] == 2 * FAKE_RAGFLOW_USAGE["total_tokens"]
+    assert second["usage"]["prompt_tokens"] == 2 * FAKE_RAGFLOW_USAGE["prompt_tokens"]
+
+
+def test_ragflow_chat_summary_usage_bounded(monkeypatch):
+    """
+    Test that summary usage is kept for a bounded number of chats, evicting the least recently summarized.
+    """
+    monkeypatch.setattr(ragflow_chat, "RAGFLOW_SUMMARY_USAGE_MAX", 2)
+    agent = RagflowChatAgent()
+
+    agent._record_summary_usage("chat-1", FAKE_RAGFLOW_USAGE)
+    agent._record_summary_usage("chat-2", FAKE_RAGFLOW_USAGE)
+    agent._record_summary_usage("chat-1", FAKE_RAGFLOW_USAGE)
+    agent._record_summary_usage("chat-3", FAKE_RAGFLOW_USAGE)
+
+    assert list(agent._summary_usage) == ["chat-1", "chat-3"]
+    assert agent._summary_usage["chat-1"]["total_tokens"] == 2 * FAKE_RAGFLOW_USAGE["total_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_ragflow_chat_stream_http_error(fake_ragflow: str):
+    """
+    Test that an upstream HTTP error surfaces as a ValueError with Ragflow's message.
+    """
+    with pytest.raises(ValueError, match="Authentication error"):
+        async for _ in RagflowChatAgent().chat_stream("chat-id", HISTORY, api_key=FAKE_RAGFLOW_BAD_KEY):
+            pass
+
+
+def test_ragflow_chat_stream_route(fake_ragflow: str, monkeypatch):
+    """
+    Test that the stream route relays SSE with the usage at the end.
+    """
+    monkeypatch.setenv("RAGFLOW_API_KEY", "key")
+    app = FastAPI()
+    app.include_router(router)
+
+    with TestClient(app) as client:
+        response = client.post("/models/ragflow/1/agents/chat/stream", json={"chat_id": "chat-id", "prompt": "Hi"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [event for event in response.text.split("\n\n") if event]
+    assert [json.loads(event[len("data: "):])["content"] for event in events[:len(FAKE_RAGFLOW_CHUNKS)]] == FAKE_RAGFLOW_CHUNKS
+    assert events[-2].startswith("event: usage\n")
+    assert json.loads(events[-2].split("data: ", 1)[1])["usage"] == {**FAKE_RAGFLOW_USAGE, "history_tokens_saved": 0}
+    assert events[-1] == "data: [DONE]"
+
+
+@pytest.mark.asyncio
+async def test_ragflow_chat_shared_client(fake_ragflow: str):
+    """
+    Test that an agent given the app-scoped client reuses it instead of opening its own.
+    """
+    client = CriadexAPI.create_http_client()
+    agent = RagflowChatAgent(client=client)
+
+    await agent.chat("chat-id", HISTORY, api_key="key")
+    events = [event async for event in agent.chat_stream("chat-id", HISTORY, api_key="key")]
+
+    assert not client.is_closed
+    assert events[-1]["usage"] == {**FAKE_RAGFLOW_USAGE, "history_tokens_saved": 0}
+
+    await client.aclose()
+
+
+def mock_db_pool() -> tuple:
+    """A pool whose connections all hand out the same mocked cursor"""
+    cursor = MagicMock()
+    cursor.executemany = AsyncMock()
+
+    @asynccontextmanager
+    async def cursor_context():
+        yield cursor
+
+    @asynccontextmanager
+    async def acquire():
+        yield MagicMock(cursor=cursor_context)
+
+    return MagicMock(acquire=acquire), cursor
+
+
+@pytest.mark.asyncio
+async def test_ragflow_ensure_dialog_cached():
+    """
+    Test that a dialog is created with INSERT IGNORE once, then served from memory.
+    """
+    pool, cursor = mock_db_pool()
+    agent = RagflowChatAgent(db_pool=pool)
+
+    assert await agent.ensure_dialog_exists("chat-id", tenant_id="tenant")
+    assert await agent.ensure_dialog_exists("chat-id", tenant_id="tenant")
+
+    cursor.executemany.assert_awaited_once()
+    query, rows = cursor.executemany.call_args.args
+    assert query.strip().startswith("INSERT IGNORE")
+    assert rows[0][0] == RagflowChatAgent.dialog_id("chat-id") and rows[0][5] == "tenant"
+
+    # A different tenant is a different dialog
+    assert await agent.ensure_dialog_exists("chat-id", tenant_id="other-tenant")
+    assert cursor.executemany.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ragflow_ensure_dialogs_bulk():
+    """
+    Test that a bulk ensure only inserts the unknown dialogs, in one statement.
+    """
+    pool, cursor = mock_db_pool()
+    agent = RagflowChatAgent(db_pool=pool)
+
+    await agent.ensure_dialog_exists("known", tenant_id="tenant")
+    result = await agent.ensure_dialogs_exist(["known", "new-1", "new-2", "new-1"], tenant_id="tenant")
+
+    assert result == {"known": True, "new-1": True, "new-2": True}
+    assert cursor.executemany.await_count == 2
+    assert [row[0] for row in cursor.executemany.call_args.args[1]] == [
+        RagflowChatAgent.dialog_id("new-1"), RagflowChatAgent.dialog_id("new-2")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ragflow_ensure_dialogs_failure_not_cached():
+    """
+    Test that a failed insert reports False and is retried next time.
+    """
+    pool, cursor = mock_db_pool()
+    cursor.executemany.side_effect = [RuntimeError("DB down"), None]
+    agent = RagflowChatAgent(db_pool=pool)
+
+    assert not await agent.ensure_dialog_exists("chat-id", tenant_id="tenant")
+    assert await agent.ensure_dialog_exists("chat-id", tenant_id="tenant")
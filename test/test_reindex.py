@@ -0,0 +1,174 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from elasticsearch import ConflictError, NotFoundError
+
+from criadex.index.ragflow_objects.layout import IndexLayout
+from criadex.index.ragflow_objects.reindex import ReindexJob, ReindexProgress
+from criadex.index.ragflow_objects.vector_store import RagflowVectorStore
+from criadex.schemas import ReindexRunningError
+
+
+def source_hit(doc_id: str, sort: int) -> dict:
+    return {"_id": doc_id, "_source": {"text": doc_id, "metadata": {"file_name": "a.pdf"}}, "sort": [sort]}
+
+
+class Embedder:
+    def __init__(self):
+        self.batches = []
+
+    def embed_many(self, texts):
+        self.batches.append(texts)
+        return [[1.0, 0.0] for _ in texts]
+
+
+@pytest.fixture
+def vector_store() -> RagflowVectorStore:
+    store = RagflowVectorStore("localhost", 9200)
+    store.es = MagicMock()
+    store._layout = None
+    store.es.get.side_effect = NotFoundError("not found", MagicMock(status=404), {})
+    store.es.indices.get_alias.return_value = {}
+    store.es.count.return_value = {"count": 3}
+    store.es.open_point_in_time.return_value = {"id": "pit-1"}
+    store.es.bulk.return_value = {"errors": False, "items": []}
+    return store
+
+
+def paged_search(docs, expired_pits=()):
+    """Fake PIT search over docs, paging by search_after. Catch-up (range) queries find nothing."""
+
+    def search(pit=None, query=None, size=10, search_after=None, **kwargs):
+        if pit["id"] in expired_pits:
+            raise NotFoundError("pit expired", MagicMock(status=404), {})
+        if "range" in query:
+            return {"pit_id": pit["id"], "hits": {"hits": []}}
+        start = search_after[0] + 1 if search_after else 0
+        return {"pit_id": pit["id"], "hits": {"hits": docs[start:start + size]}}
+
+    return search
+
+
+def test_next_index():
+    """
+    Test that the shadow index is the group's next index generation, starting at 1 for pre-layout groups.
+    """
+    assert IndexLayout.next_index("g1", "g1") == "criadex-group-g1-000001"
+    assert IndexLayout.next_index("g1", "criadex-group-g1-000001") == "criadex-group-g1-000002"
+
+
+def test_reindex_copies_in_batches_and_swaps_alias(vector_store):
+    """
+    Test that every node is streamed with PIT + search_after, re-embedded per batch, bulk-written into the
+    shadow index with the new dims, and the alias is swapped atomically.
+    """
+    docs = [source_hit("a", 0), source_hit("b", 1), source_hit("c", 2)]
+    vector_store.es.search.side_effect = paged_search(docs)
+    embedder = Embedder()
+
+    progress = ReindexJob(vector_store, embedder, "g1", dims=2, batch_size=2).run()
+
+    assert progress.status == "completed"
+    assert (progress.total, progress.processed, progress.embedded) == (3, 3, 3)
+    assert progress.percent == 100.0
+    assert embedder.batches == [["a", "b"], ["c"]]
+
+    create = vector_store.es.indices.create.call_args.kwargs
+    assert create["index"] == "criadex-group-g1-000001"
+    assert create["body"]["mappings"]["properties"]["embedding"]["dims"] == 2
+
+    operations = vector_store.es.bulk.call_args_list[0].kwargs["operations"]
+    assert operations[0] == {"index": {"_index": "criadex-group-g1-000001", "_id": "a"}}
+    assert operations[1]["embedding"] == [1.0, 0.0]
+
+    # The pre-layout index holds the alias' name, so it is removed in the same alias update
+    vector_store.es.indices.update_aliases.assert_called_once_with(actions=[
+        {"add": {"index": "criadex-group-g1-000001", "alias": "g1", "is_write_index": True}},
+        {"remove_index": {"index": "g1"}}
+    ])
+
+
+def test_reindex_resumes_after_pit_expired(vector_store):
+    """
+    Test that resuming a failed job with an expired point-in-time restarts the stream, skipping nodes already copied.
+    """
+    docs = [source_hit("a", 0), source_hit("b", 1), source_hit("c", 2)]
+    vector_store.es.indices.get_alias.return_value = {"criadex-group-g1-000001": {"aliases": {"g1": {}}}}
+    vector_store.es.get.side_effect = None
+    vector_store.es.get.return_value = {"_source": ReindexProgress(
+        group_name="g1",
+        source_index="criadex-group-g1-000001",
+        target_index="criadex-group-g1-000002",
+        status="failed",
+        total=3,
+        processed=2,
+        embedded=2,
+        pit_id="pit-old",
+        search_after=[1]
+    ).model_dump(), "_seq_no": 4, "_primary_term": 1}
+
+    def search(**kwargs):
+        if "pit" not in kwargs:
+            # Which of the page's nodes are already in the shadow index
+            return {"hits": {"hits": [{"_id": "a"}, {"_id": "b"}]}}
+        return paged_search(docs, expired_pits={"pit-old"})(**kwargs)
+
+    vector_store.es.search.side_effect = search
+    embedder = Embedder()
+
+    progress = ReindexJob(vector_store, embedder, "g1").run()
+
+    # The failed job was claimed from the version that was read
+    claim = vector_store.es.index.call_args_list[0].kwargs
+    assert (claim["if_seq_no"], claim["if_primary_term"]) == (4, 1)
+
+    assert progress.status == "completed"
+    assert (progress.processed, progress.embedded) == (3, 3)
+    assert embedder.batches == [["c"]]
+    vector_store.es.indices.create.assert_not_called()
+    vector_store.es.indices.delete.assert_called_once_with(index="criadex-group-g1-000001")
+
+
+def test_reindex_rejects_running_job(vector_store):
+    """
+    Test that a job is claimed in Elasticsearch, so a group's fresh running job (from any worker), or a lost
+    race to claim it, is rejected.
+    """
+    running = ReindexProgress(group_name="g1", source_index="g1", target_index="criadex-group-g1-000001", status="running")
+    running.updated_at = time.time()
+    vector_store.es.get.side_effect = None
+    vector_store.es.get.return_value = {"_source": running.model_dump(), "_seq_no": 4, "_primary_term": 1}
+
+    with pytest.raises(ReindexRunningError):
+        ReindexJob(vector_store, Embedder(), "g1").plan()
+
+    vector_store.es.index.assert_not_called()
+
+    vector_store.es.get.side_effect = NotFoundError("not found", MagicMock(status=404), {})
+    vector_store.es.index.side_effect = ConflictError("conflict", MagicMock(status=409), {})
+
+    with pytest.raises(ReindexRunningError):
+        ReindexJob(vector_store, Embedder(), "g1", dims=2).plan()
+
+    assert vector_store.es.index.call_args.kwargs["op_type"] == "create"
+    vector_store.es.indices.create.assert_not_called()
+
+
+def test_reindex_blocks_writes_during_catch_up(vector_store):
+    """
+    Test that the old index is write-blocked before the catch-up, so no write lands between it & the swap,
+    and unblocked if the job fails.
+    """
+    vector_store.es.search.side_effect = paged_search([source_hit("a", 0)])
+
+    ReindexJob(vector_store, Embedder(), "g1", dims=2).run()
+    vector_store.es.indices.put_settings.assert_called_once_with(index="g1", settings={"index": {"blocks": {"write": True}}})
+
+    vector_store.es.indices.put_settings.reset_mock()
+    vector_store.es.indices.update_aliases.side_effect = RuntimeError("swap failed")
+
+    with pytest.raises(RuntimeError):
+        ReindexJob(vector_store, Embedder(), "g1", dims=2).run()
+
+    assert [c.kwargs["settings"]["index"]["blocks"]["write"] for c in vector_store.es.indices.put_settings.call_args_list] == [True, False]
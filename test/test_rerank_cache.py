@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from criadex.cache.rerank_cache import RerankCache, candidate_id
+from criadex.index.ragflow_objects.postprocessor import RagflowPostprocessor
+from criadex.index.ragflow_objects.rerank_batcher import RerankBatcher
+
+
+def hit(doc_id: str, text: str = None) -> dict:
+    return {"_id": doc_id, "_score": 0.0, "_source": {"text": text or doc_id}}
+
+
+class CountingReranker:
+    """Scores a hit by how many query words its text contains. Counts provider calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def _rank(self, results, query):
+        words = set(query.split())
+        scored = [{**r, "_score": len(words & set(r["_source"]["text"].split())) / len(words)} for r in results]
+        return sorted(scored, key=lambda r: -r["_score"])
+
+    def rerank(self, results, query):
+        self.calls.append((query, [r["_id"] for r in results]))
+        return self._rank(results, query)
+
+    async def arerank(self, results, query):
+        self.calls.append((query, [r["_id"] for r in results]))
+        await asyncio.sleep(0)
+        return self._rank(results, query)
+
+
+def test_cache_key_ignores_candidate_order():
+    """
+    Test that the key depends on the set of candidates, not their order, and on the model & query.
+    """
+    a, b = hit("a"), hit("b")
+
+    assert RerankCache.key("local", "q", [a, b]) == RerankCache.key("local", "q", [b, a])
+    assert RerankCache.key("local", "q", [a, b]) != RerankCache.key("cohere:1", "q", [a, b])
+    assert RerankCache.key("local", "q", [a, b]) != RerankCache.key("local", "other", [a, b])
+    assert RerankCache.key("local", "q", [a]) != RerankCache.key("local", "q", [a, b])
+
+
+def test_candidate_id_falls_back_to_text_hash():
+    """
+    Test that hits without an _id are identified by their text.
+    """
+    assert candidate_id({"_source": {"text": "x"}}) == candidate_id({"text": "x"})
+    assert candidate_id({"_source": {"text": "x"}}) != candidate_id({"_source": {"text": "y"}})
+
+
+def test_candidate_id_changes_with_text():
+    """
+    Test that a re-uploaded document (same _id, new text) gets a new ID, so its stale scores are not served.
+    """
+    old, new = {"_id": "a", "_source": {"text": "old"}}, {"_id": "a", "_source": {"text": "new"}}
+
+    assert candidate_id(old) == candidate_id({"_id": "a", "_source": {"text": "old"}})
+    assert candidate_id(old) != candidate_id(new)
+    assert RerankCache.key("local", "q", [old]) != RerankCache.key("local", "q", [new])
+    assert RerankCache.apply(RerankCache(max_size=8, ttl=60).store("k", [{**old, "_score": 0.9}]), [new]) == []
+
+
+def test_postprocessor_cache_hit_skips_reranker():
+    """
+    Test that a repeated rerank of the same candidates is served from the cache, with any top_n / min_n cut.
+    """
+    reranker = CountingReranker()
+    postprocessor = RagflowPostprocessor(reranker=reranker, cache=RerankCache(max_size=8, ttl=60), model_key="cohere:1")
+    results = [hit("1", "red apple"), hit("2", "green apple pie"), hit("3", "banana")]
+
+    first = postprocessor.rerank(results, "apple pie")
+    second = postprocessor.rerank(list(reversed(results)), "apple pie", top_n=1)
+    third = postprocessor.rerank(results, "apple pie", min_n=0.5)
+
+    assert len(reranker.calls) == 1
+    assert [r["_id"] for r in first] == ["2", "1", "3"]
+    assert [r["_id"] for r in second] == ["2"]
+    assert [r["_id"] for r in third] == ["2", "1"]
+
+
+def test_postprocessor_cache_expires():
+    """
+    Test that entries past their TTL are reranked again.
+    """
+    reranker = CountingReranker()
+    postprocessor = RagflowPostprocessor(reranker=reranker, cache=RerankCache(max_size=8, ttl=0), model_key="cohere:1")
+
+    postprocessor.rerank([hit("1")], "q")
+    postprocessor.rerank([hit("1")], "q")
+
+    assert len(reranker.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_postprocessor_async_cache():
+    """
+    Test that the async path shares the cache.
+    """
+    reranker = CountingReranker()
+    postprocessor = RagflowPostprocessor(reranker=reranker, cache=RerankCache(max_size=8, ttl=60), model_key="cohere:1")
+
+    await postprocessor.arerank([hit("1"), hit("2")], "q")
+    await postprocessor.arerank([hit("2"), hit("1")], "q")
+
+    assert len(reranker.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_batcher_merges_same_query():
+    """
+    Test that concurrent requests for one query share a provider call over the union of candidates.
+    """
+    reranker = CountingReranker()
+    batcher = RerankBatcher(reranker, window=0.01)
+
+    first, second, other = await asyncio.gather(
+        batcher.arerank([hit("1", "apple"), hit("2", "pie")], "apple pie"),
+        batcher.arerank([hit("2", "pie"), hit("3", "apple pie")], "apple pie"),
+        batcher.arerank([hit("4", "kiwi")], "kiwi"),
+    )
+
+    assert batcher.calls == 2
+    assert sorted(reranker.calls) == [("apple pie", ["1", "2", "3"]), ("kiwi", ["4"])]
+    assert [r["_id"] for r in first] == ["1", "2"]
+    assert [r["_id"] for r in second] == ["3", "2"]
+    assert second[0]["_score"] == 1.0
+    assert [r["_id"] for r in other] == ["4"]
+
+
+@pytest.mark.asyncio
+async def test_batcher_respects_max_documents():
+    """
+    Test that a request that would overflow the provider's document limit opens a new batch.
+    """
+    reranker = CountingReranker()
+    batcher = RerankBatcher(reranker, window=0.01, max_documents=2)
+
+    await asyncio.gather(
+        batcher.arerank([hit("1"), hit("2")], "q"),
+        batcher.arerank([hit("3")], "q"),
+    )
+
+    assert batcher.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_errors():
+    """
+    Test that a failed provider call fails every request in the batch.
+    """
+
+    class Failing:
+        async def arerank(self, results, query):
+            raise RuntimeError("provider down")
+
+    batcher = RerankBatcher(Failing(), window=0.01)
+    results = await asyncio.gather(
+        batcher.arerank([hit("1")], "q"),
+        batcher.arerank([hit("2")], "q"),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,59 @@
+import pytest
+from datetime import datetime
+
+from criadex.database.tables.documents import DocumentsModel
+from criadex.database.tables.groups import GroupsModel
+
+
+@pytest.fixture
+def group_rows() -> list:
+    now: datetime = datetime(2024, 1, 1, 12, 0, 0)
+    return [(idx, f"group-{idx}", 1, 1, 2, 1, now) for idx in range(3)]
+
+
+def test_table_model_trusted_matches_validated(group_rows: list):
+    """
+    Test that the trusted fast path builds the same models as the validated path.
+    """
+    for row in group_rows:
+        assert GroupsModel.from_results(row, trusted=True) == GroupsModel.from_results(row)
+
+    assert GroupsModel.from_results_many(group_rows, trusted=True) == GroupsModel.from_results_many(group_rows)
+
+
+def test_table_model_trusted_model_behaviour(group_rows: list):
+    """
+    Test that trusted models behave like regular pydantic models.
+    """
+    model: GroupsModel = GroupsModel.from_results(group_rows[0], trusted=True)
+
+    assert isinstance(model, GroupsModel)
+    assert model.model_fields_set == set(GroupsModel.get_fields())
+    assert model.model_dump()["name"] == "group-0"
+
+    # Fields set must not be shared between rows
+    model.name = "renamed"
+    assert GroupsModel.from_results(group_rows[1], trusted=True).name == "group-1"
+
+
+def test_table_model_from_results_many_skips_empty():
+    """
+    Test that empty result sets & empty rows are skipped.
+    """
+    now: datetime = datetime.now()
+
+    assert DocumentsModel.from_results_many(None, trusted=True) == []
+    assert DocumentsModel.from_results_many((), trusted=True) == []
+    assert DocumentsModel.from_results(None, trusted=True) is None
+    assert len(DocumentsModel.from_results_many([(1, "a.json", 1, now), None], trusted=True)) == 1
+
+
+def test_table_model_unequal_length():
+    """
+    Test that rows not matching the model's fields are rejected on both paths.
+    """
+    with pytest.raises(ValueError):
+        DocumentsModel.from_results_many([(1, "a.json")], trusted=True)
+
+    with pytest.raises(ValueError):
+        DocumentsModel.from_results((1, "a.json"))
@@ -0,0 +1,78 @@
+import pytest
+import tiktoken
+
+from criadex.agent import tokens
+from criadex.agent.tokens import HistoryTokenCache, count_tokens, acount_tokens, get_encoding
+
+HISTORY: list = ["Hello!", "Hi there, how can I help?", "What is a <|endoftext|> token?"]
+
+
+def reference_count(texts: list) -> int:
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return sum(len(encoding.encode_ordinary(text)) for text in texts)
+
+
+def test_encoding_cached():
+    """
+    Test that the encoder is loaded once per process.
+    """
+    assert get_encoding() is get_encoding()
+
+
+def test_count_tokens():
+    """
+    Test counting, including special tokens in user input.
+    """
+    assert count_tokens(None) == 0
+    assert count_tokens("") == 0
+    assert count_tokens(HISTORY[2]) == reference_count([HISTORY[2]])
+
+
+@pytest.mark.asyncio
+async def test_acount_tokens_offloads(monkeypatch):
+    """
+    Test that large inputs are counted the same in a worker thread.
+    """
+    monkeypatch.setattr(tokens, "TOKEN_OFFLOAD_CHARS", 10)
+    assert await acount_tokens(HISTORY[1]) == count_tokens(HISTORY[1])
+
+
+def test_history_cache_incremental(monkeypatch):
+    """
+    Test that only newly appended messages are encoded.
+    """
+    cache = HistoryTokenCache()
+    encoded: list = []
+    monkeypatch.setattr(tokens, "count_tokens", lambda text: encoded.append(text) or reference_count([text]))
+
+    assert cache.count("chat", HISTORY[:2]) == reference_count(HISTORY[:2])
+    assert cache.count("chat", HISTORY) == reference_count(HISTORY)
+    assert encoded == HISTORY
+
+    # Unchanged history encodes nothing
+    assert cache.count("chat", HISTORY) == reference_count(HISTORY)
+    assert len(encoded) == len(HISTORY)
+
+
+def test_history_cache_changed_prefix():
+    """
+    Test that an edited or shorter history is recounted from scratch.
+    """
+    cache = HistoryTokenCache()
+    cache.count("chat", HISTORY)
+
+    edited: list = ["Goodbye!", *HISTORY[1:]]
+    assert cache.count("chat", edited) == reference_count(edited)
+    assert cache.count("chat", HISTORY[:1]) == reference_count(HISTORY[:1])
+
+
+def test_history_cache_lru():
+    """
+    Test that the least recently used chats are evicted.
+    """
+    cache = HistoryTokenCache(max_chats=2)
+
+    for chat_id in ("a", "b", "c"):
+        cache.count(chat_id, HISTORY)
+
+    assert list(cache._counts) == ["b", "c"]
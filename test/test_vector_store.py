@@ -0,0 +1,351 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from elasticsearch import ConflictError, NotFoundError
+
+from criadex.index.ragflow_objects.layout import GroupIndexInfo
+from criadex.group import Group
+from criadex.index.ragflow_objects import ingestion
+from criadex.index.ragflow_objects import vector_store as vector_store_module
+from criadex.index.ragflow_objects.vector_store import RagflowVectorStore, HybridSearch, WritePolicy
+from criadex.schemas import EmbeddingDimensionsError
+
+
+def hit(doc_id: str, score: float) -> dict:
+    return {"_id": doc_id, "_score": score, "_source": {"text": doc_id}}
+
+
+@pytest.fixture
+def vector_store() -> RagflowVectorStore:
+    store = RagflowVectorStore("localhost", 9200)
+    store.es = MagicMock()
+    store.es.get.side_effect = NotFoundError("not found", MagicMock(status=404), {})
+    return store
+
+
+def test_fuse_rrf():
+    """
+    Test that reciprocal rank fusion favours hits found by both legs, and respects the leg weights.
+    """
+    vector_hits = [hit("a", 1.9), hit("b", 1.8)]
+    lexical_hits = [hit("c", 12.0), hit("b", 7.0)]
+
+    fused = RagflowVectorStore.fuse(vector_hits, lexical_hits, 3, HybridSearch(query_text="q"))
+    assert [h["_id"] for h in fused] == ["b", "a", "c"]
+    assert fused[0]["_score"] == pytest.approx(0.5 / 62 + 0.5 / 62)
+
+    lexical_only = RagflowVectorStore.fuse(vector_hits, lexical_hits, 1, HybridSearch(query_text="q", vector_weight=0.0))
+    assert [h["_id"] for h in lexical_only] == ["c"]
+
+
+def test_fuse_weighted():
+    """
+    Test that weighted fusion blends cosine similarity (vector score - 1) with BM25 scaled by its best score.
+    """
+    vector_hits = [hit("a", 1.9), hit("b", 1.5)]
+    lexical_hits = [hit("b", 10.0), hit("c", 5.0)]
+
+    fused = RagflowVectorStore.fuse(
+        vector_hits, lexical_hits, 10, HybridSearch(query_text="q", fusion="weighted", vector_weight=0.5)
+    )
+
+    scores = {h["_id"]: h["_score"] for h in fused}
+    assert scores == pytest.approx({"a": 0.45, "b": 0.75, "c": 0.25})
+    assert [h["_id"] for h in fused] == ["b", "a", "c"]
+
+
+def test_msearch_hybrid_runs_both_legs_in_one_round_trip(vector_store):
+    """
+    Test that a hybrid query adds a BM25 body next to its vector body, in the same multi-search, and is fused.
+    """
+    vector_store.es.msearch.return_value = {"responses": [
+        {"hits": {"hits": [hit("plain", 1.5)]}},
+        {"hits": {"hits": [hit("a", 1.9)]}},
+        {"hits": {"hits": [hit("room", 8.0), hit("a", 3.0)]}},
+    ]}
+
+    results = vector_store.msearch(
+        "idx",
+        [[1.0], [0.5]],
+        [5, 2],
+        query_filters=[None, {"term": {"metadata.file_name": "f"}}],
+        hybrids=[None, HybridSearch(query_text="room 101")]
+    )
+
+    searches = vector_store.es.msearch.call_args.kwargs["searches"]
+    assert vector_store.es.msearch.call_count == 1
+    assert len(searches) == 6
+
+    vector_body, lexical_body = searches[3], searches[5]
+    assert "sort" not in vector_body, "The vector leg of a hybrid search must be ranked by relevance"
+    assert lexical_body["query"]["bool"]["must"] == [{"match": {"text": {"query": "room 101"}}}]
+    assert lexical_body["query"]["bool"]["filter"] == [{"term": {"metadata.file_name": "f"}}]
+    assert lexical_body["size"] == 2
+
+    assert [h["_id"] for h in results[0]] == ["plain"]
+    assert [h["_id"] for h in results[1]] == ["a", "room"]
+
+
+def test_hybrid_search(vector_store):
+    """
+    Test that a single hybrid search is one multi-search with two bodies.
+    """
+    vector_store.es.msearch.return_value = {"responses": [
+        {"hits": {"hits": [hit("a", 1.9)]}},
+        {"hits": {"hits": [hit("b", 4.0)]}},
+    ]}
+
+    results = vector_store.hybrid_search("idx", [1.0], HybridSearch(query_text="q", vector_weight=0.75), top_k=2)
+
+    assert len(vector_store.es.msearch.call_args.kwargs["searches"]) == 4
+    assert [h["_id"] for h in results] == ["a", "b"]
+
+
+def test_min_similarity_becomes_min_score(vector_store):
+    """
+    Test that the similarity threshold is applied by Elasticsearch, offset like the cosine script score.
+    """
+    body = vector_store.build_search_body([1.0], 5, min_similarity=0.6)
+
+    assert body["min_score"] == pytest.approx(1.6)
+    assert body["query"]["function_score"]["boost_mode"] == "replace"
+    assert "min_score" not in vector_store.build_search_body([1.0], 5)
+
+
+def test_msearch_min_similarities(vector_store):
+    """
+    Test that each search in a multi-search gets its own threshold, including the vector leg of a hybrid search.
+    """
+    vector_store.es.msearch.return_value = {"responses": [{"hits": {"hits": []}}] * 3}
+
+    vector_store.msearch(
+        "idx", [[1.0], [1.0]], [1, 1],
+        hybrids=[None, HybridSearch(query_text="q")],
+        min_similarities=[0.2, 0.7]
+    )
+
+    bodies = vector_store.es.msearch.call_args.kwargs["searches"][1::2]
+    assert bodies[0]["min_score"] == pytest.approx(1.2)
+    assert bodies[1]["min_score"] == pytest.approx(1.7)
+    assert "min_score" not in bodies[2]
+
+
+def test_group_routing(vector_store):
+    """
+    Test that group routing is sent on writes, deletes & (multi-)searches only when enabled.
+    """
+    assert vector_store.routing("g1") is None
+
+    vector_store.group_routing = True
+    assert vector_store.routing("g1") == "g1"
+
+    vector_store.insert("g1", "doc-0", [0.1], "text", routing="g1")
+    assert vector_store.es.index.call_args.kwargs["routing"] == "g1"
+
+    vector_store.delete_by_query("g1", "file_name", "a.pdf", routing="g1")
+    assert vector_store.es.delete_by_query.call_args.kwargs["routing"] == "g1"
+
+    vector_store.es.search.return_value = {"hits": {"hits": []}}
+    vector_store.search("g1", [0.1], routing="g1")
+    assert vector_store.es.search.call_args.kwargs["routing"] == "g1"
+
+    vector_store.es.msearch.return_value = {"responses": [{"hits": {"hits": []}}, {"hits": {"hits": []}}]}
+    vector_store.msearch("g1", [[0.1], [0.2]], [1, 1], routings=["g1", None])
+    searches = vector_store.es.msearch.call_args.kwargs["searches"]
+    assert searches[0] == {"index": "g1", "routing": "g1"}
+    assert searches[2] == {"index": "g1"}
+
+
+
+def test_quantized_group_uses_knn(vector_store):
+    """
+    Test that quantized groups search with approximate kNN (rescored for bbq), with kNN scores rescaled to cosine + 1.
+    """
+    vector_store._index_info = {"g1": GroupIndexInfo(vector_index="bbq_hnsw")}
+    vector_store.es.search.return_value = {"hits": {"hits": [hit("a", 0.9)]}}
+
+    results = vector_store.search("g1", [0.1, 0.2], top_k=5, min_similarity=0.5)
+
+    knn = vector_store.es.search.call_args.kwargs["query"]["knn"]
+    assert knn["num_candidates"] == 100
+    assert knn["similarity"] == 0.5
+    assert knn["rescore_vector"] == {"oversample": 3.0}
+    assert "min_score" not in vector_store.es.search.call_args.kwargs
+    assert results[0]["_score"] == pytest.approx(1.8)
+
+
+def test_msearch_mixes_knn_and_script_groups(vector_store):
+    """
+    Test that only the quantized groups' hits of a multi-search get their kNN scores rescaled.
+    """
+    vector_store._index_info = {"g1": GroupIndexInfo(vector_index="int8_hnsw"), "g2": GroupIndexInfo()}
+    vector_store.es.msearch.return_value = {"responses": [
+        {"hits": {"hits": [hit("a", 0.75)]}},
+        {"hits": {"hits": [hit("b", 1.5)]}},
+    ]}
+
+    results = vector_store.msearch(["g1", "g2"], [[0.1], [0.2]], [1, 1], by_relevance=True)
+
+    searches = vector_store.es.msearch.call_args.kwargs["searches"]
+    assert searches[1]["query"]["knn"]["rescore_vector"] == {"oversample": 1.5}
+    assert "function_score" in searches[3]["query"]
+    assert [r[0]["_score"] for r in results] == pytest.approx([1.5, 1.5])
+
+
+def test_insert_checks_embedding_dims(vector_store):
+    """
+    Test that inserts into a group are checked against its dimensions, & truncated (renormalized) for Matryoshka groups.
+    """
+    vector_store._index_info = {"g1": GroupIndexInfo(dims=2), "g2": GroupIndexInfo(dims=2, matryoshka=True)}
+    vector_store.es.indices.get_mapping.return_value = {"criadex-group-g1-000001": {"mappings": {"properties": {"embedding": {"dims": 2}}}}}
+
+    with pytest.raises(EmbeddingDimensionsError):
+        vector_store.insert("g1", "a", [0.6, 0.8, 0.5], "a")
+
+    vector_store.insert("g2", "a", [0.6, 0.8, 0.5], "a")
+    embedding = vector_store.es.index.call_args.kwargs["document"]["embedding"]
+    assert embedding == pytest.approx([0.6, 0.8])
+
+
+def test_index_info_refreshes_after_reindex_elsewhere(vector_store, monkeypatch):
+    """
+    Test that a group's cached index info is re-read when it goes stale, or when an embedding does not fit it
+    (e.g. another worker re-embedded the group), so this worker follows the swapped index.
+    """
+    vector_store._index_info = {"g1": GroupIndexInfo(dims=2)}
+    vector_store.es.indices.get_mapping.return_value = {"criadex-group-g1-000002": {"mappings": {"properties": {"embedding": {"dims": 3}}}}}
+
+    vector_store.insert("g1", "a", [0.6, 0.8, 0.5], "a")
+    assert vector_store.es.index.call_args.kwargs["document"]["embedding"] == [0.6, 0.8, 0.5]
+    assert vector_store.index_info("g1").dims == 3
+
+    vector_store._index_info = {"g1": GroupIndexInfo(dims=2)}
+    assert vector_store.index_info("g1").dims == 2
+    monkeypatch.setattr(vector_store_module, "INDEX_INFO_TTL", 0.0)
+    assert vector_store.index_info("g1").dims == 3
+
+
+def test_search_truncates_query_embedding(vector_store):
+    """
+    Test that query embeddings are fitted to each searched group's dimensions.
+    """
+    vector_store._index_info = {"g1": GroupIndexInfo(dims=2, matryoshka=True)}
+    vector_store.es.msearch.return_value = {"responses": [{"hits": {"hits": []}}]}
+
+    vector_store.msearch("g1", [[3.0, 4.0, 1.0]], [1])
+
+    body = vector_store.es.msearch.call_args.kwargs["searches"][1]
+    assert body["query"]["function_score"]["functions"][0]["script_score"]["script"]["params"]["query_vector"] == pytest.approx([0.6, 0.8])
+
+
+def test_insert_refresh_policy(vector_store):
+    """
+    Test that node writes don't force refreshes by default, & that a per-call policy overrides the default.
+    """
+    vector_store.insert("g1", "a", [1.0], "a")
+    assert vector_store.es.index.call_args.kwargs["refresh"] is False
+
+    vector_store.insert("g1", "b", [1.0], "b", refresh="wait_for")
+    assert vector_store.es.index.call_args.kwargs["refresh"] == "wait_for"
+
+
+def test_delete_by_query_refreshes_once(vector_store):
+    """
+    Test that delete-by-query refreshes through its own parameter only, with no extra index refresh.
+    """
+    vector_store.delete_by_query("g1", "file_name", "a.pdf")
+
+    assert vector_store.es.delete_by_query.call_args.kwargs["refresh"] is True
+    vector_store.es.indices.refresh.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_group_delete_uses_write_policy():
+    """
+    Test that a group's deletes refresh per the vector store's delete policy.
+    """
+    index = MagicMock(_elasticsearch_client=MagicMock(delete_by_query=AsyncMock()))
+    index.collection_name.return_value = "g1"
+
+    await Group(name="g1", index=index).remove("a.pdf")
+    assert index._elasticsearch_client.delete_by_query.call_args.kwargs["refresh"] is True
+
+    await Group(name="g1", index=index, write_policy=WritePolicy(delete="false")).delete()
+    assert index._elasticsearch_client.delete_by_query.call_args.kwargs["refresh"] is False
+
+
+def share_documents(es: MagicMock, documents: dict) -> None:
+    """Make a mock client get, create, index & delete documents by ID, in a dict its workers share"""
+
+    def get(index, id):
+        if id not in documents:
+            raise NotFoundError("not found", MagicMock(status=404), {})
+        return {"_source": documents[id]}
+
+    def index(index, id, document, op_type=None, **kwargs):
+        if op_type == "create" and id in documents:
+            raise ConflictError("exists", MagicMock(status=409), {})
+        documents[id] = dict(document)
+
+    def delete(index, id):
+        if documents.pop(id, None) is None:
+            raise NotFoundError("not found", MagicMock(status=404), {})
+
+    es.get.side_effect, es.index.side_effect, es.delete.side_effect = get, index, delete
+
+
+def test_ingestion_mode(vector_store):
+    """
+    Test that ingestion mode raises the refresh interval & stops per-write refreshes, then restores the interval & refreshes once.
+    """
+    share_documents(vector_store.es, {})
+    vector_store.es.indices.get_settings.return_value = {
+        "criadex-group-g1-000001": {"settings": {"index": {"refresh_interval": "5s"}}}
+    }
+
+    vector_store.begin_ingestion("g1")
+    vector_store.begin_ingestion("g1")
+    assert vector_store.es.indices.put_settings.call_count == 1
+    assert vector_store.es.indices.put_settings.call_args.kwargs["settings"] == {"index": {"refresh_interval": "30s"}}
+
+    vector_store.insert("g1", "a", [1.0], "a", refresh="wait_for")
+    assert vector_store.es.index.call_args.kwargs["refresh"] is False
+
+    assert vector_store.end_ingestion("g1")
+    assert vector_store.es.indices.put_settings.call_args.kwargs["settings"] == {"index": {"refresh_interval": "5s"}}
+    vector_store.es.indices.refresh.assert_called_once_with(index="g1")
+    assert not vector_store.end_ingestion("g1")
+
+
+def test_ingestion_mode_across_workers(monkeypatch):
+    """
+    Test that one worker's ingestion is seen & can be ended by another, & that an expired lease ends on the next write.
+    """
+    monkeypatch.setattr(ingestion, "INGESTION_STATE_TTL", 0)
+    es, documents = MagicMock(), {}
+    share_documents(es, documents)
+    es.indices.get_settings.return_value = {"criadex-group-g1-000001": {"settings": {"index": {"refresh_interval": "5s"}}}}
+
+    first, second = RagflowVectorStore("localhost", 9200), RagflowVectorStore("localhost", 9200)
+    first.es = second.es = es
+
+    first.begin_ingestion("g1")
+    second.insert("g1", "a", [1.0], "a", refresh="wait_for")
+    assert es.index.call_args.kwargs["refresh"] is False
+
+    assert second.end_ingestion("g1")
+    assert es.indices.put_settings.call_args.kwargs["settings"] == {"index": {"refresh_interval": "5s"}}
+    assert not first.ingesting("g1") and not first.end_ingestion("g1")
+
+    # A renewal elsewhere keeps an older expiry timer from ending it
+    first.begin_ingestion("g1", expire_after=1)
+    second.begin_ingestion("g1", expire_after=3600)
+    assert not first.end_ingestion("g1", expired_only=True)
+
+    # Expired (e.g. its worker died): the next write ends it & is refreshed as usual
+    documents["g1"]["expires_at"] = 0.0
+    es.indices.put_settings.reset_mock()
+    first.insert("g1", "b", [1.0], "b", refresh="wait_for")
+    assert es.index.call_args.kwargs["refresh"] == "wait_for"
+    assert es.indices.put_settings.call_args.kwargs["settings"] == {"index": {"refresh_interval": "5s"}}
+    assert "g1" not in documents
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+FAKE_RAGFLOW_CHUNKS: List[str] = ["Hello", ", ", "student", "!"]
+FAKE_RAGFLOW_USAGE: dict = {"prompt_tokens": 7, "completion_tokens": 4, "total_tokens": 11}
+FAKE_RAGFLOW_BAD_KEY: str = "bad-key"
+FAKE_RAGFLOW_PATHS: List[str] = []  # The path of every completion request received
+
+
+async def _completions(request: Request):
+    """
+    Minimal stand-in for Ragflow's OpenAI-compatible chat completions endpoint
+
+    """
+
+    if request.headers.get("Authorization") == f"Bearer {FAKE_RAGFLOW_BAD_KEY}":
+        return JSONResponse({"code": 102, "message": "Authentication error: API key is invalid!"}, status_code=401)
+
+    FAKE_RAGFLOW_PATHS.append(request.url.path)
+    body: dict = await request.json()
+
+    if not body.get("stream"):
+        return JSONResponse({
+            "choices": [{"message": {"role": "assistant", "content": "".join(FAKE_RAGFLOW_CHUNKS)}}],
+            "usage": FAKE_RAGFLOW_USAGE
+        })
+
+    async def events():
+        for chunk in FAKE_RAGFLOW_CHUNKS:
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]})}\n\n"
+            await asyncio.sleep(0.01)
+        yield f"data: {json.dumps({'choices': [{'delta': {}, 'finish_reason': 'stop'}], 'usage': FAKE_RAGFLOW_USAGE})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+fake_ragflow_app: Starlette = Starlette(routes=[
+    Route("/api/v1/chats_openai/{chat_id}/chat/completions", _completions, methods=["POST"]),
+    # A plain (dialog-less) completions endpoint, e.g. for history summaries
+    Route("/v1/chat/completions", _completions, methods=["POST"])
+])
+
+
+@contextmanager
+def run_fake_ragflow() -> Iterator[str]:
+    """
+    Serve the fake Ragflow API on a local port for the duration of the context
+
+    :return: The URL template to point RagflowChatAgent at
+
+    """
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(fake_ragflow_app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    while not server.started:
+        time.sleep(0.01)
+
+    try:
+        yield f"http://127.0.0.1:{port}/api/v1/chats_openai/{{chat_id}}/chat/completions"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)